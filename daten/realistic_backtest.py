@@ -6,7 +6,8 @@ import ta
 
 from stbot.analysis.backtester import load_data
 from stbot.strategy.sr_engine import SREngine
-from stbot.strategy.trade_logic import get_titan_signal
+from stbot.strategy.trade_logic import compute_titan_signals
+from stbot.analysis.trade_kernel import BarData, simulate_trades
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 CONFIG_DIR = os.path.join(PROJECT_ROOT, 'src', 'stbot', 'strategy', 'configs')
@@ -41,125 +42,23 @@ def simulate_symbol(sym, tf, cfg, start_capital=100):
     if fine.empty:
         print(f"  {sym}: keine 1m-Daten verfuegbar, ueberspringe.")
         return None
-    f_idx = fine.index.values
-    f_open = fine['open'].values
-    f_high = fine['high'].values
-    f_low = fine['low'].values
-    f_close = fine['close'].values
-
-    risk = cfg['risk']
-    risk_per_trade_pct = risk.get('risk_per_trade_pct', 1.0) / 100
-    leverage = risk.get('leverage', 10)
-    fee_pct = 0.06 / 100
-    atr_multiplier_sl = risk.get('atr_multiplier_sl', 2.0)
-    min_sl_pct = risk.get('min_sl_pct', 0.3) / 100.0
-    act_rr = risk.get('trailing_stop_activation_rr', 1.5)
-    callback_rate = risk.get('trailing_stop_callback_rate_pct', 0.5) / 100.0
-
-    params_for_logic = {"strategy": cfg['strategy'], "risk": risk}
-
-    current_capital = start_capital
-    blocked_until = None
-    trades = []
-
-    rows = list(processed.iterrows())
-    for timestamp, current_candle in rows:
-        if current_capital <= 0:
-            break
-        if blocked_until is not None and timestamp <= blocked_until:
-            continue
-
-        side, price = get_titan_signal(processed, current_candle, params_for_logic, Bias.NEUTRAL)
-        if not side:
-            continue
-
-        entry_price = current_candle['close']
-        current_atr = current_candle.get('atr', 0)
-        if current_atr <= 0:
-            continue
-        sl_dist = max(current_atr * atr_multiplier_sl, entry_price * min_sl_pct)
-        risk_amount_usd = current_capital * risk_per_trade_pct
-        sl_pct = sl_dist / entry_price
-        if sl_pct <= 0:
-            continue
-        calc_notional = risk_amount_usd / sl_pct
-        final_notional = min(calc_notional, current_capital * 10, 1000000)
-        margin_needed = final_notional / leverage
-        if margin_needed > current_capital:
-            continue
 
-        pos_side = 'long' if side == 'buy' else 'short'
-        if pos_side == 'long':
-            sl = entry_price - sl_dist
-            act_price = entry_price + sl_dist * act_rr
-        else:
-            sl = entry_price + sl_dist
-            act_price = entry_price - sl_dist * act_rr
-
-        # --- 1m-Simulation ab Entry-Zeitpunkt: NUR harter SL + echter Trailing-Stop (kein reales TP-Order-Objekt) ---
-        start_pos = np.searchsorted(f_idx, np.datetime64(timestamp.tz_convert('UTC').tz_localize(None)))
-        exit_price = None
-        exit_ts = None
-        exit_reason = None
-        activated = False
-        peak = entry_price
-
-        n = len(f_idx)
-        i = start_pos
-        while i < n:
-            hi, lo = f_high[i], f_low[i]
-            if pos_side == 'long':
-                if lo <= sl:
-                    exit_price, exit_reason = sl, "SL"
-                    exit_ts = f_idx[i]
-                    break
-                if not activated and hi >= act_price:
-                    activated = True
-                    peak = hi
-                if activated:
-                    peak = max(peak, hi)
-                    trail_level = peak * (1 - callback_rate)
-                    if lo <= trail_level:
-                        exit_price, exit_reason = trail_level, "TRAILING"
-                        exit_ts = f_idx[i]
-                        break
-            else:
-                if hi >= sl:
-                    exit_price, exit_reason = sl, "SL"
-                    exit_ts = f_idx[i]
-                    break
-                if not activated and lo <= act_price:
-                    activated = True
-                    peak = lo
-                if activated:
-                    peak = min(peak, lo)
-                    trail_level = peak * (1 + callback_rate)
-                    if hi >= trail_level:
-                        exit_price, exit_reason = trail_level, "TRAILING"
-                        exit_ts = f_idx[i]
-                        break
-            i += 1
-
-        if exit_price is None:
-            # Kein Exit innerhalb der verfuegbaren 1m-Historie (Positionsende ausserhalb Datenfenster)
-            exit_price = f_close[-1] if n > 0 else entry_price
-            exit_ts = f_idx[-1] if n > 0 else timestamp
-            exit_reason = "HORIZON_END"
-
-        pnl_pct = (exit_price / entry_price - 1) if pos_side == 'long' else (1 - exit_price / entry_price)
-        pnl_usd = final_notional * pnl_pct
-        total_fees = final_notional * fee_pct * 2
-        net_pnl = pnl_usd - total_fees
-        current_capital += net_pnl
-
-        exit_ts_final = pd.Timestamp(exit_ts, tz='UTC') if pd.Timestamp(exit_ts).tzinfo is None else pd.Timestamp(exit_ts)
-        trades.append({
-            "entry_ts": timestamp, "exit_ts": exit_ts_final, "side": pos_side,
-            "entry_price": entry_price, "sl": sl, "act_price": act_price,
-            "exit_price": exit_price, "reason": exit_reason, "net_pnl": net_pnl,
-            "activated_trailing": activated,
-        })
-        blocked_until = exit_ts_final
+    # Gemeinsamer Simulations-Kern (wie run_backtest): NUR harter SL + echter
+    # Trailing-Stop (kein reales TP-Order-Objekt), Intrabar-Pfad aus den
+    # 1m-Kerzen je Handels-Kerze, Exit ab der Kerze NACH dem Einstieg.
+    # Am Datenende offene Positionen werden zum letzten Close geschlossen.
+    params_for_logic = {"strategy": cfg['strategy'], "risk": cfg['risk']}
+    sides = compute_titan_signals(processed, params_for_logic, Bias.NEUTRAL)
+    sim = simulate_trades(BarData(processed, fine_data=fine), sides, processed['atr'], cfg['risk'],
+                          start_capital, close_at_end=True)
+
+    trades = [{
+        "entry_ts": pos['entry_time'], "exit_ts": pos['exit_time'], "side": pos['side'],
+        "entry_price": pos['entry_price'], "sl": pos['stop_loss'], "act_price": pos['activation_price'],
+        "exit_price": pos['exit_price'], "reason": pos['exit_reason'], "net_pnl": pos['net_pnl'],
+        "activated_trailing": pos['trailing_active'],
+    } for pos in sim['positions']]
+    current_capital = sim['capital']
 
     return {"trades": trades, "final_capital": current_capital, "start_capital": start_capital}
 
@@ -1,4 +1,5 @@
 # master_runner.py
+import argparse
 import json
 import subprocess
 import sys
@@ -12,16 +13,133 @@ sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
 
 from stbot.utils.exchange import Exchange
 
+def _trigger_auto_optimizer(python_executable):
+    # Auto-Optimizer im Hintergrund prüfen und ggf. starten
+    auto_opt_script = os.path.join(SCRIPT_DIR, 'auto_optimizer_scheduler.py')
+    if os.path.exists(auto_opt_script):
+        print("[Auto-Optimizer] Prüfe ob Optimierung fällig...")
+        logs_dir = os.path.join(SCRIPT_DIR, 'logs')
+        os.makedirs(logs_dir, exist_ok=True)
+        subprocess.Popen(
+            [python_executable, auto_opt_script],
+            stdout=open(os.path.join(logs_dir, 'auto_optimizer_trigger.log'), 'a'),
+            stderr=subprocess.STDOUT,
+        )
+
+
+def _resolve_account_key(secrets):
+    # KORREKTUR: Suche nach 'stbot' statt 'jaegerbot'
+    if not secrets.get('stbot'):
+        # Fallback für Tests, falls noch utbot2 drin steht
+        if secrets.get('utbot2'):
+            print("Info: Nutze 'utbot2' Schlüssel als Fallback.")
+            return 'utbot2'
+        print("Fehler: Kein 'stbot'-Account in secret.json gefunden.")
+        return None
+    return 'stbot'
+
+
+def _resolve_strategies(settings, verbose=True):
+    """
+    Liefert die aktiven Strategien als Liste (symbol, timeframe, use_macd) --
+    aus optimization_results.json (Autopilot) oder den manuellen
+    active_strategies der settings.json. Gemeinsam genutzt vom Cron-Modus
+    (ein run.py-Prozess je Strategie) und vom Daemon-Modus (--daemon).
+    """
+    optimization_results_file = os.path.join(SCRIPT_DIR, 'artifacts', 'results', 'optimization_results.json')
+    live_settings = settings.get('live_trading_settings', {})
+    use_autopilot = live_settings.get('use_auto_optimizer_results', False)
+
+    strategy_list = []
+    if use_autopilot:
+        if verbose: print("Modus: Autopilot. Lese Strategien aus den Optimierungs-Ergebnissen...")
+        if os.path.exists(optimization_results_file):
+            with open(optimization_results_file, 'r') as f:
+                strategy_config = json.load(f)
+            strategy_list = strategy_config.get('optimal_portfolio', [])
+        else:
+            print("Warnung: Keine Optimierungs-Ergebnisse gefunden. Bitte pipeline ausführen.")
+    else:
+        if verbose: print("Modus: Manuell. Lese Strategien aus den manuellen Einstellungen...")
+        strategy_list = live_settings.get('active_strategies', [])
+
+    resolved = []
+    for strategy_info in strategy_list:
+        # 1. Fall: Strategie kommt aus manueller settings.json (Dict)
+        if isinstance(strategy_info, dict):
+            if not strategy_info.get("active", True):
+                continue
+
+            symbol = strategy_info.get('symbol')
+            timeframe = strategy_info.get('timeframe')
+            # use_macd wird nur als Dummy übergeben für Kompatibilität
+            use_macd = strategy_info.get('use_macd_filter', False)
+
+        # 2. Fall: Strategie kommt aus optimization_results.json (String Dateiname)
+        elif isinstance(strategy_info, str):
+            # Format: config_BTCUSDTUSDT_1h.json
+            # Wir müssen das parsen, um Symbol und Timeframe zu bekommen
+            try:
+                # Entferne 'config_' und '.json'
+                clean_name = strategy_info.replace("config_", "").replace(".json", "")
+                # Teile am letzten Unterstrich (Trennung Symbol_Timeframe)
+                parts = clean_name.rsplit("_", 1)
+                if len(parts) != 2:
+                    print(f"Warnung: Konnte Dateinamen nicht parsen: {strategy_info}")
+                    continue
+
+                symbol_raw = parts[0] # z.B. BTCUSDTUSDT
+                timeframe = parts[1]  # z.B. 1h
+
+                # Versuche Symbol wiederherzustellen (etwas hacky, aber funktioniert meistens)
+                # Wir wissen, es endet auf USDTUSDT oder ähnlich.
+                # Besser: Wir laden die Config kurz, um sicherzugehen
+                config_path = os.path.join(SCRIPT_DIR, 'src', 'stbot', 'strategy', 'configs', strategy_info)
+                if os.path.exists(config_path):
+                    with open(config_path, 'r') as cf:
+                        c_data = json.load(cf)
+                        symbol = c_data['market']['symbol']
+                        # Timeframe ist in der Config
+                        timeframe = c_data['market']['timeframe']
+                else:
+                    print(f"Warnung: Config Datei fehlt: {config_path}")
+                    continue
+
+                use_macd = False # Bei optimierten Strategien irrelevant
+
+            except Exception as e:
+                print(f"Fehler beim Parsen der Strategie {strategy_info}: {e}")
+                continue
+
+        else:
+            continue
+
+        if not symbol or not timeframe:
+            print(f"Warnung: Unvollständige Strategie-Info. Überspringe.")
+            continue
+
+        resolved.append((symbol, timeframe, use_macd))
+    return resolved
+
+
 def main():
     """
     Der Master Runner für den StBot.
     - Liest die settings.json, um den Modus (Autopilot/Manuell) zu bestimmen.
     - Startet für jede als "active" markierte Strategie einen separaten run.py Prozess
       innerhalb der korrekten virtuellen Umgebung.
+    - Mit --daemon: EIN dauerhaft laufender Prozess (stbot.strategy.daemon), der
+      Exchange-Clients im Speicher haelt und jede Strategie direkt zum
+      Kerzenschluss ihres Timeframes ausfuehrt (ersetzt den Cronjob); die
+      Strategie-Config wird wie bisher je Zyklus frisch gelesen.
     """
+    parser = argparse.ArgumentParser(description="StBot Master Runner")
+    parser.add_argument('--daemon', action='store_true',
+                        help='Dauerhaft laufender Live-Prozess statt ein run.py-Prozess je Strategie und Cron-Tick')
+    args = parser.parse_args()
+
     settings_file = os.path.join(SCRIPT_DIR, 'settings.json')
-    optimization_results_file = os.path.join(SCRIPT_DIR, 'artifacts', 'results', 'optimization_results.json')
-    
+
     # Pfad zum Bot-Runner (angepasst auf stbot Struktur)
     bot_runner_script = os.path.join(SCRIPT_DIR, 'src', 'stbot', 'strategy', 'run.py')
     secret_file = os.path.join(SCRIPT_DIR, 'secret.json')
@@ -33,20 +151,29 @@ def main():
         return
 
     print("=======================================================")
-    print("StBot Master Runner v1.0")
+    print("StBot Master Runner v1.0" + (" (Daemon)" if args.daemon else ""))
     print("=======================================================")
 
-    # Auto-Optimizer im Hintergrund prüfen und ggf. starten
-    auto_opt_script = os.path.join(SCRIPT_DIR, 'auto_optimizer_scheduler.py')
-    if os.path.exists(auto_opt_script):
-        print("[Auto-Optimizer] Prüfe ob Optimierung fällig...")
-        logs_dir = os.path.join(SCRIPT_DIR, 'logs')
-        os.makedirs(logs_dir, exist_ok=True)
-        subprocess.Popen(
-            [python_executable, auto_opt_script],
-            stdout=open(os.path.join(logs_dir, 'auto_optimizer_trigger.log'), 'a'),
-            stderr=subprocess.STDOUT,
+    if args.daemon:
+        from stbot.strategy.daemon import run_daemon
+
+        def _load_strategies():
+            with open(settings_file, 'r') as f:
+                return _resolve_strategies(json.load(f), verbose=False)
+
+        with open(settings_file, 'r') as f:
+            concurrent = json.load(f).get('live_trading_settings', {}).get('concurrent_cycles', True)
+
+        run_daemon(
+            load_strategies=_load_strategies,
+            watch_files=[settings_file,
+                         os.path.join(SCRIPT_DIR, 'artifacts', 'results', 'optimization_results.json')],
+            on_wake=lambda: _trigger_auto_optimizer(python_executable),
+            concurrent=concurrent,
         )
+        return
+
+    _trigger_auto_optimizer(python_executable)
 
     try:
         with open(settings_file, 'r') as f:
@@ -55,37 +182,15 @@ def main():
         with open(secret_file, 'r') as f:
             secrets = json.load(f)
 
-        # KORREKTUR: Suche nach 'stbot' statt 'jaegerbot'
-        if not secrets.get('stbot'): 
-            # Fallback für Tests, falls noch utbot2 drin steht
-            if secrets.get('utbot2'):
-                print("Info: Nutze 'utbot2' Schlüssel als Fallback.")
-                account_key = 'utbot2'
-            else:
-                print("Fehler: Kein 'stbot'-Account in secret.json gefunden.")
-                return
-        else:
-            account_key = 'stbot'
+        account_key = _resolve_account_key(secrets)
+        if not account_key:
+            return
 
         main_account_config = secrets[account_key][0]
 
         print(f"Frage Kontostand für Account '{main_account_config.get('name', 'Standard')}' ab...")
 
-        live_settings = settings.get('live_trading_settings', {})
-        use_autopilot = live_settings.get('use_auto_optimizer_results', False)
-
-        strategy_list = []
-        if use_autopilot:
-            print("Modus: Autopilot. Lese Strategien aus den Optimierungs-Ergebnissen...")
-            if os.path.exists(optimization_results_file):
-                with open(optimization_results_file, 'r') as f:
-                    strategy_config = json.load(f)
-                strategy_list = strategy_config.get('optimal_portfolio', [])
-            else:
-                print("Warnung: Keine Optimierungs-Ergebnisse gefunden. Bitte pipeline ausführen.")
-        else:
-            print("Modus: Manuell. Lese Strategien aus den manuellen Einstellungen...")
-            strategy_list = live_settings.get('active_strategies', [])
+        strategy_list = _resolve_strategies(settings)
 
         if not strategy_list:
             print("Keine aktiven Strategien zum Ausführen gefunden.")
@@ -93,60 +198,7 @@ def main():
 
         print("=======================================================")
 
-        for strategy_info in strategy_list:
-            # 1. Fall: Strategie kommt aus manueller settings.json (Dict)
-            if isinstance(strategy_info, dict):
-                if not strategy_info.get("active", True):
-                    continue
-                
-                symbol = strategy_info.get('symbol')
-                timeframe = strategy_info.get('timeframe')
-                # use_macd wird nur als Dummy übergeben für Kompatibilität
-                use_macd = strategy_info.get('use_macd_filter', False)
-
-            # 2. Fall: Strategie kommt aus optimization_results.json (String Dateiname)
-            elif isinstance(strategy_info, str):
-                # Format: config_BTCUSDTUSDT_1h.json
-                # Wir müssen das parsen, um Symbol und Timeframe zu bekommen
-                try:
-                    # Entferne 'config_' und '.json'
-                    clean_name = strategy_info.replace("config_", "").replace(".json", "")
-                    # Teile am letzten Unterstrich (Trennung Symbol_Timeframe)
-                    parts = clean_name.rsplit("_", 1)
-                    if len(parts) != 2:
-                        print(f"Warnung: Konnte Dateinamen nicht parsen: {strategy_info}")
-                        continue
-                    
-                    symbol_raw = parts[0] # z.B. BTCUSDTUSDT
-                    timeframe = parts[1]  # z.B. 1h
-                    
-                    # Versuche Symbol wiederherzustellen (etwas hacky, aber funktioniert meistens)
-                    # Wir wissen, es endet auf USDTUSDT oder ähnlich.
-                    # Besser: Wir laden die Config kurz, um sicherzugehen
-                    config_path = os.path.join(SCRIPT_DIR, 'src', 'stbot', 'strategy', 'configs', strategy_info)
-                    if os.path.exists(config_path):
-                        with open(config_path, 'r') as cf:
-                            c_data = json.load(cf)
-                            symbol = c_data['market']['symbol']
-                            # Timeframe ist in der Config
-                            timeframe = c_data['market']['timeframe']
-                    else:
-                        print(f"Warnung: Config Datei fehlt: {config_path}")
-                        continue
-                    
-                    use_macd = False # Bei optimierten Strategien irrelevant
-
-                except Exception as e:
-                    print(f"Fehler beim Parsen der Strategie {strategy_info}: {e}")
-                    continue
-
-            else:
-                continue
-
-            if not symbol or not timeframe:
-                print(f"Warnung: Unvollständige Strategie-Info. Überspringe.")
-                continue
-
+        for symbol, timeframe, use_macd in strategy_list:
             print(f"\n--- Starte Bot für: {symbol} ({timeframe}) ---")
 
             command = [
@@ -106,6 +106,14 @@ START_DATE=$(date -d "$LOOKBACK_DAYS days ago" +%F)
 END_DATE=$(date +%F)
 OPTIM_MODE_ARG=${OPTIM_MODE_ARG:-$DEFAULT_OPTIM_MODE} # Standard ist strict
 
+# Warm-Start: woechentliche Re-Optimierung mit aktueller Config + besten Trials
+# des letzten kompatiblen Laufs vorbelegen (siehe optimizer.py --warm_start)
+WARM_START=$(get_setting "['optimization_settings', 'warm_start']")
+WARM_START_ARGS=()
+if [ "$WARM_START" == "True" ]; then
+    WARM_START_ARGS=(--warm_start)
+fi
+
 # --- Pipeline starten ---
 echo "Optimierung ist aktiviert. Starte Prozesse..."
 echo "Verwende Daten der letzten $LOOKBACK_DAYS Tage ($START_DATE bis $END_DATE)."
@@ -126,7 +134,8 @@ python3 "$OPTIMIZER" \
     --min_win_rate "$MIN_WR" \
     --trials "$N_TRIALS" \
     --min_pnl "$MIN_PNL" \
-    --mode "$OPTIM_MODE_ARG"
+    --mode "$OPTIM_MODE_ARG" \
+    "${WARM_START_ARGS[@]}"
 
 if [ $? -ne 0 ]; then
     echo "Fehler im Optimierer-Skript. Pipeline wird abgebrochen."
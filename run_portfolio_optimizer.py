@@ -193,102 +193,85 @@ def _send_telegram_doc(fpath, caption=''):
 
 
 def generate_trades_excel(final, strategies_data, capital, start_date, end_date):
-    """Erstellt Excel-Tabelle mit allen Portfolio-Trades."""
+    """Erstellt Excel-Tabelle mit allen Portfolio-Trades (streamend, siehe
+    stbot/analysis/excel_report.py)."""
     try:
-        import openpyxl
-        from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-        from openpyxl.utils import get_column_letter
+        import openpyxl  # noqa: F401
     except ImportError:
         print(f'  {Y}openpyxl nicht installiert — Excel uebersprungen.{NC}')
         return None
 
-    trades = final.get('trade_history', [])
-    if not trades:
+    import numpy as np
+    from stbot.analysis.trade_kernel import FEE_PCT
+    from stbot.analysis.excel_report import write_trade_workbook
+
+    ledger = final.get('trade_ledger')
+    if ledger is None or not len(ledger):
         return None
 
-    fee_pct = 0.06 / 100  # muss zu portfolio_simulator.py passen (dort hart codiert)
-
-    equity = capital
-    rows = []
-    for i, t in enumerate(trades, 1):
-        pnl       = t.get('pnl', 0.0)
-        entry     = t.get('entry', 0.0)
-        exit_px   = t.get('exit', 0.0)
-        direction = str(t.get('direction', 'long'))
-        leverage  = t.get('leverage', 1) or 1
-        margin    = t.get('margin_used', 0.0)
-        notional  = margin * leverage
-        move_pct  = ((exit_px / entry - 1) if direction == 'long' else (1 - exit_px / entry)) * 100 if entry else 0.0
-        fee       = notional * fee_pct * 2
-        equity += pnl
-        rows.append({
-            'Nr':                 i,
-            'Datum':              str(t.get('entry_time', t.get('ts', '')))[:16].replace('T', ' '),
-            'Coin':               str(t.get('symbol', '?')).split('/')[0],
-            'Timeframe':          t.get('timeframe', '?'),
-            'Richtung':           direction.upper(),
-            'Ergebnis':           'TP erreicht' if pnl >= 0 else 'SL erreicht',
-            'Reale Bewegung (%)': round(move_pct, 4),
-            'Marge (USDT)':       round(margin, 4),
-            'Gebühr (USDT)':      round(fee, 4),
-            'PnL (USDT)':         round(pnl, 4),
-            'Gesamtkapital':      round(equity, 4),
-        })
-
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = 'Trades'
-    hdr  = PatternFill('solid', fgColor='1E3A5F')
-    win  = PatternFill('solid', fgColor='D6F4DC')
-    loss = PatternFill('solid', fgColor='FAD7D7')
-    brd  = Border(left=Side(style='thin', color='CCCCCC'), right=Side(style='thin', color='CCCCCC'),
-                  top=Side(style='thin', color='CCCCCC'), bottom=Side(style='thin', color='CCCCCC'))
-    cw   = {'Nr': 6, 'Datum': 18, 'Coin': 10, 'Timeframe': 12, 'Richtung': 10,
-             'Ergebnis': 14, 'Reale Bewegung (%)': 20, 'Marge (USDT)': 14,
-             'Gebühr (USDT)': 14, 'PnL (USDT)': 14, 'Gesamtkapital': 16}
-    hdrs = list(rows[0].keys())
-    for c, h in enumerate(hdrs, 1):
-        cell = ws.cell(row=1, column=c, value=h)
-        cell.fill = hdr
-        cell.font = Font(bold=True, color='FFFFFF', size=11)
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        cell.border = brd
-        ws.column_dimensions[get_column_letter(c)].width = cw.get(h, 14)
-    ws.row_dimensions[1].height = 22
-    for ri, row in enumerate(rows, 2):
-        f = win if row['Ergebnis'] == 'TP erreicht' else loss
-        for c, key in enumerate(hdrs, 1):
-            cell = ws.cell(row=ri, column=c, value=row[key])
-            cell.fill = f
-            cell.border = brd
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            if key in ('Reale Bewegung (%)', 'Marge (USDT)', 'Gebühr (USDT)', 'PnL (USDT)', 'Gesamtkapital'):
-                cell.number_format = '#,##0.0000'
-        ws.row_dimensions[ri].height = 18
-    pnl = final.get('total_pnl_pct', 0)
-    dd  = final.get('max_drawdown_pct', 0)
-    wr  = final.get('win_rate', 0)
-    eq  = final.get('end_capital', equity)
-    n   = final.get('trade_count', len(trades))
-    sr  = len(rows) + 3
-    ws.cell(row=sr, column=1, value='Zusammenfassung').font = Font(bold=True, size=11)
-    sr += 1
-    for label, val in [('Zeitraum', f'{start_date} -> {end_date}'), ('Trades', n),
-                        ('Win-Rate', f'{wr:.1f}%'), ('PnL', f'{pnl:+.1f}%'),
-                        ('Endkapital', f'{eq:.2f} USDT'), ('Max Drawdown', f'{dd:.1f}%')]:
-        ws.cell(row=sr, column=1, value=label).font = Font(bold=True)
-        ws.cell(row=sr, column=2, value=val)
-        sr += 1
+    columns = [('Nr', 6, False), ('Datum', 18, False), ('Coin', 10, False), ('Timeframe', 12, False),
+               ('Richtung', 10, False), ('Ergebnis', 14, False), ('Reale Bewegung (%)', 20, True),
+               ('Marge (USDT)', 14, True), ('Gebühr (USDT)', 14, True), ('PnL (USDT)', 14, True),
+               ('Gesamtkapital', 16, True)]
+    state = {'pnl_sum': 0.0, 'count': 0}
+
+    def _rows():
+        # Blockweise aus dem typisierten Trade-Ledger -- formatiert (Datum,
+        # Coin, Richtung) wird je Block, nie fuer alle Trades gleichzeitig.
+        nr = 0
+        for chunk in ledger.iter_chunks():
+            pnl       = chunk['pnl']
+            entry     = chunk['entry']
+            exit_px   = chunk['exit']
+            is_long   = chunk['direction'] == 1
+            leverage  = np.where(chunk['leverage'] != 0, chunk['leverage'], 1)
+            margin    = chunk['margin_used']
+            notional  = margin * leverage
+            with np.errstate(divide='ignore', invalid='ignore'):
+                move_pct = np.where(entry != 0, np.where(is_long, exit_px / entry - 1, 1 - exit_px / entry) * 100, 0.0)
+            fee       = notional * FEE_PCT * 2
+            # laufende PnL-Summe ueber die Bloecke (np.cumsum addiert der Reihe
+            # nach -- identisch zu capital + np.cumsum(pnl) ueber alle Trades)
+            pnl_sum   = np.cumsum(np.concatenate(([state['pnl_sum']], pnl)))[1:]
+            equity_after = capital + pnl_sum
+            state['pnl_sum'] = float(pnl_sum[-1])
+            dates     = ledger.times('entry_time', chunk).strftime('%Y-%m-%d %H:%M')
+            symbols   = ledger.labels('symbol', chunk)
+            timeframes = ledger.labels('timeframe', chunk)
+            for i, (p, lng, mv, mg, fe, eq_after) in enumerate(zip(
+                    pnl.tolist(), is_long.tolist(), move_pct.tolist(), margin.tolist(),
+                    fee.tolist(), equity_after.tolist())):
+                nr += 1
+                yield ('win' if p >= 0 else 'loss'), (
+                    nr, dates[i], str(symbols[i]).split('/')[0], timeframes[i],
+                    'LONG' if lng else 'SHORT', 'TP erreicht' if p >= 0 else 'SL erreicht',
+                    round(mv, 4), round(mg, 4), round(fe, 4), round(p, 4), round(eq_after, 4))
+        state['count'] = nr
+
+    def _summary():
+        pnl = final.get('total_pnl_pct', 0)
+        dd  = final.get('max_drawdown_pct', 0)
+        wr  = final.get('win_rate', 0)
+        eq  = final.get('end_capital', capital + state['pnl_sum'])
+        n   = final.get('trade_count', state['count'])
+        return [('Zeitraum', f'{start_date} -> {end_date}'), ('Trades', n),
+                ('Win-Rate', f'{wr:.1f}%'), ('PnL', f'{pnl:+.1f}%'),
+                ('Endkapital', f'{eq:.2f} USDT'), ('Max Drawdown', f'{dd:.1f}%')]
+
     outfile = f'/tmp/{BOT_NAME}_trades.xlsx'
-    wb.save(outfile)
+    write_trade_workbook(outfile, columns, _rows(), _summary)
     print(f'  {G}✓ Excel erstellt: {outfile}{NC}')
     return outfile
 
 
-def generate_equity_html(final, capital, start_date, end_date, labels):
+def generate_equity_html(final, capital, start_date, end_date, labels,
+                         max_points=None, period=None):
     """Erstellt interaktiven Portfolio-Equity-Chart (Optik wie dnabot:
     duenne Einzel-Symbol-Linien auf der primaeren Achse, dicke blaue
-    Portfolio-Equity auf der sekundaeren Achse, Entry-/Exit-Marker)."""
+    Portfolio-Equity auf der sekundaeren Achse, Entry-/Exit-Marker).
+    Linien auf hoechstens max_points Punkte reduziert (LTTB, WebGL-Traces,
+    siehe stbot/analysis/chart_lod.py; 0 = volle Aufloesung). period:
+    (label, start, end) -> nur dieser Zeitraum, eigene Datei."""
     try:
         import plotly.graph_objects as go
         from plotly.subplots import make_subplots
@@ -301,45 +284,72 @@ def generate_equity_html(final, capital, start_date, end_date, labels):
     if eq_df is None or (hasattr(eq_df, 'empty') and eq_df.empty):
         return None
 
-    trades   = final.get('trade_history', [])
-    eq_times = pd.to_datetime(eq_df['timestamp'])
-    eq_vals  = [float(v) for v in eq_df['equity']]
+    import numpy as np
+    from stbot.analysis.equity_curve import to_ns, equity_at, strategy_curves, window_stats
+    from stbot.analysis.chart_lod import DEFAULT_MAX_POINTS, downsample_line
+
+    if max_points is None:
+        max_points = DEFAULT_MAX_POINTS
+    ledger   = final.get('trade_ledger')
+    eq_times = pd.DatetimeIndex(pd.to_datetime(eq_df['timestamp']))
+    eq_vals  = eq_df['equity'].to_numpy(dtype='float64')
     pnl      = final.get('total_pnl_pct', 0)
     dd       = final.get('max_drawdown_pct', 0)
     wr       = final.get('win_rate', 0)
     n        = final.get('trade_count', 0)
-    eq       = final.get('end_capital', eq_vals[-1] if eq_vals else capital)
+    eq       = final.get('end_capital', eq_vals[-1] if len(eq_vals) else capital)
+
+    # Zeitraum-Chart: Kurve und Marker nur innerhalb [start, end], die
+    # Kennzahlen im Titel ebenfalls nur aus diesem Fenster (Start-/End-Equity,
+    # Drawdown im Fenster, im Fenster geschlossene Trades)
+    eq_ns = to_ns(eq_times)
+    lo_ns, hi_ns = np.iinfo('int64').min, np.iinfo('int64').max
+    period_txt = ''
+    if period:
+        lo_ns, hi_ns = to_ns([period[1], period[2]])
+        closed_pnl = np.empty(0)
+        if ledger is not None and len(ledger):
+            exit_ns = ledger['exit_time']
+            closed_pnl = ledger['pnl'][(exit_ns >= lo_ns) & (exit_ns <= hi_ns)]
+        win = window_stats(eq_ns, eq_vals, lo_ns, hi_ns, closed_pnl, capital)
+        pnl, dd, wr, n, eq = (win['total_pnl_pct'], win['max_drawdown_pct'], win['win_rate'],
+                              win['trade_count'], win['end_capital'])
+        period_txt = f" | Zeitraum {period[0]} (Start: {win['start_capital']:.2f} USDT)"
+        in_window = (eq_ns >= lo_ns) & (eq_ns <= hi_ns)
+        eq_times, eq_vals = eq_times[in_window], eq_vals[in_window]
     sign     = '+' if pnl >= 0 else ''
     title = (f"{BOT_NAME} Portfolio — {', '.join(labels)} | "
              f"PnL: {sign}{pnl:.1f}% | Equity: {eq:.2f} USDT | "
-             f"MaxDD: {dd:.1f}% | WR: {wr:.1f}% | {n} Trades")
+             f"MaxDD: {dd:.1f}% | WR: {wr:.1f}% | {n} Trades{period_txt}")
 
-    # Nachschlage-Kurve fuer Marker-Positionen (naechster bekannter Portfolio-
-    # Equity-Wert zu einem Trade-Zeitpunkt).
-    eq_series = pd.Series(eq_vals, index=eq_times).sort_index()
+    def _in_window(times_ns):
+        return (times_ns >= lo_ns) & (times_ns <= hi_ns)
 
     PAIR_COLORS = ['#f59e0b', '#8b5cf6', '#ec4899', '#14b8a6',
                    '#f97316', '#84cc16', '#06b6d4', '#a78bfa']
 
     fig = make_subplots(specs=[[{"secondary_y": True}]])
 
+    has_trades  = ledger is not None and len(ledger) > 0
+    entry_times = ledger.times('entry_time') if has_trades else pd.DatetimeIndex([])
+    exit_times  = ledger.times('exit_time') if has_trades else pd.DatetimeIndex([])
+    trade_pnl   = ledger['pnl'] if has_trades else np.empty(0)
+    symbols     = ledger.labels('symbol') if has_trades else []
+    timeframes  = ledger.labels('timeframe') if has_trades else []
+
     # Einzel-Equity je Symbol/Timeframe (primaere Achse, duenn) -- eigene
     # Trade-Historie je Paar kumuliert, unabhaengig vom Gesamtportfolio.
-    by_symbol = {}
-    for t in trades:
-        key = f"{t.get('symbol', '?')}/{t.get('timeframe', '?')}"
-        by_symbol.setdefault(key, []).append(t)
-    for idx, key in enumerate(sorted(by_symbol)):
-        sym_trades = sorted(by_symbol[key], key=lambda t: str(t.get('entry_time', '')))
-        peq    = capital
-        ptimes = [sym_trades[0].get('entry_time', '')]
-        pvals  = [peq]
-        for t in sym_trades:
-            peq += t.get('pnl', 0.0)
-            ptimes.append(t.get('ts', t.get('entry_time', '')))
-            pvals.append(round(peq, 2))
-        fig.add_trace(go.Scatter(
-            x=ptimes, y=pvals, mode='lines', name=key,
+    pair_keys = [f"{s}/{tf}" for s, tf in zip(symbols, timeframes)]
+    curves = strategy_curves(pair_keys, ledger['entry_time'] if has_trades else [], trade_pnl, capital)
+    for idx, (key, (sel, curve)) in enumerate(curves.items()):
+        ptimes = entry_times[sel[:1]].append(exit_times[sel])
+        pvals  = np.concatenate(([capital], np.round(curve[1:], 2)))
+        keep   = _in_window(ptimes.asi8) if period else slice(None)
+        ptimes, pvals = downsample_line(ptimes[keep], pvals[keep], max_points)
+        if not len(pvals):
+            continue
+        fig.add_trace(go.Scattergl(
+            x=list(ptimes), y=pvals.tolist(), mode='lines', name=key,
             line=dict(color=PAIR_COLORS[idx % len(PAIR_COLORS)], width=1),
             opacity=0.55,
         ), secondary_y=False)
@@ -347,40 +357,53 @@ def generate_equity_html(final, capital, start_date, end_date, labels):
     fig.add_hline(y=capital, line=dict(color='rgba(100,100,100,0.35)', width=1, dash='dash'),
                   annotation_text=f'Start {capital:.0f} USDT', annotation_position='top left')
 
-    # Entry-/Exit-Marker auf der Portfolio-Equity (sekundaere Achse)
+    # Entry-/Exit-Marker auf der Portfolio-Equity (sekundaere Achse): naechster
+    # bekannter Portfolio-Equity-Wert zu einem Trade-Zeitpunkt, per
+    # searchsorted auf den ns-Zeitstempeln statt Series.asof() je Trade
+    # (stbot/analysis/equity_curve.py). Werte aus der vollen Kurve, nicht aus
+    # der reduzierten.
+    full_vals = eq_df['equity'].to_numpy(dtype='float64')
+
+    def _equity_at(times_ns):
+        return equity_at(eq_ns, full_vals, times_ns)
+
     entry_x, entry_y, entry_txt = [], [], []
     exit_win_x, exit_win_y   = [], []
     exit_loss_x, exit_loss_y = [], []
-    for t in trades:
-        try:
-            y_entry = float(eq_series.asof(pd.Timestamp(t.get('entry_time'))))
-            y_exit  = float(eq_series.asof(pd.Timestamp(t.get('ts'))))
-        except Exception:
-            continue
-        entry_x.append(t.get('entry_time')); entry_y.append(y_entry)
-        entry_txt.append(f"{t.get('symbol', '?')} {t.get('timeframe', '?')}<br>Equity: {y_entry:.2f} USDT")
-        if t.get('pnl', 0.0) >= 0:
-            exit_win_x.append(t.get('ts'));  exit_win_y.append(y_exit)
-        else:
-            exit_loss_x.append(t.get('ts')); exit_loss_y.append(y_exit)
-
-    fig.add_trace(go.Scatter(x=list(eq_times), y=eq_vals, mode='lines', name='Portfolio Equity',
-                             line=dict(color='#2563eb', width=2), opacity=0.75), secondary_y=True)
+    if has_trades:
+        entry_ns  = ledger['entry_time']
+        exit_ns   = ledger['exit_time']
+        show_in   = _in_window(entry_ns)
+        show_out  = _in_window(exit_ns)
+        y_entries = _equity_at(entry_ns[show_in])
+        y_exits   = _equity_at(exit_ns)
+        entry_x   = list(entry_times[show_in])
+        entry_y   = y_entries.tolist()
+        entry_txt = [f"{s} {tf}<br>Equity: {y:.2f} USDT" for s, tf, y in zip(
+            np.asarray(symbols, dtype=object)[show_in], np.asarray(timeframes, dtype=object)[show_in], entry_y)]
+        wins      = (trade_pnl >= 0) & show_out
+        losses    = (trade_pnl < 0) & show_out
+        exit_win_x,  exit_win_y  = list(exit_times[wins]),   y_exits[wins].tolist()
+        exit_loss_x, exit_loss_y = list(exit_times[losses]), y_exits[losses].tolist()
+
+    line_times, line_vals = downsample_line(eq_times, eq_vals, max_points)
+    fig.add_trace(go.Scattergl(x=list(line_times), y=line_vals.tolist(), mode='lines', name='Portfolio Equity',
+                               line=dict(color='#2563eb', width=2), opacity=0.75), secondary_y=True)
 
     if entry_x:
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=entry_x, y=entry_y, mode='markers',
             marker=dict(color='#16a34a', symbol='triangle-up', size=14, line=dict(width=1, color='#0f5132')),
             name='Entry ▲', text=entry_txt, hovertemplate='%{text}<extra>Entry</extra>',
         ), secondary_y=True)
     if exit_win_x:
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=exit_win_x, y=exit_win_y, mode='markers',
             marker=dict(color='#22d3ee', symbol='circle', size=11, line=dict(width=1, color='#0e7490')),
             name='Exit TP ✓',
         ), secondary_y=True)
     if exit_loss_x:
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=exit_loss_x, y=exit_loss_y, mode='markers',
             marker=dict(color='#ef4444', symbol='x', size=11, line=dict(width=2, color='#7f1d1d')),
             name='Exit SL ✗',
@@ -395,13 +418,32 @@ def generate_equity_html(final, capital, start_date, end_date, labels):
     fig.update_yaxes(title_text='Einzel-Equity (USDT)', secondary_y=False, fixedrange=False)
     fig.update_yaxes(title_text='Portfolio-Equity (USDT)', secondary_y=True, fixedrange=False)
 
-    outfile = f'/tmp/{BOT_NAME}_portfolio_equity.html'
+    suffix  = f"_{period[0]}" if period else ''
+    outfile = f'/tmp/{BOT_NAME}_portfolio_equity{suffix}.html'
     fig.write_html(outfile)
     print(f'  {G}✓ Chart erstellt: {outfile}{NC}')
     return outfile
 
 
-def _do_replot(settings: dict, capital: float, start_date: str, end_date: str) -> int:
+def generate_equity_reports(final, capital, start_date, end_date, labels,
+                            max_points=None, split_by=None):
+    """Gesamt-Chart plus (mit split_by 'Y'/'Q'/'M') je Zeitraum ein eigener
+    Chart in voller Punkt-Budget-Aufloesung. Rueckgabe: [(pfad, zeitraum)]."""
+    html = generate_equity_html(final, capital, start_date, end_date, labels, max_points)
+    if not html:
+        return []
+    reports = [(html, None)]
+    if split_by:
+        from stbot.analysis.chart_lod import period_bounds
+        for period in period_bounds(final.get('equity_curve')['timestamp'], split_by):
+            path = generate_equity_html(final, capital, start_date, end_date, labels, max_points, period)
+            if path:
+                reports.append((path, period[0]))
+    return reports
+
+
+def _do_replot(settings: dict, capital: float, start_date: str, end_date: str,
+               max_points=None, split_by=None) -> int:
     print(f"\n{'─'*72}")
     print(f"{B}  stbot — Replot (aktives Portfolio){NC}")
     print(f"  Kapital: {capital:.0f} USDT | Zeitraum: {start_date} → {end_date}")
@@ -467,9 +509,10 @@ def _do_replot(settings: dict, capital: float, start_date: str, end_date: str) -
     xlsx = generate_trades_excel(final, strategies_data, capital, start_date, end_date)
     if xlsx:
         _send_telegram_doc(xlsx, caption=f'{BOT_NAME} Trades | {n} Trades | WR: {wr:.1f}% | Equity: {eq:.2f} USDT')
-    html = generate_equity_html(final, capital, start_date, end_date, labels)
-    if html:
-        _send_telegram_doc(html, caption=f'{BOT_NAME} Portfolio-Equity | PnL: {pnl:+.1f}% | MaxDD: {dd:.1f}%')
+    for html, period in generate_equity_reports(final, capital, start_date, end_date, labels,
+                                                max_points, split_by):
+        _send_telegram_doc(html, caption=f'{BOT_NAME} Portfolio-Equity{f" {period}" if period else ""} | '
+                                         f'PnL: {pnl:+.1f}% | MaxDD: {dd:.1f}%')
     return 0
 
 
@@ -482,6 +525,23 @@ def main() -> int:
     parser.add_argument('--auto-write', action='store_true')
     parser.add_argument('--replot',     action='store_true',
                         help='Replot fuer aktives Portfolio (keine Re-Optimierung)')
+    parser.add_argument('--workers',    type=int,   default=None,
+                        help='Prozesse fuer die Kandidaten-Bewertung je Greedy-Runde (Standard: alle Kerne, 1 = sequentiell)')
+    # Beam-Suche statt reinem Greedy -- Standardwerte aus
+    # optimization_settings.portfolio_search (so nutzt auch der woechentliche
+    # auto_optimizer_scheduler.py-Lauf sie ohne eigene Argumente).
+    parser.add_argument('--beam-width',  type=int,   default=None,
+                        help='Teams je Runde, die weiter ausgebaut werden (1 = Greedy)')
+    parser.add_argument('--prune-slack', type=float, default=None,
+                        help='Toleranzfaktor der Wachstums-Heuristik fuer das Pruning -- nicht verlustfrei, kann das Ergebnis aendern (leer = kein Pruning)')
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help='Zeitbudget der Team-Suche in Minuten (leer = unbegrenzt)')
+    # Report-Charts: Punkt-Budget und Aufteilung je Zeitraum -- Standardwerte
+    # aus optimization_settings.report_charts
+    parser.add_argument('--chart-points', type=int,   default=None,
+                        help='Max. Punkte je Linie im Equity-Chart (0 = volle Aufloesung)')
+    parser.add_argument('--chart-split',  type=str,   default=None, choices=['Y', 'Q', 'M'],
+                        help='Zusaetzlich je Jahr/Quartal/Monat ein eigener Chart')
     args = parser.parse_args()
 
     with open(SETTINGS_PATH) as f:
@@ -503,13 +563,20 @@ def main() -> int:
         else:
             start_date = (date.today() - timedelta(days=DEFAULT_LOOKBACK_DAYS)).strftime('%Y-%m-%d')
     max_positions = int(settings.get('live_trading_settings', {}).get('max_open_positions', 10))
+    search        = opt.get('portfolio_search', {})
+    beam_width    = args.beam_width  or int(search.get('beam_width') or 1)
+    prune_slack   = args.prune_slack if args.prune_slack is not None else search.get('prune_slack')
+    time_budget   = args.time_budget if args.time_budget is not None else search.get('time_budget_minutes')
+    charts        = opt.get('report_charts', {})
+    chart_points  = args.chart_points if args.chart_points is not None else charts.get('max_points')
+    chart_split   = args.chart_split or charts.get('split_by')
 
     if args.replot:
-        return _do_replot(settings, capital, start_date, end_date)
+        return _do_replot(settings, capital, start_date, end_date, chart_points, chart_split)
 
     print(f"\n{'─'*72}")
     print(f"{B}  stbot — Automatische Portfolio-Optimierung{NC}")
-    print(f"  Greedy-Selektion mit echter Portfolio-Simulation (MaxDD ≤ {max_dd:.0f}%)")
+    print(f"  {'Greedy' if beam_width == 1 else f'Beam-Suche (Breite {beam_width})'}-Selektion mit echter Portfolio-Simulation (MaxDD ≤ {max_dd:.0f}%)")
     print(f"  Kapital: {capital:.0f} USDT | Positionen: max {max_positions} | "
           f"Zeitraum: {start_date} → {end_date}")
     print(f"{'─'*72}\n")
@@ -527,7 +594,10 @@ def main() -> int:
         return 1
 
     from stbot.analysis.portfolio_optimizer import run_portfolio_optimizer
-    result = run_portfolio_optimizer(capital, strategies_data, start_date, end_date, max_dd)
+    result = run_portfolio_optimizer(capital, strategies_data, start_date, end_date, max_dd,
+                                     max_workers=args.workers, beam_width=beam_width,
+                                     prune_slack=prune_slack,
+                                     time_budget_s=time_budget * 60 if time_budget else None)
 
     if not result or not result.get('optimal_portfolio'):
         print(f"{R}  Kein Portfolio erfuellt die Bedingungen (MaxDD ≤ {max_dd:.0f}%).{NC}\n")
@@ -609,9 +679,10 @@ def main() -> int:
         xlsx = generate_trades_excel(final, strategies_data, capital, start_date, end_date)
         if xlsx:
             _send_telegram_doc(xlsx, caption=f'{BOT_NAME} Trades | {n} Trades | WR: {wr:.1f}% | Equity: {eq:.2f} USDT')
-        html = generate_equity_html(final, capital, start_date, end_date, labels)
-        if html:
-            _send_telegram_doc(html, caption=f'{BOT_NAME} Portfolio-Equity | PnL: {pnl:+.1f}% | MaxDD: {dd:.1f}%')
+        for html, period in generate_equity_reports(final, capital, start_date, end_date, labels,
+                                                    chart_points, chart_split):
+            _send_telegram_doc(html, caption=f'{BOT_NAME} Portfolio-Equity{f" {period}" if period else ""} | '
+                                             f'PnL: {pnl:+.1f}% | MaxDD: {dd:.1f}%')
 
     return 0
 
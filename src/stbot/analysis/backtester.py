@@ -4,7 +4,6 @@ import pandas as pd
 import numpy as np
 import json
 import sys
-import bisect
 from tqdm import tqdm
 import ta
 import math
@@ -14,7 +13,8 @@ sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
 
 from stbot.utils.exchange import Exchange
 from stbot.strategy.sr_engine import SREngine # NEU
-from stbot.strategy.trade_logic import get_titan_signal
+from stbot.strategy.trade_logic import compute_titan_signals
+from stbot.analysis.trade_kernel import BarData, simulate_trades
 from stbot.utils.timeframe_utils import determine_htf
 
 secrets_cache = None
@@ -70,6 +70,14 @@ def _compute_htf_bias(data: pd.DataFrame, timeframe: str, htf: str, ema_period:
         return [], []
 
 
+def _bias_at(ts_ns, bias_times, bias_values):
+    """Bias-Wert je Kerze: Eintrag des letzten bias_times <= Kerzenzeit
+    (bisect_right - 1, vektorisiert), NEUTRAL davor."""
+    pos = np.searchsorted(pd.DatetimeIndex(bias_times).asi8, ts_ns, side='right') - 1
+    values = np.asarray(bias_values, dtype=object)
+    return np.where(pos >= 0, values[np.maximum(pos, 0)], Bias.NEUTRAL)
+
+
 # --- Regime-Klassifikation (TREND / RANGE / CHAOS), portiert aus superbots
 # regime_gate.py (Hurst+ADX-Kombination, dort bereits aus apexbot/pbot/mbot/
 # ltbbot-Ansaetzen konsolidiert und die Hurst-Formel dort schon korrigiert;
@@ -189,31 +197,6 @@ class LazyFineData:
         return df.loc[(df.index >= start_ts) & (df.index < end_ts)]
 
 
-def _get_fine_slice(fine_data, start_ts, end_ts):
-    """Liest ein Fein-Daten-Fenster aus -- akzeptiert sowohl einen bereits
-    komplett geladenen DataFrame (alte, eager Nutzung) als auch ein
-    LazyFineData-Objekt (neue, on-demand Nutzung), per Duck-Typing."""
-    if fine_data is None:
-        return None
-    if hasattr(fine_data, 'get_slice'):
-        return fine_data.get_slice(start_ts, end_ts)
-    return fine_data.loc[(fine_data.index >= start_ts) & (fine_data.index < end_ts)]
-
-
-def _build_fine_path(fine_slice):
-    """
-    Baut aus den feineren Kerzen innerhalb einer Coarse-Kerze eine granulare
-    Preis-Pfad-Liste (statt der 4-Punkte-Annaeherung [o,l,h,c]/[o,h,l,c] anhand
-    der Kerzenfarbe). Jede Fein-Kerze traegt ihrerseits [open, low/high in
-    Farbrichtung, close] bei -- deutlich naeher an der Realitaet als eine
-    einzelne Grobkerze.
-    """
-    path = []
-    for _, bar in fine_slice.iterrows():
-        o, h, l, c = bar['open'], bar['high'], bar['low'], bar['close']
-        path.extend([o, l, h, c] if c >= o else [o, h, l, c])
-    return path
-
 def load_data(symbol, timeframe, start_date_str, end_date_str, quiet=False):
     global secrets_cache
     data_dir = os.path.join(PROJECT_ROOT, 'data')
@@ -285,7 +268,13 @@ def load_data(symbol, timeframe, start_date_str, end_date_str, quiet=False):
     except Exception: return pd.DataFrame()
 
 
-def run_backtest(data, strategy_params, risk_params, start_capital=1000, verbose=False, fine_data=None, regime_data=None):
+def run_backtest(data, strategy_params, risk_params, start_capital=1000, verbose=False, fine_data=None, regime_data=None,
+                 return_trades=False, sr_zone_bars=None, sr_zone_history=False):
+    """return_trades=True: zusaetzlich 'trade_ledger' (TradeLedger) im Ergebnis.
+    sr_zone_bars: Kerzen-Positionen (z.B. [-1]) -> 'sr_zones' im Ergebnis, die
+    S/R-Zonen dieser Kerzen aus demselben SREngine-Durchlauf wie die Signale.
+    sr_zone_history=True: 'sr_zone_history' (Zonen-Intervalle, siehe
+    SREngine.process_dataframe) im Ergebnis."""
     if data.empty or len(data) < 100:
         return {"total_pnl_pct": -100, "trades_count": 0, "win_rate": 0, "max_drawdown_pct": 1.0, "end_capital": start_capital}
 
@@ -367,205 +356,54 @@ def run_backtest(data, strategy_params, risk_params, start_capital=1000, verbose
 
     # --- SREngine (Neu) ---
     engine = SREngine(settings=strategy_params)
-    processed_data = engine.process_dataframe(data)
-
-    current_capital = start_capital
-    peak_capital = start_capital
-    max_drawdown_pct = 0.0
-    trades_count = 0
-    wins_count = 0
-    position = None
-
-    # Parameter-Extraction
-    risk_reward_ratio = risk_params.get('risk_reward_ratio', 2.0)
-    risk_per_trade_pct = risk_params.get('risk_per_trade_pct', 1.0) / 100
-    activation_rr = risk_params.get('trailing_stop_activation_rr', 2.0)
-    callback_rate = risk_params.get('trailing_stop_callback_rate_pct', 1.0) / 100
-    leverage = risk_params.get('leverage', 10)
-    fee_pct = 0.06 / 100 # Bitget Taker ca.
-    atr_multiplier_sl = risk_params.get('atr_multiplier_sl', 2.0)
-    min_sl_pct = risk_params.get('min_sl_pct', 0.3) / 100.0
-
-    # Profit-Protection (optional, standardmaessig aus): schuetzt Gewinne, BEVOR
-    # der Trailing-Stop aktiviert. Ohne das faellt ein Trade, der z.B. 0.7R im
-    # Plus war und dann komplett zurueckdreht, auf den vollen urspruenglichen
-    # SL zurueck -- der zwischenzeitliche Gewinn ist ungeschuetzt.
-    breakeven_trigger_rr = risk_params.get('breakeven_trigger_rr', 0)  # 0 = aus
-    # Zweite, engere Trailing-Stufe ab einem hoeheren RR-Vielfachen -- sichert
-    # mehr vom Gewinn, wenn der Trend deutlich weiterlaeuft.
-    tight_trail_rr = risk_params.get('tight_trail_rr', 0)  # 0 = aus
-    tight_callback_rate = risk_params.get('tight_callback_rate_pct', 0) / 100
-
-    absolute_max_notional_value = 1000000
-    
+    processed_data = engine.process_dataframe(data, zone_bars=sr_zone_bars, zone_history=sr_zone_history)
+
+    # --- Einstiegssignale fuer alle Kerzen auf einmal ---
+    # compute_titan_signals() bildet get_titan_signal() exakt ab (NEUTRALER
+    # Bias); der HTF-Bias und die optionalen Filter werden danach je Kerze als
+    # Maske angewendet -- statt iterrows() + get_titan_signal() je Kerze.
     params_for_logic = {"strategy": strategy_params, "risk": risk_params}
+    sides = compute_titan_signals(processed_data, params_for_logic, Bias.NEUTRAL)
+    ts_ns = processed_data.index.asi8
+
+    if htf_bias_times:
+        # HTF-Bias des letzten abgeschlossenen HTF-Balkens (kein Look-Ahead)
+        bias = _bias_at(ts_ns, htf_bias_times, htf_bias_values)
+        sides[(bias == Bias.BULLISH) & (sides == -1)] = 0
+        sides[(bias == Bias.BEARISH) & (sides == 1)] = 0
+
+    if use_avalanche_filter:
+        threshold = strategy_params.get('avalanche_percentile_threshold', 60)
+        sides[~(processed_data['avalanche_percentile'].to_numpy(dtype='float64') > threshold)] = 0
+
+    if use_energy_filter:
+        min_ez = strategy_params.get('min_energy_zscore', 0.0)
+        sides[~(processed_data['energy_zscore'].to_numpy(dtype='float64') > min_ez)] = 0
 
-    coarse_duration = processed_data.index[1] - processed_data.index[0] if len(processed_data.index) >= 2 else None
-    iterator = processed_data.iterrows()
-
-    for timestamp, current_candle in iterator:
-        if current_capital <= 0: break
-
-        # --- Positions-Management ---
-        # Live platziert KEINE feste TP-Order (siehe trade_manager.py) - nur ein harter SL-Trigger
-        # und ein Trailing-Stop (Aktivierung bei activation_rr, Rueckzug bei callback_rate).
-        # Die frueher hier simulierte statische TP-Order existiert live nicht und wurde entfernt
-        # (Live-vs-Backtest-Analyse 2026-07-30 zeigte dadurch stark ueberzeichnete Backtest-PnL).
-        if position:
-            o, h, l, c = current_candle['open'], current_candle['high'], current_candle['low'], current_candle['close']
-            # Intracandle-Pfad: bevorzugt aus echten feineren Kerzen aufgebaut (oraclebot-Muster),
-            # sonst Fallback auf die alte 4-Punkte-Annaeherung anhand der Kerzenfarbe.
-            path = None
-            if fine_data is not None and coarse_duration is not None:
-                fine_slice = _get_fine_slice(fine_data, timestamp, timestamp + coarse_duration)
-                if fine_slice is not None and not fine_slice.empty:
-                    path = _build_fine_path(fine_slice)
-            if not path:
-                path = [o, l, h, c] if c >= o else [o, h, l, c]
-
-            exit_price = None
-            for p in path:
-                if position['side'] == 'long':
-                    if p <= position['stop_loss']:
-                        exit_price = position['stop_loss']
-                        break
-                    if (breakeven_trigger_rr > 0 and not position['breakeven_done']
-                            and p >= position['entry_price'] + position['sl_dist'] * breakeven_trigger_rr):
-                        position['stop_loss'] = max(position['stop_loss'], position['entry_price'])
-                        position['breakeven_done'] = True
-                    if not position['trailing_active'] and p >= position['activation_price']:
-                        position['trailing_active'] = True
-                        position['peak_price'] = p
-                    if position['trailing_active']:
-                        position['peak_price'] = max(position['peak_price'], p)
-                        active_callback = callback_rate
-                        if tight_trail_rr > 0 and p >= position['entry_price'] + position['sl_dist'] * tight_trail_rr:
-                            active_callback = tight_callback_rate
-                        trail_level = position['peak_price'] * (1 - active_callback)
-                        if p <= trail_level:
-                            exit_price = trail_level
-                            break
-                else:
-                    if p >= position['stop_loss']:
-                        exit_price = position['stop_loss']
-                        break
-                    if (breakeven_trigger_rr > 0 and not position['breakeven_done']
-                            and p <= position['entry_price'] - position['sl_dist'] * breakeven_trigger_rr):
-                        position['stop_loss'] = min(position['stop_loss'], position['entry_price'])
-                        position['breakeven_done'] = True
-                    if not position['trailing_active'] and p <= position['activation_price']:
-                        position['trailing_active'] = True
-                        position['peak_price'] = p
-                    if position['trailing_active']:
-                        position['peak_price'] = min(position['peak_price'], p)
-                        active_callback = callback_rate
-                        if tight_trail_rr > 0 and p <= position['entry_price'] - position['sl_dist'] * tight_trail_rr:
-                            active_callback = tight_callback_rate
-                        trail_level = position['peak_price'] * (1 + active_callback)
-                        if p >= trail_level:
-                            exit_price = trail_level
-                            break
-
-            if exit_price:
-                pnl_pct = (exit_price / position['entry_price'] - 1) if position['side'] == 'long' else (1 - exit_price / position['entry_price'])
-                notional_value = position['notional_value']
-                pnl_usd = notional_value * pnl_pct
-                total_fees = notional_value * fee_pct * 2
-                current_capital += (pnl_usd - total_fees)
-                if (pnl_usd - total_fees) > 0: wins_count += 1
-                trades_count += 1
-                position = None
-                peak_capital = max(peak_capital, current_capital)
-                if peak_capital > 0:
-                    drawdown = (peak_capital - current_capital) / peak_capital
-                    max_drawdown_pct = max(max_drawdown_pct, drawdown)
-                continue  # Kein Re-Entry auf derselben Kerze nach Trade-Schluss
-
-        # --- Einstiegs-Logik ---
-        if not position and current_capital > 0:
-            # Slicing ist teuer, aber notwendig für korrekte Simulation, wenn Logik Historie braucht.
-            # Für reine Indikator-basierte Signale wie 'sr_signal' reicht current_candle oft.
-            # Wir nutzen hier slice für Kompatibilität.
-            
-            # HTF-Bias per bisect auf den letzten abgeschlossenen HTF-Balken (kein
-            # Look-Ahead) -- NEUTRAL, wenn Filter aus oder Bias nicht berechenbar.
-            market_bias = Bias.NEUTRAL
-            if htf_bias_times:
-                _pos = bisect.bisect_right(htf_bias_times, timestamp) - 1
-                if _pos >= 0:
-                    market_bias = htf_bias_values[_pos]
-
-            # data_slice = processed_data.loc[:timestamp] # Performance-Killer
-            # Stattdessen:
-            
-            side, price = get_titan_signal(processed_data, current_candle, params_for_logic, market_bias)
-
-            if side and use_avalanche_filter:
-                threshold = strategy_params.get('avalanche_percentile_threshold', 60)
-                cur_val = current_candle.get('avalanche_percentile', np.nan)
-                if not (pd.notna(cur_val) and cur_val > threshold):
-                    side = None
-
-            if side and use_energy_filter:
-                min_ez = strategy_params.get('min_energy_zscore', 0.0)
-                cur_ez = current_candle.get('energy_zscore', np.nan)
-                if not (pd.notna(cur_ez) and cur_ez > min_ez):
-                    side = None
-
-            if side and use_energy_streak_filter:
-                cur_streak = current_candle.get('energy_rising_streak', False)
-                if not bool(cur_streak):
-                    side = None
-
-            if side and use_weekly_trend_filter and weekly_bias_times:
-                apply_trend_filter = True
-                if use_regime_gate and regime_times:
-                    _rpos = bisect.bisect_right(regime_times, timestamp) - 1
-                    apply_trend_filter = _rpos >= 0 and regime_values[_rpos] == "TREND"
-                if apply_trend_filter:
-                    _wpos = bisect.bisect_right(weekly_bias_times, timestamp) - 1
-                    if _wpos >= 0:
-                        weekly_bias = weekly_bias_values[_wpos]
-                        if weekly_bias == Bias.BEARISH and side == 'buy':
-                            side = None
-                        elif weekly_bias == Bias.BULLISH and side == 'sell':
-                            side = None
-
-            if side:
-                entry_price = current_candle['close']
-                current_atr = current_candle.get('atr', 0)
-                if current_atr <= 0: continue
-
-                sl_dist = max(current_atr * atr_multiplier_sl, entry_price * min_sl_pct)
-                risk_amount_usd = current_capital * risk_per_trade_pct
-                sl_pct = sl_dist / entry_price
-                if sl_pct <= 0: continue
-
-                calc_notional = risk_amount_usd / sl_pct
-                max_notional = current_capital * 10 # Hardcap effektiver Hebel
-                final_notional = min(calc_notional, max_notional, absolute_max_notional_value)
-
-                margin_needed = final_notional / leverage
-                if margin_needed > current_capital: continue
-
-                if side == 'buy':
-                    sl = entry_price - sl_dist
-                    tp = entry_price + sl_dist * risk_reward_ratio
-                    act = entry_price + sl_dist * activation_rr
-                else:
-                    sl = entry_price + sl_dist
-                    tp = entry_price - sl_dist * risk_reward_ratio
-                    act = entry_price - sl_dist * activation_rr
-
-                position = {
-                    'side': 'long' if side == 'buy' else 'short',
-                    'entry_price': entry_price, 'stop_loss': sl,
-                    'take_profit': tp, 'margin_used': margin_needed,
-                    'notional_value': final_notional,
-                    'trailing_active': False, 'activation_price': act,
-                    'peak_price': entry_price,
-                    'sl_dist': sl_dist, 'breakeven_done': False,
-                }
+    if use_energy_streak_filter:
+        sides[~processed_data['energy_rising_streak'].to_numpy(dtype=bool)] = 0
+
+    if use_weekly_trend_filter and weekly_bias_times:
+        apply_trend_filter = np.ones(len(sides), dtype=bool)
+        if use_regime_gate and regime_times:
+            apply_trend_filter = _bias_at(ts_ns, regime_times, regime_values) == "TREND"
+        weekly_bias = _bias_at(ts_ns, weekly_bias_times, weekly_bias_values)
+        sides[apply_trend_filter & (weekly_bias == Bias.BEARISH) & (sides == 1)] = 0
+        sides[apply_trend_filter & (weekly_bias == Bias.BULLISH) & (sides == -1)] = 0
+
+    # --- Simulation (gemeinsamer Kern, siehe trade_kernel.py) ---
+    # Live platziert KEINE feste TP-Order (siehe trade_manager.py) - nur ein harter SL-Trigger
+    # und ein Trailing-Stop (Aktivierung bei activation_rr, Rueckzug bei callback_rate).
+    # Die frueher hier simulierte statische TP-Order existiert live nicht und wurde entfernt
+    # (Live-vs-Backtest-Analyse 2026-07-30 zeigte dadurch stark ueberzeichnete Backtest-PnL).
+    # Intracandle-Pfad: bevorzugt aus echten feineren Kerzen aufgebaut (oraclebot-Muster),
+    # sonst Fallback auf die alte 4-Punkte-Annaeherung anhand der Kerzenfarbe.
+    bars = BarData(processed_data, fine_data)
+    sim = simulate_trades(bars, sides, processed_data['atr'], risk_params, start_capital,
+                          strategy=(f"{symbol}_{timeframe}", symbol, timeframe))
+    current_capital = sim['capital']
+    trades_count, wins_count = sim['trades_count'], sim['wins_count']
+    max_drawdown_pct = sim['max_drawdown_pct']
 
     win_rate = (wins_count / trades_count * 100) if trades_count > 0 else 0
     final_pnl_pct = ((current_capital - start_capital) / start_capital) * 100 if start_capital > 0 else 0
@@ -574,5 +412,8 @@ def run_backtest(data, strategy_params, risk_params, start_capital=1000, verbose
     return {
         "total_pnl_pct": final_pnl_pct, "trades_count": trades_count,
         "win_rate": win_rate, "max_drawdown_pct": max_drawdown_pct,
-        "end_capital": final_capital
+        "end_capital": final_capital,
+        **({"trade_ledger": sim['ledger']} if return_trades else {}),
+        **({"sr_zones": engine.zone_snapshots} if sr_zone_bars else {}),
+        **({"sr_zone_history": engine.zone_history} if sr_zone_history else {}),
     }
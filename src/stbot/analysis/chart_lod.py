@@ -0,0 +1,102 @@
+# src/stbot/analysis/chart_lod.py
+"""
+Level-of-Detail fuer die Plotly-HTML-Reports (run_portfolio_optimizer.
+generate_equity_html, interactive_status.create_interactive_chart).
+
+Bisher landete jede Kerze und jeder Equity-Punkt im HTML -- ein mehrjaehriger
+15m-Chart hat >100k Kerzen, die Datei wurde zig MB gross, write_html dauerte
+entsprechend, send_document (Telegram, 50 MB Limit) schlug teils fehl und der
+Browser ruckelte. Ein Bildschirm zeigt ohnehin nur wenige tausend Pixel Breite.
+
+Jetzt richtet sich die Punktzahl nach einem Budget (max_points), nicht nach
+der Laenge der Historie:
+- Linien (Equity-Kurven): LTTB (Largest-Triangle-Three-Buckets) -- behaelt
+  Spitzen und Taeler (Drawdowns bleiben sichtbar), erster/letzter Punkt exakt.
+- Kerzen: je k aufeinanderfolgende Kerzen zu einer OHLC-Kerze zusammengefasst
+  (open first, high max, low min, close last) -- Min/Max jedes Buckets bleibt
+  erhalten, es geht kein Docht verloren.
+- Trade-Marker bleiben vollstaendig (Zeit/Preis exakt), Linien und Marker
+  werden als WebGL-Traces (Scattergl) gezeichnet.
+- Optional je Zeitraum (Jahr/Quartal/Monat) ein eigener Chart (period_bounds),
+  jeder mit dem vollen Budget.
+max_points = 0/None schaltet das Downsampling ab (volle Aufloesung wie bisher).
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_POINTS = 5000
+
+SPLIT_FREQS = {'Y': 'Y', 'Q': 'Q', 'M': 'M'}
+
+
+def lttb_indices(x, y, n_out):
+    """Indizes der per LTTB ausgewaehlten Punkte (aufsteigend, inkl. erstem/letztem)."""
+    n = len(x)
+    if not n_out or n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    # n_out - 2 Buckets ueber die inneren Punkte [1, n - 1)
+    edges = np.linspace(1, n - 1, n_out - 1).astype('int64')
+    out = np.empty(n_out, dtype='int64')
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Mittelwert des naechsten Buckets (beim letzten: der letzte Punkt)
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample_line(times, values, max_points=DEFAULT_MAX_POINTS):
+    """(times, values) auf hoechstens max_points Punkte (LTTB); Listen/Index wie Eingabe."""
+    times = pd.DatetimeIndex(times) if not isinstance(times, pd.DatetimeIndex) else times
+    values = np.asarray(values, dtype='float64')
+    if not max_points or len(values) <= max_points:
+        return times, values
+    idx = lttb_indices(times.asi8.astype('float64'), values, max_points)
+    return times[idx], values[idx]
+
+
+def downsample_ohlc(df, max_points=DEFAULT_MAX_POINTS):
+    """
+    Fasst je k = ceil(len/max_points) aufeinanderfolgende Kerzen zusammen
+    (Zeitstempel = erste Kerze des Buckets). Rueckgabe: (frame, k).
+    """
+    n = len(df)
+    if not max_points or n <= max_points:
+        return df, 1
+    k = -(-n // max_points)
+    starts = np.arange(0, n, k)
+    ends = np.minimum(starts + k, n) - 1
+    out = pd.DataFrame({
+        'open': df['open'].to_numpy()[starts],
+        'high': np.maximum.reduceat(df['high'].to_numpy(), starts),
+        'low': np.minimum.reduceat(df['low'].to_numpy(), starts),
+        'close': df['close'].to_numpy()[ends],
+    }, index=df.index[starts])
+    return out, k
+
+
+def period_bounds(times, split_by):
+    """
+    [(label, start, end)] je Kalender-Zeitraum ('Y', 'Q', 'M'), in dem es
+    Zeitstempel gibt; start/end sind der erste/letzte Zeitstempel darin.
+    """
+    freq = SPLIT_FREQS.get(str(split_by).upper())
+    if freq is None:
+        raise ValueError(f"Unbekannter Zeitraum '{split_by}' (erlaubt: {', '.join(SPLIT_FREQS)})")
+    times = pd.DatetimeIndex(times)
+    if not len(times):
+        return []
+    naive = times.tz_convert(None) if times.tz is not None else times
+    periods = naive.to_period(freq)
+    codes = periods.asi8
+    cuts = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.concatenate(([0], cuts))
+    ends = np.concatenate((cuts, [len(times)])) - 1
+    return [(str(periods[s]), times[s], times[e]) for s, e in zip(starts, ends)]
@@ -0,0 +1,108 @@
+# src/stbot/analysis/equity_curve.py
+"""
+Gemeinsame, vektorisierte Equity-Helfer fuer die Report-Charts
+(show_results._generate_portfolio_chart, interactive_status.build_equity_curve,
+run_portfolio_optimizer.generate_equity_html).
+
+Bisher suchte _generate_portfolio_chart die Equity zu jedem Trade per
+eq_df[eq_df['timestamp'] <= ts] -- ein Filter ueber die ganze Kurve je Trade,
+O(Trades x Kerzen); bei tausend Trades auf einer mehrjaehrigen 1h-Kurve dauerte
+allein das zig Sekunden. build_equity_curve lief per df.iterrows() ueber jede
+Kerze, die Einzel-Kurven je Strategie per Python-Schleife.
+
+Jetzt arbeitet alles auf int64-ns-Zeitstempeln:
+- equity_at: letzter bekannter Kurvenwert zu beliebig vielen Zeitpunkten per
+  np.searchsorted (O(Trades x log Kerzen)).
+- cumulative_equity: Startkapital + laufende Summe der PnLs. np.cumsum addiert
+  streng nacheinander -- die Werte sind bitgleich zur frueheren Schleife
+  "equity += pnl".
+- step_equity: Equity je Kerze aus Trade-Exits (Exit <= Kerzenzeit zaehlt).
+- window_stats: Titel-Kennzahlen eines Zeitraum-Charts (Start-/End-Equity,
+  Drawdown und Trades nur innerhalb des Fensters).
+"""
+import numpy as np
+import pandas as pd
+
+
+def to_ns(times):
+    """
+    Zeitstempel (Strings, datetime-Series, DatetimeIndex) als int64-ns (UTC).
+    Zeitzonen-lose Werte werden als UTC gelesen -- Vergleiche zwischen zwei so
+    umgerechneten Reihen entsprechen damit dem direkten Timestamp-Vergleich.
+    """
+    if len(times) == 0:
+        return np.empty(0, dtype='int64')
+    return pd.DatetimeIndex(pd.to_datetime(times, utc=True)).asi8
+
+
+def equity_at(curve_ns, curve_values, query_ns, default=np.nan):
+    """Letzter Kurvenwert mit Zeit <= Abfragezeit; davor `default`."""
+    curve_values = np.asarray(curve_values, dtype='float64')
+    pos = np.searchsorted(curve_ns, query_ns, side='right') - 1
+    if not len(curve_values):
+        return np.full(len(pos), default, dtype='float64')
+    return np.where(pos >= 0, curve_values[np.maximum(pos, 0)], default)
+
+
+def cumulative_equity(pnls, start_capital):
+    """[Startkapital, nach Trade 1, nach Trade 2, ...] (Laenge len(pnls) + 1)."""
+    steps = np.empty(len(pnls) + 1, dtype='float64')
+    steps[0] = start_capital
+    steps[1:] = pnls
+    return np.cumsum(steps)
+
+
+def step_equity(bar_ns, event_ns, pnls, start_capital):
+    """
+    Equity je Kerze: Startkapital plus alle PnLs, deren Zeitpunkt <= der
+    Kerzenzeit liegt (Trades in zeitlicher Reihenfolge, stabil sortiert).
+    """
+    event_ns = np.asarray(event_ns, dtype='int64')
+    order = np.argsort(event_ns, kind='stable')
+    curve = cumulative_equity(np.asarray(pnls, dtype='float64')[order], start_capital)
+    return curve[np.searchsorted(event_ns[order], bar_ns, side='right')]
+
+
+def strategy_curves(keys, times_ns, pnls, start_capital):
+    """
+    Einzel-Kurven je Strategie: {key: (idx, werte)} mit idx = Trade-Indizes in
+    zeitlicher Reihenfolge und werte = cumulative_equity dieser Trades.
+    """
+    keys = np.asarray(keys, dtype=object)
+    times_ns = np.asarray(times_ns, dtype='int64')
+    pnls = np.asarray(pnls, dtype='float64')
+    curves = {}
+    for key in sorted(set(keys.tolist())):
+        sel = np.flatnonzero(keys == key)
+        sel = sel[np.argsort(times_ns[sel], kind='stable')]
+        curves[key] = (sel, cumulative_equity(pnls[sel], start_capital))
+    return curves
+
+
+def window_stats(curve_ns, curve_values, lo_ns, hi_ns, trade_pnls, start_default):
+    """
+    Kennzahlen fuer einen Zeitraum-Chart [lo_ns, hi_ns] statt des ganzen Laufs:
+    start = letzter Kurvenwert VOR dem Fenster (sonst start_default), end =
+    letzter Wert im Fenster, Drawdown nur innerhalb des Fensters (Peak ab
+    start). trade_pnls: PnLs der im Fenster geschlossenen Trades.
+    Rueckgabe: {start_capital, end_capital, total_pnl_pct, max_drawdown_pct
+    (Prozent), trade_count, win_rate}.
+    """
+    curve_ns = np.asarray(curve_ns, dtype='int64')
+    curve_values = np.asarray(curve_values, dtype='float64')
+    start = float(equity_at(curve_ns, curve_values, np.array([lo_ns - 1], dtype='int64'), start_default)[0])
+    inside = curve_values[(curve_ns >= lo_ns) & (curve_ns <= hi_ns)]
+    end = float(inside[-1]) if len(inside) else start
+    values = np.concatenate(([start], inside))
+    peak = np.maximum.accumulate(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = np.where(peak > 0, (peak - values) / peak, 0.0)
+    trade_pnls = np.asarray(trade_pnls, dtype='float64')
+    return {
+        'start_capital': start,
+        'end_capital': end,
+        'total_pnl_pct': (end / start - 1) * 100 if start > 0 else 0.0,
+        'max_drawdown_pct': float(drawdown.max()) * 100,
+        'trade_count': len(trade_pnls),
+        'win_rate': float((trade_pnls > 0).mean() * 100) if len(trade_pnls) else 0.0,
+    }
@@ -0,0 +1,103 @@
+# src/stbot/analysis/excel_report.py
+"""
+Streamender Excel-Writer fuer die Trade-Reports
+(run_portfolio_optimizer.generate_trades_excel, show_results._generate_trades_excel).
+
+Bisher bauten beide Reports erst eine Liste von Zeilen-Dicts fuer ALLE Trades
+(show_results zusaetzlich ueber die komplette trade_history-Dict-Liste), dann
+ein normales openpyxl-Workbook, in dem jede Zelle ein Python-Objekt mit eigenem
+Fill/Border/Alignment ist -- bei grossen Multi-Strategie-Reports mehrere
+hundert MB auf dem kleinen VPS des Schedulers.
+
+Jetzt:
+- openpyxl im write-only-Modus: Zeilen werden beim append() direkt in die
+  (temporaere) Sheet-XML geschrieben, der Speicher bleibt konstant.
+- Die Zeilen kommen aus einem Iterator (die Reports lesen den TradeLedger
+  blockweise, TradeLedger.iter_chunks) -- es existiert nie eine Zeilen-Liste.
+- Formatierung ueber benannte Zell-Stile (ein Stil je Zeilenfarbe und
+  Zahl/Text) statt Fill/Border/Alignment-Objekten je Zelle; Zeilenhoehe als
+  Sheet-Default statt je Zeile.
+- Die Zusammenfassung steht auf einem eigenen Blatt 'Zusammenfassung', das
+  erst nach der letzten Trade-Zeile angelegt wird (summary ist ein Callable)
+  -- Kennzahlen wie Win-Rate/Endkapital sammelt der Zeilen-Iterator
+  unterwegs. Bisher stand sie zwei Zeilen unter der Tabelle; im write-only-
+  Modus laesst sich aber nichts vor bereits gestreamte Zeilen schreiben, und
+  ein eigenes Blatt haelt die Trade-Tabelle filter-/sortierbar.
+Spalten, Farben und Zahlenformat der Trade-Tabelle sind unveraendert.
+"""
+
+ROW_STYLES = {'win': 'D6F4DC', 'loss': 'FAD7D7', 'alt': 'F2F2F2'}
+HEADER_COLOR = '1E3A5F'
+NUMBER_FORMAT = '#,##0.0000'
+ROW_HEIGHT = 18
+HEADER_HEIGHT = 22
+SUMMARY_TITLE = 'Zusammenfassung'
+
+
+def _register_styles(wb):
+    from openpyxl.styles import NamedStyle, PatternFill, Font, Alignment, Border, Side
+
+    side = Side(style='thin', color='CCCCCC')
+    border = Border(left=side, right=side, top=side, bottom=side)
+    center = Alignment(horizontal='center', vertical='center')
+    header = NamedStyle(name='trade_header', font=Font(bold=True, color='FFFFFF', size=11),
+                        fill=PatternFill('solid', fgColor=HEADER_COLOR), border=border, alignment=center)
+    wb.add_named_style(header)
+    for key, color in ROW_STYLES.items():
+        for numeric in (False, True):
+            style = NamedStyle(name=f'trade_{key}{"_num" if numeric else ""}',
+                               fill=PatternFill('solid', fgColor=color), border=border, alignment=center)
+            if numeric:
+                style.number_format = NUMBER_FORMAT
+            wb.add_named_style(style)
+
+
+def write_trade_workbook(path, columns, rows, summary, sheet_title='Trades'):
+    """
+    Schreibt die Trade-Tabelle streamend nach `path`.
+
+    columns: [(ueberschrift, breite, numerisch)]
+    rows:    Iterator von (stil, werte) mit stil in ROW_STYLES ('win'/'loss'/'alt')
+    summary: Callable ohne Argumente -> [(label, wert)], aufgerufen nach der
+             letzten Zeile; landet auf dem Blatt 'Zusammenfassung'.
+    Rueckgabe: Anzahl geschriebener Trade-Zeilen.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    _register_styles(wb)
+    ws = wb.create_sheet(sheet_title)
+    for c, (_, width, _) in enumerate(columns, 1):
+        ws.column_dimensions[get_column_letter(c)].width = width
+    ws.sheet_format.defaultRowHeight = ROW_HEIGHT
+    ws.sheet_format.customHeight = True
+    ws.row_dimensions[1].height = HEADER_HEIGHT
+
+    def _cell(sheet, value, style=None, font=None):
+        cell = WriteOnlyCell(sheet, value=value)
+        if style is not None:
+            cell.style = style
+        if font is not None:
+            cell.font = font
+        return cell
+
+    ws.append([_cell(ws, name, 'trade_header') for name, _, _ in columns])
+    numeric = [num for _, _, num in columns]
+    count = 0
+    for style, values in rows:
+        ws.append([_cell(ws, v, f'trade_{style}_num' if num else f'trade_{style}')
+                   for v, num in zip(values, numeric)])
+        count += 1
+
+    summary_ws = wb.create_sheet(SUMMARY_TITLE)
+    summary_ws.column_dimensions['A'].width = 18
+    summary_ws.column_dimensions['B'].width = 22
+    bold = Font(bold=True)
+    summary_ws.append([_cell(summary_ws, SUMMARY_TITLE, font=Font(bold=True, size=11))])
+    for label, value in summary():
+        summary_ws.append([_cell(summary_ws, label, font=bold), value])
+    wb.save(path)
+    return count
@@ -27,6 +27,8 @@ sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
 
 from stbot.strategy.sr_engine import SREngine
 from stbot.analysis.backtester import load_data, run_backtest, FINE_TF_MAP, LazyFineData
+from stbot.analysis.equity_curve import to_ns, step_equity, window_stats
+from stbot.analysis.chart_lod import DEFAULT_MAX_POINTS, downsample_line, downsample_ohlc, period_bounds
 
 logger = logging.getLogger('interactive_status')
 if not logger.handlers:
@@ -95,94 +97,14 @@ def compute_last_sr_zones(df: pd.DataFrame, config: dict) -> list:
     """
     Berechnet die aktuellen S/R-Zonen (letzter Zustand) fuer die Chart-Darstellung.
     Gibt eine Liste von {'hi': float, 'lo': float, 'strength': int} zurueck.
+
+    Nutzt SREngine.zones_at() -- frueher eine komplette Kopie des Pivot-/
+    Zonen-Algorithmus, die die O(n*p^2)-Schleife ueber die ganze Historie lief,
+    nur um den letzten Zonen-Satz zu behalten. main() holt die Zonen direkt
+    aus dem Backtest-Durchlauf (run_backtest(..., sr_zone_bars=[-1])).
     """
     try:
-        settings = config.get('strategy', {})
-        prd = settings.get('pivot_period', 10)
-        ppsrc = settings.get('source', 'High/Low')
-        maxnumpp = settings.get('max_pivots', 20)
-        channel_w_pct = settings.get('channel_width_pct', 10)
-        maxnumsr = settings.get('max_sr_levels', 5)
-        min_strength = settings.get('min_strength', 2)
-
-        df = df.copy()
-        src1 = df['high'] if ppsrc == 'High/Low' else df[['open', 'close']].max(axis=1)
-        src2 = df['low'] if ppsrc == 'High/Low' else df[['open', 'close']].min(axis=1)
-
-        window = 2 * prd + 1
-        max_roll = src1.rolling(window=window, center=True).max()
-        min_roll = src2.rolling(window=window, center=True).min()
-        ph_confirmed = (src1 == max_roll).shift(prd).fillna(False).astype(bool)
-        pl_confirmed = (src2 == min_roll).shift(prd).fillna(False).astype(bool)
-        ph_val = src1.shift(prd)
-        pl_val = src2.shift(prd)
-
-        if 'atr' in df.columns:
-            cwidths = df['atr'] * (channel_w_pct / 10.0)
-        else:
-            h300 = df['high'].rolling(300, min_periods=50).max()
-            l300 = df['low'].rolling(300, min_periods=50).min()
-            cwidths = (h300 - l300) * channel_w_pct / 100
-
-        closes = df['close'].values
-        idx_ph = ph_confirmed.values
-        idx_pl = pl_confirmed.values
-        val_ph = ph_val.values
-        val_pl = pl_val.values
-        arr_cw = cwidths.fillna(0).values
-
-        pivotvals = []
-        final_zones = []
-
-        for i in range(len(df)):
-            new_val = None
-            if idx_ph[i]:
-                new_val = val_ph[i]
-            elif idx_pl[i]:
-                new_val = val_pl[i]
-            if new_val is not None and not np.isnan(new_val):
-                pivotvals.insert(0, new_val)
-                if len(pivotvals) > maxnumpp:
-                    pivotvals.pop()
-
-            if not pivotvals:
-                continue
-
-            cw = arr_cw[i]
-            if cw == 0 and i > 50:
-                cw = closes[i] * 0.01
-
-            temp = []
-            for p_ref in pivotvals:
-                lo, hi, strength = p_ref, p_ref, 0
-                for p_comp in pivotvals:
-                    wdth = hi - p_comp if p_comp <= lo else p_comp - lo
-                    if wdth <= cw:
-                        lo = min(lo, p_comp)
-                        hi = max(hi, p_comp)
-                        strength += 1
-                temp.append({'hi': hi, 'lo': lo, 'strength': strength})
-
-            temp.sort(key=lambda x: x['strength'], reverse=True)
-            zones = []
-            for z in temp:
-                if z['strength'] < min_strength:
-                    continue
-                overlap = any(
-                    (ex['hi'] >= z['lo'] and ex['hi'] <= z['hi']) or
-                    (ex['lo'] >= z['lo'] and ex['lo'] <= z['hi']) or
-                    (z['hi'] >= ex['lo'] and z['hi'] <= ex['hi'])
-                    for ex in zones
-                )
-                if not overlap:
-                    zones.append(z)
-                    if len(zones) >= maxnumsr:
-                        break
-
-            final_zones = zones  # behalte letzten Zustand
-
-        return final_zones
-
+        return SREngine(settings=config.get('strategy', {})).zones_at(df, [-1])[0]
     except Exception as e:
         logger.warning(f"Fehler bei S/R Zonen-Berechnung: {e}")
         return []
@@ -192,113 +114,46 @@ def compute_last_sr_zones(df: pd.DataFrame, config: dict) -> list:
 # Trades aus Backtest extrahieren (fuer Chart-Markierungen)
 # ---------------------------------------------------------------------------
 
-def extract_trades(df: pd.DataFrame, config: dict, start_capital: float = 1000) -> list:
+def ledger_to_trades(ledger) -> list:
+    """TradeLedger (run_backtest(..., return_trades=True)) -> Trade-Liste fuer
+    den Chart: {side, entry_time, entry_price, exit_time, exit_price, pnl_usd}."""
+    if ledger is None or not len(ledger):
+        return []
+    return [
+        {'side': 'long' if direction == 1 else 'short',
+         'entry_time': entry_time, 'entry_price': entry_price,
+         'exit_time': exit_time, 'exit_price': exit_price, 'pnl_usd': pnl}
+        for direction, entry_time, entry_price, exit_time, exit_price, pnl in zip(
+            ledger['direction'].tolist(), ledger.times('entry_time'), ledger['entry'].tolist(),
+            ledger.times('exit_time'), ledger['exit'].tolist(), ledger['pnl'].tolist())
+    ]
+
+
+def _strategy_params(config: dict) -> dict:
+    market = config.get('market', {})
+    return {**config.get('strategy', {}),
+            'symbol': market.get('symbol', ''), 'timeframe': market.get('timeframe', ''),
+            'htf': market.get('htf')}
+
+
+def extract_trades(df: pd.DataFrame, config: dict, start_capital: float = 1000, fine_data=None) -> list:
     """
     Fuehrt einen simulierten Backtest durch und gibt die Trades als Liste zurueck.
     Jeder Trade: {side, entry_time, entry_price, exit_time, exit_price, pnl_usd}
+
+    Laeuft ueber run_backtest() (gemeinsamer Simulations-Kern, trade_kernel.py)
+    -- frueher eine eigene Kopie mit statischer TP-Order und Trailing auf
+    Kerzen-High/Low, deren Trades nicht zu den Optimizer-Kennzahlen passten.
     """
-    trades = []
     try:
-        import ta as ta_lib
-
-        df = df.copy()
-        atr_ind = ta_lib.volatility.AverageTrueRange(
-            high=df['high'], low=df['low'], close=df['close'], window=14)
-        df['atr'] = atr_ind.average_true_range()
-        df.dropna(subset=['atr'], inplace=True)
-
-        engine = SREngine(settings=config.get('strategy', {}))
-        df = engine.process_dataframe(df)
-
-        risk_params = config.get('risk', {})
-        rrr = risk_params.get('risk_reward_ratio', 2.0)
-        rpt = risk_params.get('risk_per_trade_pct', 1.0) / 100
-        act_rr = risk_params.get('trailing_stop_activation_rr', 2.0)
-        cb = risk_params.get('trailing_stop_callback_rate_pct', 1.0) / 100
-        lev = risk_params.get('leverage', 10)
-        fee = 0.06 / 100
-        atr_sl = risk_params.get('atr_multiplier_sl', 2.0)
-        min_sl = risk_params.get('min_sl_pct', 0.3) / 100
-
-        capital = start_capital
-        pos = None
-
-        for ts, row in df.iterrows():
-            if capital <= 0:
-                break
-
-            if pos:
-                exit_price = None
-                if pos['side'] == 'long':
-                    if not pos['trailing'] and row['high'] >= pos['act']:
-                        pos['trailing'] = True
-                    if pos['trailing']:
-                        pos['peak'] = max(pos['peak'], row['high'])
-                        pos['sl'] = max(pos['sl'], pos['peak'] * (1 - cb))
-                    if row['low'] <= pos['sl']:
-                        exit_price = pos['sl']
-                    elif not pos['trailing'] and row['high'] >= pos['tp']:
-                        exit_price = pos['tp']
-                else:
-                    if not pos['trailing'] and row['low'] <= pos['act']:
-                        pos['trailing'] = True
-                    if pos['trailing']:
-                        pos['peak'] = min(pos['peak'], row['low'])
-                        pos['sl'] = min(pos['sl'], pos['peak'] * (1 + cb))
-                    if row['high'] >= pos['sl']:
-                        exit_price = pos['sl']
-                    elif not pos['trailing'] and row['low'] <= pos['tp']:
-                        exit_price = pos['tp']
-
-                if exit_price:
-                    pnl_pct = (exit_price / pos['ep'] - 1) if pos['side'] == 'long' \
-                        else (1 - exit_price / pos['ep'])
-                    pnl_usd = pos['notional'] * pnl_pct - pos['notional'] * fee * 2
-                    capital += pnl_usd
-                    trades.append({
-                        'side': pos['side'],
-                        'entry_time': pos['entry_time'],
-                        'entry_price': pos['ep'],
-                        'exit_time': ts,
-                        'exit_price': exit_price,
-                        'pnl_usd': pnl_usd,
-                    })
-                    pos = None
-
-            signal = row.get('sr_signal', 0)
-            if not pos and signal != 0 and capital > 0:
-                ep = row['close']
-                atr_val = row.get('atr', 0)
-                if atr_val <= 0:
-                    continue
-                sl_dist = max(atr_val * atr_sl, ep * min_sl)
-                risk_usd = capital * rpt
-                sl_pct = sl_dist / ep
-                if sl_pct <= 0:
-                    continue
-                notional = min(risk_usd / sl_pct, capital * 10, 1_000_000)
-                margin = notional / lev
-                if margin > capital:
-                    continue
-
-                side = 'long' if signal == 1 else 'short'
-                sl = (ep - sl_dist) if side == 'long' else (ep + sl_dist)
-                tp = (ep + sl_dist * rrr) if side == 'long' else (ep - sl_dist * rrr)
-                act = (ep + sl_dist * act_rr) if side == 'long' else (ep - sl_dist * act_rr)
-
-                pos = {
-                    'side': side, 'ep': ep, 'sl': sl, 'tp': tp,
-                    'act': act, 'notional': notional,
-                    'trailing': False, 'peak': ep,
-                    'entry_time': ts,
-                }
-
+        result = run_backtest(df.copy(), _strategy_params(config), config.get('risk', {}),
+                              start_capital, verbose=False, fine_data=fine_data, return_trades=True)
+        return ledger_to_trades(result.get('trade_ledger'))
     except Exception as e:
         logger.warning(f"Fehler bei Trade-Extraktion: {e}")
         import traceback
         traceback.print_exc()
-
-    return trades
+        return []
 
 
 # ---------------------------------------------------------------------------
@@ -306,22 +161,11 @@ def extract_trades(df: pd.DataFrame, config: dict, start_capital: float = 1000)
 # ---------------------------------------------------------------------------
 
 def build_equity_curve(df: pd.DataFrame, trades: list, start_capital: float) -> pd.DataFrame:
-    equity = start_capital
-    trade_events = sorted(
-        [{'time': pd.to_datetime(t['exit_time']), 'pnl_usd': t['pnl_usd']}
-         for t in trades],
-        key=lambda x: x['time']
-    )
-
-    equity_data = []
-    t_idx = 0
-    for ts, _ in df.iterrows():
-        while t_idx < len(trade_events) and trade_events[t_idx]['time'] <= ts:
-            equity += trade_events[t_idx]['pnl_usd']
-            t_idx += 1
-        equity_data.append({'timestamp': ts, 'equity': equity})
-
-    eq_df = pd.DataFrame(equity_data).set_index('timestamp')
+    # Equity je Kerze: alle Trades mit Exit <= Kerzenzeit (vektorisiert, siehe
+    # equity_curve.step_equity -- vorher df.iterrows() ueber jede Kerze)
+    exit_ns = to_ns([t['exit_time'] for t in trades])
+    equity = step_equity(to_ns(df.index), exit_ns, [t['pnl_usd'] for t in trades], start_capital)
+    eq_df = pd.DataFrame({'timestamp': df.index, 'equity': equity}).set_index('timestamp')
     return eq_df
 
 
@@ -329,9 +173,57 @@ def build_equity_curve(df: pd.DataFrame, trades: list, start_capital: float) ->
 # Interaktiver Chart (Plotly)
 # ---------------------------------------------------------------------------
 
+def _zone_history_traces(go, df, zone_history):
+    """
+    Historisch korrekte S/R-Zonen (Intervall-Tabelle aus SREngine, siehe
+    process_dataframe(zone_history=True)) als je EIN gefuelltes Polygon-Trace
+    fuer Resistance/Support -- statt eines Plotly-Shapes je Zone (Shapes werden
+    bei tausenden Intervallen im Browser sehr langsam). Nur Intervalle, die
+    das angezeigte Fenster schneiden; auf das Fenster zugeschnitten. Farbe
+    relativ zum Close der Kerze, ab der die Zone (im Fenster) gilt.
+    """
+    x0, x1 = df.index.min(), df.index.max()
+    valid_to = zone_history['valid_to'].fillna(x1)
+    visible = zone_history[(zone_history['valid_from'] <= x1) & (valid_to >= x0)]
+    if visible.empty:
+        return []
+    starts = visible['valid_from'].clip(lower=x0)
+    ends = valid_to[visible.index].clip(upper=x1)
+    start_bar = np.clip(df.index.searchsorted(starts, side='right') - 1, 0, len(df) - 1)
+    close_at_start = df['close'].to_numpy()[start_bar]
+    mid = (visible['hi'].to_numpy() + visible['lo'].to_numpy()) / 2
+
+    traces = []
+    for is_resistance, name, fill, line in (
+            (True, 'Resistance-Zonen', 'rgba(34,197,94,0.15)', 'rgba(34,197,94,0.6)'),
+            (False, 'Support-Zonen', 'rgba(239,68,68,0.15)', 'rgba(239,68,68,0.6)')):
+        sel = (mid >= close_at_start) == is_resistance
+        if not sel.any():
+            continue
+        xs, ys = [], []
+        for a, b, lo, hi in zip(starts[sel], ends[sel], visible['lo'][sel], visible['hi'][sel]):
+            xs.extend((a, b, b, a, a, None))
+            ys.extend((lo, lo, hi, hi, lo, None))
+        traces.append(go.Scatter(
+            x=xs, y=ys, mode='lines', fill='toself', fillcolor=fill,
+            line=dict(color=line, width=1, dash='dot'),
+            name=name, hoverinfo='skip', showlegend=True,
+        ))
+    return traces
+
+
 def create_interactive_chart(symbol, timeframe, df, sr_zones, trades, equity_df,
                               stats, start_date, end_date, window=None,
-                              start_capital=1000):
+                              start_capital=1000, zone_history=None,
+                              max_points=DEFAULT_MAX_POINTS, period_label=None):
+    """
+    Plotly-Chart (Kerzen, S/R-Zonen, Trades, Kontostand). Kerzen und
+    Kontostand werden auf hoechstens max_points Punkte reduziert (siehe
+    stbot/analysis/chart_lod.py; 0 = volle Aufloesung), Marker bleiben exakt.
+    period_label: Zeitraum-Chart (nur fuer den Titel); stats enthaelt dann die
+                  Kennzahlen des Zeitraums inkl. 'start_capital' (Equity zu
+                  Beginn des Zeitraums, siehe equity_curve.window_stats).
+    """
     try:
         import plotly.graph_objects as go
         from plotly.subplots import make_subplots
@@ -351,17 +243,28 @@ def create_interactive_chart(symbol, timeframe, df, sr_zones, trades, equity_df,
     fig = make_subplots(specs=[[{"secondary_y": True}]])
 
     # ===== CANDLESTICKS =====
+    # Bei langen Historien je k Kerzen zu einer zusammengefasst (High/Low
+    # bleiben erhalten) -- die HTML-Groesse haengt am Budget, nicht an der
+    # Laenge der Historie.
+    candles, bucket = downsample_ohlc(df, max_points)
     fig.add_trace(go.Candlestick(
-        x=df.index,
-        open=df['open'], high=df['high'],
-        low=df['low'], close=df['close'],
-        name='OHLC',
+        x=candles.index,
+        open=candles['open'], high=candles['high'],
+        low=candles['low'], close=candles['close'],
+        name='OHLC' if bucket == 1 else f'OHLC ({bucket} Kerzen je Balken)',
         increasing_line_color='#16a34a',
         decreasing_line_color='#dc2626',
         showlegend=True,
     ), secondary_y=False)
 
     # ===== S/R ZONEN als horizontale Baender =====
+    # Mit zone_history: die zu jedem Zeitpunkt gueltigen Zonen; die aktuellen
+    # Zonen bekommen nur noch Midline + Label am rechten Rand.
+    draw_history = zone_history is not None and not zone_history.empty and len(df) > 0
+    if draw_history:
+        for trace in _zone_history_traces(go, df, zone_history):
+            fig.add_trace(trace, secondary_y=False)
+
     if df.index.min() and df.index.max():
         x0 = df.index.min()
         x1 = df.index.max()
@@ -373,23 +276,24 @@ def create_interactive_chart(symbol, timeframe, df, sr_zones, trades, equity_df,
             color_fill = 'rgba(34,197,94,0.15)' if mid >= last_close else 'rgba(239,68,68,0.15)'
             color_line = 'rgba(34,197,94,0.6)' if mid >= last_close else 'rgba(239,68,68,0.6)'
 
-            # Zone als Rectangle (Shapes)
-            fig.add_shape(
-                type='rect',
-                x0=x0, x1=x1,
-                y0=z['lo'], y1=z['hi'],
-                fillcolor=color_fill,
-                line=dict(color=color_line, width=1, dash='dot'),
-                layer='below',
-            )
-            # Midline + Label
-            fig.add_shape(
-                type='line',
-                x0=x0, x1=x1,
-                y0=mid, y1=mid,
-                line=dict(color=color_line, width=1),
-                layer='below',
-            )
+            if not draw_history:
+                # Zone als Rectangle (Shapes)
+                fig.add_shape(
+                    type='rect',
+                    x0=x0, x1=x1,
+                    y0=z['lo'], y1=z['hi'],
+                    fillcolor=color_fill,
+                    line=dict(color=color_line, width=1, dash='dot'),
+                    layer='below',
+                )
+                # Midline + Label
+                fig.add_shape(
+                    type='line',
+                    x0=x0, x1=x1,
+                    y0=mid, y1=mid,
+                    line=dict(color=color_line, width=1),
+                    layer='below',
+                )
             label_side = 'Resistance' if mid >= last_close else 'Support'
             fig.add_annotation(
                 x=x1, y=mid,
@@ -417,7 +321,7 @@ def create_interactive_chart(symbol, timeframe, df, sr_zones, trades, equity_df,
             exit_short_x.append(xt);  exit_short_y.append(t['exit_price'])
 
     if entry_long_x:
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=entry_long_x, y=entry_long_y, mode='markers',
             marker=dict(color='#16a34a', symbol='triangle-up', size=14,
                         line=dict(width=1.2, color='#0f5132')),
@@ -425,7 +329,7 @@ def create_interactive_chart(symbol, timeframe, df, sr_zones, trades, equity_df,
         ), secondary_y=False)
 
     if exit_long_x:
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=exit_long_x, y=exit_long_y, mode='markers',
             marker=dict(color='#22d3ee', symbol='circle', size=12,
                         line=dict(width=1.1, color='#0e7490')),
@@ -433,7 +337,7 @@ def create_interactive_chart(symbol, timeframe, df, sr_zones, trades, equity_df,
         ), secondary_y=False)
 
     if entry_short_x:
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=entry_short_x, y=entry_short_y, mode='markers',
             marker=dict(color='#f59e0b', symbol='triangle-down', size=14,
                         line=dict(width=1.2, color='#92400e')),
@@ -441,7 +345,7 @@ def create_interactive_chart(symbol, timeframe, df, sr_zones, trades, equity_df,
         ), secondary_y=False)
 
     if exit_short_x:
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=exit_short_x, y=exit_short_y, mode='markers',
             marker=dict(color='#ef4444', symbol='diamond', size=12,
                         line=dict(width=1.1, color='#7f1d1d')),
@@ -450,9 +354,10 @@ def create_interactive_chart(symbol, timeframe, df, sr_zones, trades, equity_df,
 
     # ===== EQUITY CURVE (rechte Y-Achse) =====
     if not equity_df.empty and 'equity' in equity_df.columns:
-        fig.add_trace(go.Scatter(
-            x=equity_df.index, y=equity_df['equity'],
-            name='Kontostand',
+        eq_times, eq_vals = downsample_line(equity_df.index, equity_df['equity'], max_points)
+        fig.add_trace(go.Scattergl(
+            x=eq_times, y=eq_vals,
+            mode='lines', name='Kontostand',
             line=dict(color='#2563eb', width=2),
             opacity=0.75,
             showlegend=True,
@@ -463,13 +368,15 @@ def create_interactive_chart(symbol, timeframe, df, sr_zones, trades, equity_df,
     end_cap = equity_df['equity'].iloc[-1] if not equity_df.empty else start_capital
     title_text = (
         f"{symbol} {timeframe} - StBot SRv2 | "
-        f"Start: ${start_capital:.0f} | "
+        f"Start: ${stats.get('start_capital', start_capital):.0f} | "
         f"End: ${end_cap:.0f} | "
         f"PnL: {'+' if pnl_pct >= 0 else ''}{pnl_pct:.2f}% | "
         f"Max DD: {stats.get('max_drawdown_pct', 0) * 100:.2f}% | "
         f"Trades: {stats.get('trades_count', len(trades))} | "
         f"Win Rate: {stats.get('win_rate', 0):.1f}%"
     )
+    if period_label:
+        title_text += f" | Zeitraum {period_label}"
 
     fig.update_layout(
         title=dict(text=title_text, font=dict(size=13), x=0.5, xanchor='center'),
@@ -504,6 +411,10 @@ def main():
     start_capital = int(cap_input) if cap_input.isdigit() else 1000
     win_input  = input("Letzten N Tage anzeigen [leer=alle]:      ").strip()
     window     = int(win_input) if win_input.isdigit() else None
+    pts_input  = input(f"Max. Punkte je Chart     [Standard: {DEFAULT_MAX_POINTS}, 0=alle]: ").strip()
+    max_points = int(pts_input) if pts_input.isdigit() else DEFAULT_MAX_POINTS
+    split_input = input("Zusaetzlich je Zeitraum (Y/Q/M) [leer=nein]: ").strip().upper()
+    split_by   = split_input if split_input in ('Y', 'Q', 'M') else None
     tg_input   = input("Telegram versenden? (j/n) [Standard: n]:  ").strip().lower()
     send_telegram = tg_input in ['j', 'y', 'yes']
 
@@ -547,55 +458,77 @@ def main():
             except Exception as e:
                 logger.warning(f"ATR-Berechnung fehlgeschlagen: {e}")
 
-            # S/R Zonen
-            logger.info("Berechne S/R-Zonen...")
-            sr_zones = compute_last_sr_zones(df, config)
-            logger.info(f"  {len(sr_zones)} Zonen gefunden")
-
-            # Trades extrahieren
-            logger.info("Extrahiere Trades fuer Chart-Markierungen...")
-            trades = extract_trades(df, config, start_capital)
-            logger.info(f"  {len(trades)} Trades gefunden")
-
-            # Equity Curve
-            strategy_params = {**config.get('strategy', {}),
-                               'symbol': symbol, 'timeframe': timeframe,
-                               'htf': config['market'].get('htf')}
+            # Trades, Kennzahlen und S/R-Zonen (letzte Kerze) aus EINEM
+            # Backtest-Lauf (gleicher Kern wie der Optimizer -- Chart-
+            # Markierungen, Zonen und Kennzahlen passen zusammen)
+            logger.info("Berechne Backtest, Trades und S/R-Zonen...")
             fine_tf = FINE_TF_MAP.get(timeframe)
             fine_data = LazyFineData(symbol, fine_tf) if fine_tf else None
-            stats = run_backtest(df.copy(), strategy_params, config.get('risk', {}),
-                                 start_capital, verbose=False, fine_data=fine_data)
+            stats = run_backtest(df.copy(), _strategy_params(config), config.get('risk', {}),
+                                 start_capital, verbose=False, fine_data=fine_data,
+                                 return_trades=True, sr_zone_bars=[-1], sr_zone_history=True)
+            trades = ledger_to_trades(stats.pop('trade_ledger', None))
+            zone_history = stats.pop('sr_zone_history', None)
+            sr_zones = stats.pop('sr_zones', None)
+            sr_zones = sr_zones[0] if sr_zones else compute_last_sr_zones(df, config)
+            logger.info(f"  {len(trades)} Trades, {len(sr_zones)} Zonen gefunden")
+
+            # Equity Curve
             equity_df = build_equity_curve(df, trades, start_capital)
 
-            # Chart erstellen
+            # Chart erstellen (Gesamt-Chart; mit split_by zusaetzlich je Zeitraum
+            # ein eigener Chart mit vollem Punkt-Budget)
             logger.info("Erstelle interaktiven Chart...")
-            fig = create_interactive_chart(
-                symbol, timeframe, df,
-                sr_zones, trades, equity_df,
-                stats, start_date, end_date,
-                window, start_capital,
-            )
-
-            if fig is None:
-                continue
-
             safe_name = f"{symbol.replace('/', '_').replace(':', '_')}_{timeframe}"
-            output_file = f"/tmp/stbot_{safe_name}.html"
-            fig.write_html(output_file)
-            logger.info(f"\u2705 Chart gespeichert: {output_file}")
-
-            if send_telegram and telegram_config.get('bot_token'):
-                try:
-                    from stbot.utils.telegram import send_document
-                    send_document(
-                        telegram_config['bot_token'],
-                        telegram_config['chat_id'],
-                        output_file,
-                        caption=f"StBot SRv2 Chart: {symbol} {timeframe}",
-                    )
-                    logger.info("\u2705 Chart via Telegram versendet")
-                except Exception as e:
-                    logger.warning(f"Telegram-Versand fehlgeschlagen: {e}")
+            charts = [(None, f"/tmp/stbot_{safe_name}.html", dict(
+                df=df, sr_zones=sr_zones, trades=trades, equity_df=equity_df,
+                start_date=start_date, end_date=end_date, window=window, stats=stats))]
+            periods = period_bounds(df.index, split_by) if split_by else []
+            eq_ns = to_ns(equity_df.index)
+            exit_ns = to_ns([t['exit_time'] for t in trades])
+            trade_pnls = np.array([t['pnl_usd'] for t in trades], dtype='float64')
+            for i, (label, p0, p1) in enumerate(periods):
+                in_period = [t for t in trades if p0 <= pd.to_datetime(t['entry_time']) <= p1]
+                # Titel-Kennzahlen nur aus diesem Zeitraum (nicht die des ganzen Laufs)
+                lo_ns, hi_ns = to_ns([p0, p1])
+                closed = (exit_ns >= lo_ns) & (exit_ns <= hi_ns)
+                win = window_stats(eq_ns, equity_df['equity'], lo_ns, hi_ns, trade_pnls[closed], start_capital)
+                period_stats = {'start_capital': win['start_capital'], 'total_pnl_pct': win['total_pnl_pct'],
+                                'max_drawdown_pct': win['max_drawdown_pct'] / 100,
+                                'trades_count': win['trade_count'], 'win_rate': win['win_rate']}
+                charts.append((label, f"/tmp/stbot_{safe_name}_{label}.html", dict(
+                    df=df[p0:p1], trades=in_period, equity_df=equity_df[p0:p1],
+                    # aktuelle Zonen nur im juengsten Zeitraum beschriften
+                    sr_zones=sr_zones if i == len(periods) - 1 else [],
+                    start_date=None, end_date=None, window=None, stats=period_stats)))
+
+            for label, output_file, parts in charts:
+                fig = create_interactive_chart(
+                    symbol, timeframe, parts['df'],
+                    parts['sr_zones'], parts['trades'], parts['equity_df'],
+                    parts['stats'], parts['start_date'], parts['end_date'],
+                    parts['window'], start_capital, zone_history=zone_history,
+                    max_points=max_points, period_label=label,
+                )
+
+                if fig is None:
+                    break
+
+                fig.write_html(output_file)
+                logger.info(f"\u2705 Chart gespeichert: {output_file}")
+
+                if send_telegram and telegram_config.get('bot_token'):
+                    try:
+                        from stbot.utils.telegram import send_document
+                        send_document(
+                            telegram_config['bot_token'],
+                            telegram_config['chat_id'],
+                            output_file,
+                            caption=f"StBot SRv2 Chart: {symbol} {timeframe}" + (f" ({label})" if label else ""),
+                        )
+                        logger.info("\u2705 Chart via Telegram versendet")
+                    except Exception as e:
+                        logger.warning(f"Telegram-Versand fehlgeschlagen: {e}")
 
         except Exception as e:
             logger.error(f"Fehler bei {filename}: {e}", exc_info=True)
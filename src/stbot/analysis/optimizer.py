@@ -3,7 +3,10 @@ import os
 import sys
 import time
 import json
+import hashlib
+import threading
 import optuna
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 import argparse
 import logging
@@ -29,6 +32,7 @@ sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
 
 from stbot.analysis.backtester import load_data, run_backtest, FINE_TF_MAP
 from stbot.utils.timeframe_utils import determine_htf
+from stbot.utils.state_store import JsonStateStore
 
 optuna.logging.set_verbosity(optuna.logging.WARNING)
 
@@ -51,11 +55,168 @@ K_FOLDS = 3              # IS-Teilfenster fuer den Robustheits-Score (siehe obje
 # Ergebnisdatei fuer den Scheduler (Telegram-Benachrichtigung)
 RESULTS_FILE = os.path.join(PROJECT_ROOT, 'artifacts', 'results', 'last_optimizer_run.json')
 
+# Ergebnis-Cache fuer bereits bewertete Parameter-Kombinationen (siehe
+# _canonical_param_key()/objective()). TPE schlaegt haeufig Kombinationen vor,
+# die sich nur in Parametern unterscheiden, die der Backtest gar nicht liest
+# (z.B. weekly_trend_ema bei use_weekly_trend_filter=False) oder die bei
+# Integer-Parametern schlicht identisch wiederkehren -- jeder solche Trial
+# kostete bisher volle IS+OOS+K-Fold-Backtests fuer ein bereits bekanntes
+# Ergebnis. Der Cache ueberlebt einzelne Laeufe (auto_optimizer_scheduler.py ->
+# run_pipeline_automated.sh), wird aber pro Studie verworfen, sobald sich das
+# Datenfenster (DATA_FINGERPRINT) oder OBJECTIVE_VERSION aendert.
+TRIAL_CACHE_FILE = os.path.join(PROJECT_ROOT, 'artifacts', 'db', 'trial_cache_stbot.json')
+# Bei JEDER Aenderung an run_backtest()/SREngine/objective(), die bei gleichen
+# Parametern und Daten andere Zahlen liefert, hochzaehlen -- sonst liefert der
+# Cache Ergebnisse der alten Codeversion.
+OBJECTIVE_VERSION = "kfold-min-v1"
+DATA_FINGERPRINT = None
+TRIAL_CACHE = {}
+_TRIAL_CACHE_LOCK = threading.Lock()   # study.optimize(n_jobs>1) laeuft in Threads
+_TRIAL_CACHE_STATS = {'hits': 0, 'misses': 0}
+# Ein Schluessel je Studie. Mehrere Optimizer-Prozesse (verschiedene Paare,
+# auto_optimizer_scheduler.py) schreiben dieselbe Datei: JsonStateStore merged
+# unter fcntl.flock auf <datei>.lock und schreibt ueber eine eigene Temp-Datei
+# je Prozess/Thread -- vorher teilten sich alle Laeufe denselben festen
+# '.tmp'-Pfad ohne Sperre und konnten sich Studien gegenseitig verwerfen.
+TRIAL_CACHE_STORE = JsonStateStore(TRIAL_CACHE_FILE, indent=None, json_default=float)
+
 
 def create_safe_filename(symbol, timeframe):
     return f"{symbol.replace('/', '').replace(':', '')}_{timeframe}"
 
 
+def _data_fingerprint(is_data, oos_data):
+    """Hash ueber IS/OOS-Fenster (Zeitstempel + OHLCV) und alle Einstellungen,
+    die das Backtest-Ergebnis bei gleichen Parametern veraendern."""
+    h = hashlib.sha1()
+    h.update(f"{OBJECTIVE_VERSION}|{START_CAPITAL}|{K_FOLDS}|{IS_FRACTION}".encode())
+    for part in (is_data, oos_data):
+        h.update(np.asarray(part.index.asi8).tobytes())
+        h.update(np.ascontiguousarray(part[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype='float64')).tobytes())
+    return h.hexdigest()
+
+
+def _canonical_param_key(strategy_params, risk_params):
+    """Kanonischer Schluessel der EFFEKTIV wirksamen Parameter: Werte, die der
+    Backtest bei ausgeschaltetem Filter gar nicht liest, fallen raus, Floats
+    werden per repr() exakt (nicht gerundet) uebernommen."""
+    strategy = dict(strategy_params)
+    if not strategy.get('use_weekly_trend_filter'):
+        strategy.pop('weekly_trend_ema', None)
+    if not strategy.get('use_avalanche_filter'):
+        strategy.pop('avalanche_percentile_threshold', None)
+    if not strategy.get('use_energy_filter'):
+        strategy.pop('min_energy_zscore', None)
+    return json.dumps({'strategy': strategy, 'risk': risk_params}, sort_keys=True, default=repr)
+
+
+def _config_to_trial_params(cfg):
+    """Uebersetzt eine bestehende config_*.json in Optuna-Trial-Parameter
+    (gleiche Namen wie die suggest_*-Aufrufe in objective()). Bedingte
+    Parameter nur, wenn ihr Filter aktiv ist -- sonst fragt objective() sie
+    gar nicht ab."""
+    strategy, risk = cfg['strategy'], cfg['risk']
+    params = {k: strategy[k] for k in (
+        'pivot_period', 'max_pivots', 'channel_width_pct', 'min_strength', 'source',
+        'use_weekly_trend_filter', 'use_avalanche_filter', 'use_energy_filter',
+        'use_energy_streak_filter') if k in strategy}
+    if strategy.get('use_weekly_trend_filter'):
+        params['weekly_trend_ema'] = strategy.get('weekly_trend_ema', 4)
+    if strategy.get('use_avalanche_filter'):
+        params['avalanche_percentile_threshold'] = strategy.get('avalanche_percentile_threshold', 60)
+    if strategy.get('use_energy_filter'):
+        params['min_energy_zscore'] = strategy.get('min_energy_zscore', 0.0)
+    params.update({k: risk[k] for k in (
+        'risk_reward_ratio', 'risk_per_trade_pct', 'leverage', 'trailing_stop_activation_rr',
+        'trailing_stop_callback_rate_pct', 'atr_multiplier_sl') if k in risk})
+    return params
+
+
+def _collect_warm_start_params(study_name, storage_url, config_path, top_n):
+    """Startpunkte fuer --warm_start: die aktuell aktive Config plus die top_n
+    Trials der vorherigen Studie -- letztere NUR, wenn diese mit derselben
+    OBJECTIVE_VERSION lief (sonst sind ihre Werte mit der heutigen Zielfunktion
+    nicht vergleichbar, siehe Kommentar zu delete_study in main()). Muss VOR
+    delete_study aufgerufen werden."""
+    seeds = []
+    if os.path.exists(config_path):
+        try:
+            with open(config_path) as cf:
+                seeds.append(_config_to_trial_params(json.load(cf)))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"  Warnung: Config fuer Warm-Start nicht lesbar ({e}).")
+    try:
+        old_study = optuna.load_study(study_name=study_name, storage=storage_url)
+    except KeyError:
+        return seeds  # noch keine vorherige Studie
+    old_version = old_study.user_attrs.get('objective_version')
+    if old_version != OBJECTIVE_VERSION:
+        print(f"  Warm-Start: vorherige Studie mit Zielfunktion '{old_version}' "
+              f"(aktuell '{OBJECTIVE_VERSION}') -- nur die Config wird uebernommen.")
+        return seeds
+    old_trials = [t for t in old_study.trials
+                  if t.state == optuna.trial.TrialState.COMPLETE and t.value is not None]
+    old_trials.sort(key=lambda t: t.value, reverse=True)
+    seeds.extend(t.params for t in old_trials[:top_n])
+    return seeds
+
+
+_REEVAL_DATA = {}
+
+
+def _init_reeval_worker(is_data, oos_data, fine_data, start_capital):
+    # Laeuft einmal pro Worker-Prozess: Daten nur hier uebergeben, nicht mit
+    # jeder einzelnen Aufgabe erneut pickeln.
+    _REEVAL_DATA.update(is_data=is_data, oos_data=oos_data, fine_data=fine_data,
+                        start_capital=start_capital)
+
+
+def _reeval_one(task):
+    label, segment, strategy_params, risk_params = task
+    data = _REEVAL_DATA['is_data'] if segment == 'is' else _REEVAL_DATA['oos_data']
+    result = run_backtest(data.copy(), strategy_params, risk_params, _REEVAL_DATA['start_capital'],
+                          verbose=False, fine_data=_REEVAL_DATA['fine_data'])
+    return label, segment, result
+
+
+def _parallel_precise_reeval(jobs, fine_data, max_workers):
+    """Praezise IS+OOS-Nachbewertung mehrerer (label, strategy, risk)-Jobs in
+    eigenen Prozessen. Liefert {label: (is_stats, oos_stats)}; fehlgeschlagene
+    Bewertungen bleiben None."""
+    tasks = [(label, segment, sp, rp) for label, sp, rp in jobs for segment in ('is', 'oos')]
+    results = {label: [None, None] for label, _, _ in jobs}
+    if not tasks:
+        return {}
+    workers = max(1, min(len(tasks), max_workers or (os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_reeval_worker,
+                             initargs=(IS_DATA, OOS_DATA, fine_data, START_CAPITAL)) as ex:
+        futures = [ex.submit(_reeval_one, t) for t in tasks]
+        for fut in tqdm(as_completed(futures), total=len(futures), desc="    Nachbewertung",
+                        unit="backtest", leave=False):
+            try:
+                label, segment, result = fut.result()
+            except Exception as e:
+                print(f"  Warnung: Nachbewertung fehlgeschlagen ({e}).")
+                continue
+            results[label][0 if segment == 'is' else 1] = result
+    return {label: tuple(r) for label, r in results.items()}
+
+
+def _prune_check(is_result):
+    pnl      = is_result.get('total_pnl_pct', -1000)
+    drawdown = is_result.get('max_drawdown_pct', 1.0)
+    trades   = is_result.get('trades_count', 0)
+    win_rate = is_result.get('win_rate', 0)
+
+    if OPTIM_MODE == "strict" and (
+        drawdown > MAX_DRAWDOWN_CONSTRAINT or win_rate < MIN_WIN_RATE_CONSTRAINT
+        or pnl < MIN_PNL_CONSTRAINT or trades < 20
+    ):
+        raise optuna.exceptions.TrialPruned()
+    elif OPTIM_MODE == "best_profit" and (drawdown > MAX_DRAWDOWN_CONSTRAINT or trades < 20):
+        raise optuna.exceptions.TrialPruned()
+
+
 def objective(trial):
     # Wochentrend-Filter (EMA auf Wochenkerzen, nur Trades in Trendrichtung
     # zulassen) -- per Backtest ueber Baer/Bulle/Seitwaerts validiert: hilft
@@ -104,6 +265,15 @@ def objective(trial):
         'min_sl_pct': 0.3,
     }
 
+    # Cache-Lookup VOR jedem Backtest (siehe TRIAL_CACHE_FILE). Der Eintrag
+    # haelt nur die rohen Backtest-Ergebnisse -- die Pruning-Entscheidung wird
+    # unten immer neu getroffen, damit geaenderte --max_drawdown/--min_win_rate
+    # etc. keine veralteten Urteile aus dem Cache uebernehmen.
+    cache_key = _canonical_param_key(strategy_params, risk_params)
+    with _TRIAL_CACHE_LOCK:
+        entry = dict(TRIAL_CACHE.get(cache_key, {}))
+    computed = False
+
     # Zielfunktion sieht NUR IS-Daten -- OOS fliesst nie in die Optimierung
     # ein, nur in die Bestaetigung des besten Trials danach (siehe main()).
     # fine_data=None waehrend der SUCHE (grobe 4-Punkte-Kerzennaeherung statt
@@ -114,55 +284,65 @@ def objective(trial):
     # Trials ist das der Unterschied zwischen Minuten und Stunden. Die
     # praezisen Zahlen (fuer Tabelle + Config) kommen aus einer einmaligen
     # Nachbewertung des besten Trials nach der Suche, siehe main().
-    is_result = run_backtest(IS_DATA.copy(), strategy_params, risk_params, START_CAPITAL, verbose=False, fine_data=None)
-    pnl      = is_result.get('total_pnl_pct', -1000)
-    drawdown = is_result.get('max_drawdown_pct', 1.0)
-    trades   = is_result.get('trades_count', 0)
-    win_rate = is_result.get('win_rate', 0)
-
-    if OPTIM_MODE == "strict" and (
-        drawdown > MAX_DRAWDOWN_CONSTRAINT or win_rate < MIN_WIN_RATE_CONSTRAINT
-        or pnl < MIN_PNL_CONSTRAINT or trades < 20
-    ):
-        raise optuna.exceptions.TrialPruned()
-    elif OPTIM_MODE == "best_profit" and (drawdown > MAX_DRAWDOWN_CONSTRAINT or trades < 20):
-        raise optuna.exceptions.TrialPruned()
-
-    # OOS nur fuer Trials rechnen, die die IS-Kriterien ueberhaupt erfuellen
-    # (spart Rechenzeit fuer die vielen von vornherein verworfenen Trials).
-    # Bekannte Vereinfachung ggue. dnabot: dort laeuft EIN durchgehender
-    # Backtest, dessen Trade-Liste danach nach entry_time gesplittet wird --
-    # stbots run_backtest() gibt keine Trade-Liste zurueck (nur Aggregat-
-    # Stats), daher hier zwei UNABHAENGIGE Backtests. Nachteil: Indikatoren
-    # mit Rolling-Fenstern (z.B. avalanche_percentile, energy_zscore) muessen
-    # im OOS-Abschnitt eigenstaendig neu "warmlaufen" statt nahtlos an IS
-    # anzuschliessen -- die ersten ~100 OOS-Kerzen sind dadurch etwas
-    # konservativer als im echten Live-Betrieb (Filter dort ggf. noch NaN).
-    oos_result = run_backtest(OOS_DATA.copy(), strategy_params, risk_params, START_CAPITAL, verbose=False, fine_data=None)
-    trial.set_user_attr('is_stats', is_result)
-    trial.set_user_attr('oos_stats', oos_result)
-    trial.set_user_attr('strategy_params', strategy_params)
-    trial.set_user_attr('risk_params', risk_params)
-
-    # Robustheits-Score statt reiner Gesamt-IS-PnL: IS_DATA in K_FOLDS
-    # aufeinanderfolgende Teilfenster splitten, jedes einzeln backtesten
-    # (weiterhin fine_data=None, billig) und das SCHLECHTESTE Teilfenster
-    # als Optuna-Zielwert nehmen. Reine Gesamt-PnL-Optimierung bevorzugt
-    # Parameter, die eine einzelne Marktphase zufaellig gut treffen -- genau
-    # das Muster, das beim ersten echten Testlauf auffiel (BTC 6h: IS +190%,
-    # OOS -11.8%). Das Minimum ueber mehrere Teilfenster bestraft das schon
-    # WAEHREND der Suche, nicht erst hinterher im OOS-Check. Pruning-Kriterien
-    # oben bleiben auf dem VOLLEN IS-Fenster (genug Daten fuer eine
-    # verlaessliche trades>=20/Drawdown-Pruefung; einzelne Teilfenster waeren
-    # dafuer oft zu kurz).
-    fold_size = len(IS_DATA) // K_FOLDS
-    fold_pnls = []
-    for k in range(K_FOLDS):
-        fold_data = IS_DATA.iloc[k * fold_size: (k + 1) * fold_size if k < K_FOLDS - 1 else len(IS_DATA)]
-        fold_result = run_backtest(fold_data.copy(), strategy_params, risk_params, START_CAPITAL, verbose=False, fine_data=None)
-        fold_pnls.append(fold_result.get('total_pnl_pct', -1000))
-    trial.set_user_attr('fold_pnls', fold_pnls)
-    robust_score = min(fold_pnls)
+    is_result = entry.get('is_stats')
+    if is_result is None:
+        is_result = run_backtest(IS_DATA.copy(), strategy_params, risk_params, START_CAPITAL, verbose=False, fine_data=None)
+        entry['is_stats'] = is_result
+        computed = True
+
+    try:
+        _prune_check(is_result)
+
+        # OOS nur fuer Trials rechnen, die die IS-Kriterien ueberhaupt erfuellen
+        # (spart Rechenzeit fuer die vielen von vornherein verworfenen Trials).
+        # Bekannte Vereinfachung ggue. dnabot: dort laeuft EIN durchgehender
+        # Backtest, dessen Trade-Liste danach nach entry_time gesplittet wird --
+        # stbots run_backtest() gibt keine Trade-Liste zurueck (nur Aggregat-
+        # Stats), daher hier zwei UNABHAENGIGE Backtests. Nachteil: Indikatoren
+        # mit Rolling-Fenstern (z.B. avalanche_percentile, energy_zscore) muessen
+        # im OOS-Abschnitt eigenstaendig neu "warmlaufen" statt nahtlos an IS
+        # anzuschliessen -- die ersten ~100 OOS-Kerzen sind dadurch etwas
+        # konservativer als im echten Live-Betrieb (Filter dort ggf. noch NaN).
+        oos_result = entry.get('oos_stats')
+        if oos_result is None:
+            oos_result = run_backtest(OOS_DATA.copy(), strategy_params, risk_params, START_CAPITAL, verbose=False, fine_data=None)
+            entry['oos_stats'] = oos_result
+            computed = True
+        trial.set_user_attr('is_stats', is_result)
+        trial.set_user_attr('oos_stats', oos_result)
+        trial.set_user_attr('strategy_params', strategy_params)
+        trial.set_user_attr('risk_params', risk_params)
+
+        # Robustheits-Score statt reiner Gesamt-IS-PnL: IS_DATA in K_FOLDS
+        # aufeinanderfolgende Teilfenster splitten, jedes einzeln backtesten
+        # (weiterhin fine_data=None, billig) und das SCHLECHTESTE Teilfenster
+        # als Optuna-Zielwert nehmen. Reine Gesamt-PnL-Optimierung bevorzugt
+        # Parameter, die eine einzelne Marktphase zufaellig gut treffen -- genau
+        # das Muster, das beim ersten echten Testlauf auffiel (BTC 6h: IS +190%,
+        # OOS -11.8%). Das Minimum ueber mehrere Teilfenster bestraft das schon
+        # WAEHREND der Suche, nicht erst hinterher im OOS-Check. Pruning-Kriterien
+        # oben bleiben auf dem VOLLEN IS-Fenster (genug Daten fuer eine
+        # verlaessliche trades>=20/Drawdown-Pruefung; einzelne Teilfenster waeren
+        # dafuer oft zu kurz).
+        fold_pnls = entry.get('fold_pnls')
+        if fold_pnls is None:
+            fold_size = len(IS_DATA) // K_FOLDS
+            fold_pnls = []
+            for k in range(K_FOLDS):
+                fold_data = IS_DATA.iloc[k * fold_size: (k + 1) * fold_size if k < K_FOLDS - 1 else len(IS_DATA)]
+                fold_result = run_backtest(fold_data.copy(), strategy_params, risk_params, START_CAPITAL, verbose=False, fine_data=None)
+                fold_pnls.append(fold_result.get('total_pnl_pct', -1000))
+            entry['fold_pnls'] = fold_pnls
+            computed = True
+        trial.set_user_attr('fold_pnls', fold_pnls)
+        robust_score = min(fold_pnls)
+    finally:
+        # Auch bei TrialPruned speichern -- gerade die vielen verworfenen
+        # Kombinationen sind die haeufigsten Wiederholungen.
+        with _TRIAL_CACHE_LOCK:
+            TRIAL_CACHE[cache_key] = entry
+            _TRIAL_CACHE_STATS['misses' if computed else 'hits'] += 1
+        trial.set_user_attr('cache_hit', not computed)
 
     return robust_score
 
@@ -170,7 +350,7 @@ def objective(trial):
 def main():
     global HISTORICAL_DATA, IS_DATA, OOS_DATA, CURRENT_SYMBOL, CURRENT_TIMEFRAME, CURRENT_HTF, CONFIG_SUFFIX
     global MAX_DRAWDOWN_CONSTRAINT, MIN_WIN_RATE_CONSTRAINT, MIN_PNL_CONSTRAINT, START_CAPITAL, OPTIM_MODE
-    global IS_FRACTION, MIN_OOS_TRADES, K_FOLDS
+    global IS_FRACTION, MIN_OOS_TRADES, K_FOLDS, DATA_FINGERPRINT, TRIAL_CACHE
 
     parser = argparse.ArgumentParser(description="Parameter-Optimierung fuer StBot (SRv2)")
     parser.add_argument('--symbols',    type=str, default="",
@@ -196,6 +376,14 @@ def main():
                         help='Mindestanzahl OOS-Trades fuer eine belastbare Bestaetigung, Standard 10')
     parser.add_argument('--k_folds',       type=int, default=3,
                         help='Anzahl IS-Teilfenster fuer den Robustheits-Score (Minimum ueber alle Fenster), Standard 3')
+    parser.add_argument('--top_k',         type=int, default=5,
+                        help='Anzahl bester Trials fuer die praezise Feindaten-Nachbewertung, Standard 5')
+    parser.add_argument('--reeval_workers', type=int, default=0,
+                        help='Prozesse fuer die praezise Nachbewertung (0 = alle Kerne), Standard 0')
+    parser.add_argument('--warm_start',    action='store_true',
+                        help='Studie mit aktueller Config + besten Trials des letzten kompatiblen Laufs vorbelegen')
+    parser.add_argument('--warm_start_top_n', type=int, default=10,
+                        help='Anzahl uebernommener Trials aus dem letzten Lauf bei --warm_start, Standard 10')
     args = parser.parse_args()
 
     CONFIG_SUFFIX           = args.config_suffix
@@ -263,6 +451,12 @@ def main():
         # nach der Suche) -- waehrend der Suche selbst nutzt objective() bewusst
         # KEINE Fein-Daten (fine_data=None), siehe dortiger Kommentar.
         fine_tf = FINE_TF_MAP.get(timeframe)
+        DATA_FINGERPRINT = _data_fingerprint(IS_DATA, OOS_DATA)
+
+        config_dir         = os.path.join(PROJECT_ROOT, 'src', 'stbot', 'strategy', 'configs')
+        os.makedirs(config_dir, exist_ok=True)
+        config_filename    = f'config_{create_safe_filename(symbol, timeframe)}{CONFIG_SUFFIX}.json'
+        config_output_path = os.path.join(config_dir, config_filename)
 
         DB_FILE      = os.path.join(PROJECT_ROOT, 'artifacts', 'db', 'optuna_studies_stbot.db')
         os.makedirs(os.path.dirname(DB_FILE), exist_ok=True)
@@ -279,6 +473,19 @@ def main():
         # in der Tabelle. Alte Studien sind nach Aenderungen an der Zielfunktion
         # (wie heute: roh-PnL -> K-Fold-Robustheits-Score) ohnehin nicht mehr
         # mit neuen Trials vergleichbar.
+        #
+        # --warm_start (woechentliche Re-Optimierung): die Studie startet zwar
+        # weiterhin frisch, wird aber mit der aktiven Config und den besten
+        # Trials des letzten Laufs vorbelegt, statt TPE jedes Mal kalt dieselbe
+        # Region neu lernen zu lassen. Genau das Problem oben (alte Trials einer
+        # anderen Zielfunktion) verhindert das objective_version-Tag, das jede
+        # neue Studie traegt -- aeltere/abweichende Studien liefern nur die
+        # Config als Startpunkt. Bei unveraendertem Datenfenster sind die
+        # uebernommenen Trials ausserdem Treffer im Ergebnis-Cache (siehe oben).
+        warm_start_params = []
+        if args.warm_start:
+            warm_start_params = _collect_warm_start_params(
+                study_name, STORAGE_URL, config_output_path, args.warm_start_top_n)
         try:
             optuna.delete_study(study_name=study_name, storage=STORAGE_URL)
         except KeyError:
@@ -286,6 +493,25 @@ def main():
         study = optuna.create_study(
             storage=STORAGE_URL, study_name=study_name,
             direction="maximize")
+        study.set_user_attr('objective_version', OBJECTIVE_VERSION)
+        for params in warm_start_params:
+            study.enqueue_trial(params, skip_if_exists=True)
+        if warm_start_params:
+            print(f"  Warm-Start: {len(warm_start_params)} Startpunkte vorbelegt "
+                  f"(aktuelle Config + bis zu {args.warm_start_top_n} Trials des letzten Laufs).")
+
+        # Ergebnis-Cache dieser Studie laden -- nur gueltig, wenn Datenfenster
+        # und Zielfunktion unveraendert sind (DATA_FINGERPRINT), sonst leer.
+        # Die Optuna-Studie selbst startet weiterhin frisch (siehe oben), der
+        # Cache spart nur die Backtests bereits bekannter Kombinationen.
+        cached_study = TRIAL_CACHE_STORE.get(study_name) or {}
+        if cached_study.get('fingerprint') == DATA_FINGERPRINT:
+            TRIAL_CACHE = cached_study.get('entries', {})
+        else:
+            TRIAL_CACHE = {}
+        _TRIAL_CACHE_STATS.update(hits=0, misses=0)
+        if TRIAL_CACHE:
+            print(f"  Ergebnis-Cache: {len(TRIAL_CACHE)} bekannte Parameter-Kombinationen wiederverwendbar.")
         # Eigener tqdm-Fortschrittsbalken statt Optunas generischem
         # show_progress_bar=True -- zeigt Symbol/Timeframe als Beschriftung
         # und das bisher beste gefundene PnL als Zusatzinfo live mit, statt
@@ -305,6 +531,17 @@ def main():
                 run_results['failed'].append(
                     {'symbol': symbol, 'timeframe': timeframe, 'reason': str(e)[:80]})
                 continue
+            finally:
+                # Nur den Schluessel dieser Studie ersetzen -- update() laedt
+                # unter der Datei-Sperre frisch von Disk, Studien parallel
+                # laufender Optimizer (andere Paare) bleiben erhalten.
+                TRIAL_CACHE_STORE.update({study_name: {'fingerprint': DATA_FINGERPRINT, 'entries': TRIAL_CACHE}})
+
+        n_evaluated = _TRIAL_CACHE_STATS['hits'] + _TRIAL_CACHE_STATS['misses']
+        if n_evaluated:
+            print(f"  Ergebnis-Cache: {_TRIAL_CACHE_STATS['hits']}/{n_evaluated} Trials aus dem Cache "
+                  f"({_TRIAL_CACHE_STATS['hits'] / n_evaluated * 100:.0f}% Trefferquote, "
+                  f"{len(TRIAL_CACHE)} Kombinationen gespeichert)")
 
         valid_trials = [t for t in study.trials if t.state == optuna.trial.TrialState.COMPLETE]
         if not valid_trials:
@@ -312,11 +549,25 @@ def main():
                 {'symbol': symbol, 'timeframe': timeframe, 'reason': 'no_valid_trials'})
             continue
 
-        best_trial  = max(valid_trials, key=lambda t: t.value)
-        best_params = best_trial.params
-        new_pnl     = best_trial.value
+        # Top-K statt nur des einen besten Trials praezise nachbewerten: die
+        # grobe 4-Punkte-Naeherung der Suche kann die Reihenfolge eng
+        # beieinanderliegender Trials vertauschen. Identische effektive
+        # Parameter (siehe _canonical_param_key) nur einmal.
+        ranked_trials = sorted(valid_trials, key=lambda t: t.value, reverse=True)
+        top_trials, seen_keys = [], set()
+        for t in ranked_trials:
+            if 'strategy_params' not in t.user_attrs or 'risk_params' not in t.user_attrs:
+                continue
+            key = _canonical_param_key(t.user_attrs['strategy_params'], t.user_attrs['risk_params'])
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
+            top_trials.append(t)
+            if len(top_trials) >= max(1, args.top_k):
+                break
+        best_trial  = top_trials[0] if top_trials else ranked_trials[0]
 
-        # Praezise Nachbewertung NUR des besten Trials mit echter Intrabar-
+        # Praezise Nachbewertung der Top-K-Trials mit echter Intrabar-
         # Aufloesung -- waehrend der Suche liefen alle Trials bewusst mit
         # fine_data=None (grobe Naeherung, siehe objective()) fuer Geschwindigkeit.
         #
@@ -343,30 +594,13 @@ def main():
                 fine_data_precise = None
             print(f"    ... Feindaten geladen ({time.time()-_pnb_start:.0f}s)")
 
-        best_strategy_params = best_trial.user_attrs.get('strategy_params')
-        best_risk_params     = best_trial.user_attrs.get('risk_params')
-        if best_strategy_params is not None and best_risk_params is not None:
-            best_is  = run_backtest(IS_DATA.copy(), best_strategy_params, best_risk_params, START_CAPITAL, verbose=False, fine_data=fine_data_precise)
-            print(f"    ... IS-Nachbewertung fertig ({time.time()-_pnb_start:.0f}s)")
-            best_oos = run_backtest(OOS_DATA.copy(), best_strategy_params, best_risk_params, START_CAPITAL, verbose=False, fine_data=fine_data_precise)
-            print(f"    ... OOS-Nachbewertung fertig ({time.time()-_pnb_start:.0f}s)")
-            new_pnl  = best_is.get('total_pnl_pct', new_pnl)
-        else:
-            # Fallback (sollte nicht vorkommen): grobe Such-Werte verwenden
-            best_is  = best_trial.user_attrs.get('is_stats', {})
-            best_oos = best_trial.user_attrs.get('oos_stats', {})
-
-        config_dir         = os.path.join(PROJECT_ROOT, 'src', 'stbot', 'strategy', 'configs')
-        os.makedirs(config_dir, exist_ok=True)
-        config_filename    = f'config_{create_safe_filename(symbol, timeframe)}{CONFIG_SUFFIX}.json'
-        config_output_path = os.path.join(config_dir, config_filename)
-
         # Baseline = bestehende Config (falls vorhanden), auf denselben IS/OOS-
         # Daten ausgewertet -- das ist der "Ist-Zustand", gegen den der beste
         # Trial bestaetigt werden muss (analog dnabots DEFAULT_ALPHABET-Baseline,
         # aber stbot hat keinen universellen Default -- die aktuell aktive
         # Config IST hier der sinnvolle Vergleichsmassstab).
-        baseline_is, baseline_oos = None, None
+        reeval_jobs = [(t.number, t.user_attrs['strategy_params'], t.user_attrs['risk_params'])
+                       for t in top_trials]
         if os.path.exists(config_output_path):
             try:
                 with open(config_output_path) as cf:
@@ -374,13 +608,49 @@ def main():
                 baseline_strategy = dict(existing_cfg['strategy'])
                 baseline_strategy.update({'symbol': symbol, 'timeframe': timeframe, 'htf': CURRENT_HTF})
                 baseline_risk = dict(existing_cfg['risk'])
-                print(f"  Bestehende Config als Baseline auf denselben Daten nachbewerten...")
-                baseline_is  = run_backtest(IS_DATA.copy(), baseline_strategy, baseline_risk, START_CAPITAL, verbose=False, fine_data=fine_data_precise)
-                baseline_oos = run_backtest(OOS_DATA.copy(), baseline_strategy, baseline_risk, START_CAPITAL, verbose=False, fine_data=fine_data_precise)
-                print(f"    ... Baseline-Nachbewertung fertig ({time.time()-_pnb_start:.0f}s)")
+                reeval_jobs.append(('baseline', baseline_strategy, baseline_risk))
             except Exception as e:
-                print(f"  Warnung: Baseline-Bewertung fehlgeschlagen ({e}) -- werte ohne Baseline-Vergleich.")
-                baseline_is, baseline_oos = None, None
+                print(f"  Warnung: Baseline-Config nicht lesbar ({e}) -- werte ohne Baseline-Vergleich.")
+
+        # Alle Nachbewertungen (Top-K x IS/OOS + Baseline x IS/OOS) laufen
+        # als eigene Prozesse parallel -- run_backtest() ist reiner CPU-
+        # gebundener Python-Code, Threads helfen wegen des GIL kaum (siehe
+        # daten/trial_convergence_study_strict.py). Die Feindaten werden dabei
+        # nur EINMAL pro Worker uebergeben (initializer), nicht pro Aufgabe.
+        # Wandzeit ~ die laengste Einzelbewertung (IS) statt der Summe aller.
+        precise = _parallel_precise_reeval(reeval_jobs, fine_data_precise, args.reeval_workers)
+        print(f"    ... Nachbewertung von {len(top_trials)} Trial(s)"
+              f"{' + Baseline' if 'baseline' in precise else ''} fertig ({time.time()-_pnb_start:.0f}s)")
+
+        baseline_is, baseline_oos = precise.get('baseline', (None, None))
+        if baseline_is is None or baseline_oos is None:
+            baseline_is, baseline_oos = None, None
+
+        # Gewinner unter den Top-K nach PRAEZISER OOS-PnL (nur Kandidaten mit
+        # genug OOS-Trades fuer eine belastbare Aussage; sonst bleibt der beste
+        # Such-Trial). Bewusster Kompromiss: OOS fliesst damit in die Auswahl
+        # zwischen wenigen, auf IS gleich guten Kandidaten ein -- die Suche
+        # selbst sieht weiterhin nur IS.
+        scored = [t for t in top_trials
+                  if precise.get(t.number, (None, None))[1] is not None
+                  and precise[t.number][1].get('trades_count', 0) >= MIN_OOS_TRADES]
+        if scored:
+            best_trial = max(scored, key=lambda t: precise[t.number][1].get('total_pnl_pct', -1e9))
+        best_params = best_trial.params
+        new_pnl     = best_trial.value
+
+        best_is, best_oos = precise.get(best_trial.number, (None, None))
+        if best_is is not None and best_oos is not None:
+            new_pnl  = best_is.get('total_pnl_pct', new_pnl)
+        else:
+            # Fallback (sollte nicht vorkommen): grobe Such-Werte verwenden
+            best_is  = best_trial.user_attrs.get('is_stats', {})
+            best_oos = best_trial.user_attrs.get('oos_stats', {})
+        if len(top_trials) > 1:
+            print(f"  Top-{len(top_trials)} praezise OOS: " + " / ".join(
+                f"#{t.number}{'*' if t is best_trial else ''} "
+                f"{(precise.get(t.number, (None, None))[1] or {}).get('total_pnl_pct', float('nan')):+.1f}%"
+                for t in top_trials))
 
         # Bestaetigung (analog dnabot): genug OOS-Trades fuer eine belastbare
         # Aussage, OOS-PnL positiv, UND (falls Baseline vorhanden) besser als
@@ -489,6 +759,7 @@ def main():
             'oos_pnl_pct': round(best_oos.get('total_pnl_pct', 0), 2),
             'confirmed':   confirmed,
             'config_file': config_filename,
+            'cache_hits':  _TRIAL_CACHE_STATS['hits'],
         })
 
     # Lauf-Ergebnisse fuer Scheduler speichern
@@ -6,12 +6,14 @@ from tqdm import tqdm
 import sys
 import os
 import json # Fürs Speichern
+import time
 import numpy as np # Für np.nan
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
 
-from stbot.analysis.portfolio_simulator import run_portfolio_simulation
+from stbot.analysis.portfolio_simulator import run_portfolio_simulation, prepare_strategy
 
 
 class _LiveTicker:
@@ -39,12 +41,80 @@ class _LiveTicker:
         self._stop.set()
         self._thread.join(timeout=1)
 
+# --- Prozess-Pool fuer die Kandidaten-Bewertung einer Greedy-Runde ---
+# Die Kandidaten einer Runde sind voneinander unabhaengig; run_portfolio_simulation()
+# ist reiner CPU-gebundener Python-Code (Threads helfen wegen des GIL nicht, siehe
+# daten/trial_convergence_study_strict.py). Die Strategie-Daten inkl. der bereits
+# vorbereiteten Signal-Frames (prepare_strategy) gehen EINMAL pro Worker beim
+# Pool-Start rueber (initializer), pro Aufgabe nur noch die Liste der Dateinamen.
+_WORKER_CTX = {}
+
+
+def _init_team_worker(strategies_data, start_capital, start_date, end_date):
+    _WORKER_CTX.update(strategies_data=strategies_data, start_capital=start_capital,
+                       start_date=start_date, end_date=end_date)
+
+
+def _team_sim_data(strategies_data, team_files):
+    return {f"{strategies_data[f]['symbol']}_{strategies_data[f]['timeframe']}": strategies_data[f]
+            for f in team_files}
+
+
+def _simulate_team_summary(team_files):
+    """Laeuft im Worker: simuliert ein Team und liefert nur die fuer die
+    Auswahl noetigen Kennzahlen zurueck (kein Trade-Log/Equity-DataFrame ueber
+    die Prozessgrenze -- das volle Ergebnis des Rundensiegers wird im
+    Hauptprozess einmal nachgerechnet)."""
+    ctx = _WORKER_CTX
+    result = run_portfolio_simulation(ctx['start_capital'], _team_sim_data(ctx['strategies_data'], team_files),
+                                      ctx['start_date'], ctx['end_date'], verbose=False)
+    if not result:
+        return None
+    return {'end_capital': result['end_capital'], 'max_drawdown_pct': result['max_drawdown_pct'],
+            'liquidation_date': result.get('liquidation_date')}
+
+
+def _coin_of(strat_data):
+    # Coin-Symbol (z.B. BTC aus BTC/USDT:USDT) fuer den Kollisionsschutz
+    return strat_data['symbol'].split('/')[0]
+
+
+def _team_growth_bound(parent_end_capital, candidate_end_capital, start_capital, prune_slack):
+    """
+    HEURISTIK, keine sichere Schranke: Schaetzung fuer das Endkapital, wenn ein
+    Kandidat zum Team kommt. Positionsgroessen sind proportional zum gemeinsamen
+    Kapital, der Kandidat verstaerkt das Team also ungefaehr um seinen Einzel-
+    Wachstumsfaktor (Endkapital / Startkapital) -- exakt nur, solange sich seine
+    Trades nicht mit denen des Teams ueberlappen. Ueberlappende Positionen
+    wachsen additiv statt multiplikativ (Kapital bei Einstieg ist das
+    REALISIERTE Kapital) und koennen den Faktor in BEIDE Richtungen verschieben;
+    prune_slack (>= 1) ist dafuer nur ein Toleranzfaktor, keine hergeleitete
+    Grenze. Der Drawdown geht gar nicht ein (Max-DD-Pruefung erst nach der
+    Simulation). Mit gesetztem prune_slack kann die Suche daher Teams verwerfen,
+    die ohne Pruning gewonnen haetten -- das Ergebnis kann sich aendern.
+    prune_slack=None (Default) schaltet das Pruning ab.
+    """
+    if start_capital <= 0:
+        return float('inf')
+    return parent_end_capital * (candidate_end_capital / start_capital) * prune_slack
+
+
 # *** Angepasst: Nimmt target_max_dd entgegen ***
-def run_portfolio_optimizer(start_capital, strategies_data, start_date, end_date, target_max_dd: float):
+def run_portfolio_optimizer(start_capital, strategies_data, start_date, end_date, target_max_dd: float,
+                            max_workers=None, beam_width=1, prune_slack=None, time_budget_s=None):
     """
     Findet die Kombination von Strategien, die das höchste Endkapital liefert,
     während der maximale Drawdown unter dem Zielwert (`target_max_dd`) bleibt UND jeder Coin nur einmal vorkommt.
-    Verwendet einen modifizierten Greedy-Algorithmus.
+    Verwendet eine Beam-Suche (Breite `beam_width`) -- mit beam_width=1 und ohne
+    Pruning exakt der bisherige modifizierte Greedy-Algorithmus.
+    max_workers: Prozesse fuer die Kandidaten-Bewertung je Runde (None = alle Kerne, 1 = sequentiell).
+    beam_width: Anzahl Teams, die je Runde weiter ausgebaut werden.
+    prune_slack: Toleranzfaktor fuer die Wachstums-HEURISTIK (_team_growth_bound);
+                 Teams, deren Schaetzung das Eltern-Team nicht schlaegt, werden
+                 gar nicht erst simuliert. Nicht verlustfrei -- kann das Ergebnis
+                 gegenueber der vollen Suche aendern. None = kein Pruning.
+    time_budget_s: Zeitbudget in Sekunden fuer die Team-Suche (zwischen zwei Runden
+                   geprueft, danach gilt das bis dahin beste Team). None = unbegrenzt.
     """
     print(f"\n--- Starte automatische Portfolio-Optimierung mit Max DD <= {target_max_dd:.2f}% & ohne Coin-Kollisionen ---")
     target_max_dd_decimal = target_max_dd / 100.0 # Umrechnung in Dezimalzahl für Vergleiche
@@ -101,110 +171,165 @@ def run_portfolio_optimizer(start_capital, strategies_data, start_date, end_date
     best_portfolio_result = single_strategy_results[0]['result']
     best_end_capital = best_portfolio_result['end_capital'] # Merke dir das beste Kapital
 
-    # Pool der verbleibenden Kandidaten (alle, außer dem besten)
-    candidate_pool = [res['filename'] for res in single_strategy_results[1:]]
+    # Kandidaten-Reihenfolge (nach Einzel-Endkapital) -- bestimmt auch den
+    # Gleichstand-Sieger innerhalb einer Runde.
+    candidate_pool = [res['filename'] for res in single_strategy_results]
+    solo_end_capital = {res['filename']: res['result']['end_capital'] for res in single_strategy_results}
 
     print(f"2/3: Beste Einzelstrategie (unter Max DD): {best_portfolio_files[0]} (Endkapital: {best_end_capital:.2f} USDT, Max DD: {best_portfolio_result['max_drawdown_pct']:.2f}%)")
     print("3/3: Suche die besten Team-Kollegen...")
 
-    # --- 3. Greedy-Algorithmus: Füge schrittweise die Strategie hinzu, die den Profit MAXIMIERT, ohne Max DD zu verletzen UND ohne Coin-Kollision ---
-
-    selected_coins = set() # NEU: Set für bereits ausgewählte Coins
-    # Füge den Coin der besten Einzelstrategie hinzu (falls vorhanden)
-    if best_portfolio_files: # NEU
-        initial_best_strat_data = strategies_data.get(best_portfolio_files[0]) # NEU
-        if initial_best_strat_data: # NEU
-            # Extrahiere Coin-Symbol (z.B. BTC aus BTC/USDT:USDT)
-            initial_coin = initial_best_strat_data['symbol'].split('/')[0] # NEU
-            selected_coins.add(initial_coin) # NEU
-
-    while True:
-        best_next_addition = None
-        best_capital_with_addition = best_end_capital # Starte mit dem Kapital des aktuellen besten Portfolios
-        current_best_result_for_addition = best_portfolio_result # Merke dir das Ergebnis dieser Runde
-
-        progress_bar = tqdm(candidate_pool, desc=f"Teste Team mit {len(best_portfolio_files)+1} Mitgliedern")
-        ticker = _LiveTicker(progress_bar)
-        ticker.__enter__()
-        for candidate_file in progress_bar:
-
-            # --- START: NEUER CODE ZUR KOLLISIONSPRÜFUNG ---
-            candidate_strat_data = strategies_data.get(candidate_file)
-            if not candidate_strat_data:
-                continue # Überspringe, falls Daten für Kandidat fehlen
-
-            progress_bar.set_postfix_str(f"{candidate_strat_data['symbol']} {candidate_strat_data['timeframe']}")
-            candidate_coin = candidate_strat_data['symbol'].split('/')[0]
-
-            # Prüfe, ob der Coin dieses Kandidaten bereits im Portfolio ist
-            if candidate_coin in selected_coins:
-                continue # Überspringe diesen Kandidaten, da der Coin schon vorhanden ist
-            # --- ENDE: NEUER CODE ---
-
-            # Bestehender Code:
-            current_team_files = best_portfolio_files + [candidate_file]
-
-            # Eindeutigkeitsprüfung (gleicher Coin/Timeframe - sollte durch obige Prüfung unnötig sein, aber sicher ist sicher)
-            unique_check = set()
-            is_valid_team = True
-            for f in current_team_files:
-                strat_info = strategies_data.get(f)
-                if not strat_info: is_valid_team = False; break
-                key = strat_info['symbol'] + strat_info['timeframe']
-                if key in unique_check: is_valid_team = False; break
-                unique_check.add(key)
-            if not is_valid_team: continue
-
-            # Daten für Simulator zusammenstellen
-            current_team_data = {}
-            valid_data_for_sim = True
-            for fname in current_team_files:
-                strat_d = strategies_data.get(fname)
-                if strat_d and 'data' in strat_d and not strat_d['data'].empty:
-                    sim_key = f"{strat_d['symbol']}_{strat_d['timeframe']}"
-                    current_team_data[sim_key] = strat_d
-                else:
-                    valid_data_for_sim = False; break
-            if not valid_data_for_sim: continue
-
-            # Portfolio simulieren
-            result = run_portfolio_simulation(start_capital, current_team_data, start_date, end_date, verbose=False)
+    # --- 3. Beam-Suche: Baue je Runde die besten `beam_width` Teams um je eine Strategie aus,
+    #        behalte nur Erweiterungen, die ihr Eltern-Team im Profit SCHLAGEN, den Max DD
+    #        einhalten UND keine Coin-Kollision erzeugen. beam_width=1 == bisheriger Greedy. ---
+    beam_width = max(1, int(beam_width or 1))
+    search_start = time.time()
+
+    # Beam-Eintrag: (Team-Dateien, Ergebnis bzw. Kennzahlen, Coins im Team)
+    beam = [([res['filename']], res['result'], {_coin_of(strategies_data[res['filename']])})
+            for res in single_strategy_results[:beam_width]]
+    seen_teams = {frozenset(files) for files, _, _ in beam}
+    pruned_total = 0
+
+    n_workers = max_workers or os.cpu_count() or 1
+    pool = None
+    if n_workers > 1 and len(candidate_pool) > 2:
+        # Signal-Frames im Hauptprozess vorbereiten (in Schritt 1 schon fuer alle
+        # bewerteten Strategien passiert) -- so erben die Worker sie fertig.
+        for fname in candidate_pool:
+            prepare_strategy(strategies_data[fname])
+        pool = ProcessPoolExecutor(max_workers=min(n_workers, len(candidate_pool) - 1),
+                                   initializer=_init_team_worker,
+                                   initargs=(strategies_data, start_capital, start_date, end_date))
 
+    try:
+      while beam:
+        if time_budget_s is not None and time.time() - search_start > time_budget_s:
+            print(f"Zeitbudget von {time_budget_s:.0f}s erreicht -- Suche beendet, bestes bisher gefundenes Team wird verwendet.")
+            break
+
+        # Gueltige Kandidaten-Teams dieser Runde sammeln (Beam- und Pool-Reihenfolge bleibt erhalten)
+        round_teams = []
+        for parent_idx, (parent_files, parent_result, parent_coins) in enumerate(beam):
+            for candidate_file in candidate_pool:
+                if candidate_file in parent_files:
+                    continue
+
+                # --- START: NEUER CODE ZUR KOLLISIONSPRÜFUNG ---
+                candidate_strat_data = strategies_data.get(candidate_file)
+                if not candidate_strat_data:
+                    continue # Überspringe, falls Daten für Kandidat fehlen
+
+                # Prüfe, ob der Coin dieses Kandidaten bereits im Portfolio ist
+                if _coin_of(candidate_strat_data) in parent_coins:
+                    continue # Überspringe diesen Kandidaten, da der Coin schon vorhanden ist
+                # --- ENDE: NEUER CODE ---
+
+                current_team_files = parent_files + [candidate_file]
+                # Gleiches Team ueber einen anderen Eltern-Pfad schon in der Suche?
+                team_key = frozenset(current_team_files)
+                if team_key in seen_teams:
+                    continue
+
+                # Eindeutigkeitsprüfung (gleicher Coin/Timeframe - sollte durch obige Prüfung unnötig sein, aber sicher ist sicher)
+                unique_check = set()
+                is_valid_team = True
+                for f in current_team_files:
+                    strat_info = strategies_data.get(f)
+                    if not strat_info: is_valid_team = False; break
+                    key = strat_info['symbol'] + strat_info['timeframe']
+                    if key in unique_check: is_valid_team = False; break
+                    unique_check.add(key)
+                if not is_valid_team: continue
+
+                # Daten für Simulator vorhanden?
+                if not all('data' in strategies_data[f] and not strategies_data[f]['data'].empty for f in current_team_files):
+                    continue
+
+                # Heuristik (siehe _team_growth_bound): kann dieses Team sein Eltern-Team voraussichtlich schlagen?
+                if prune_slack is not None and _team_growth_bound(
+                        parent_result['end_capital'], solo_end_capital[candidate_file],
+                        start_capital, prune_slack) <= parent_result['end_capital']:
+                    pruned_total += 1
+                    continue
+
+                seen_teams.add(team_key)
+                round_teams.append((len(round_teams), parent_idx, candidate_file, current_team_files))
+
+        if not round_teams:
+            print("Keine weiteren gueltigen Team-Erweiterungen. Optimierung beendet.")
+            break
+
+        # Portfolio simulieren -- parallel im Prozess-Pool (falls aktiv), sonst
+        # wie bisher nacheinander. Die Auswahl laeuft danach IMMER in Sammel-
+        # Reihenfolge mit stabiler Sortierung -- bei Gleichstand gewinnt also wie
+        # bisher der zuerst im Pool stehende Kandidat, unabhaengig davon, in
+        # welcher Reihenfolge die Worker fertig werden.
+        summaries = {}
+        team_size = len(round_teams[0][3])
+        progress_bar = tqdm(total=len(round_teams), desc=f"Teste Team mit {team_size} Mitgliedern")
+        with _LiveTicker(progress_bar):
+            if pool is not None:
+                futures = {pool.submit(_simulate_team_summary, team): (idx, cand) for idx, _, cand, team in round_teams}
+                for fut in as_completed(futures):
+                    idx, cand = futures[fut]
+                    progress_bar.set_postfix_str(f"{strategies_data[cand]['symbol']} {strategies_data[cand]['timeframe']}")
+                    try:
+                        summaries[idx] = fut.result()
+                    except Exception as e:
+                        print(f"Fehler bei Simulation von {cand}: {e}")
+                        summaries[idx] = None
+                    progress_bar.update(1)
+            else:
+                for idx, _, cand, team in round_teams:
+                    progress_bar.set_postfix_str(f"{strategies_data[cand]['symbol']} {strategies_data[cand]['timeframe']}")
+                    summaries[idx] = run_portfolio_simulation(start_capital, _team_sim_data(strategies_data, team),
+                                                              start_date, end_date, verbose=False)
+                    progress_bar.update(1)
+        progress_bar.close()
+
+        children = []
+        for idx, parent_idx, cand, team in round_teams:
+            result = summaries.get(idx)
             # Prüfen ob Ergebnis gültig UND Max DD eingehalten wird
             if result and not result.get("liquidation_date"):
                 actual_max_dd = result.get('max_drawdown_pct', 100.0) / 100.0
 
-                # *** NEUE BEDINGUNG: Prüfe Max DD UND ob Endkapital besser ist ***
-                if actual_max_dd <= target_max_dd_decimal and result['end_capital'] > best_capital_with_addition:
-                    # Dieses Team ist besser als das bisher beste dieser Runde
-                    best_capital_with_addition = result['end_capital']
-                    best_next_addition = candidate_file
-                    current_best_result_for_addition = result # Aktualisiere das beste Ergebnis dieser Runde
-
-        ticker.__exit__(None, None, None)
-
-        # Prüfe, ob eine Verbesserung gefunden wurde (best_next_addition ist nicht None)
-        if best_next_addition:
-            # Eine bessere Kombination wurde gefunden
-            print(f"-> Füge hinzu: {best_next_addition} (Neues Kapital: {best_capital_with_addition:.2f} USDT, Max DD: {current_best_result_for_addition['max_drawdown_pct']:.2f}%)")
-            best_portfolio_files.append(best_next_addition)
-
-            # --- START: NEUER CODE ZUM AKTUALISIEREN DES SETS ---
-            added_strat_data = strategies_data.get(best_next_addition)
-            if added_strat_data:
-                added_coin = added_strat_data['symbol'].split('/')[0]
-                selected_coins.add(added_coin)
-            # --- ENDE: NEUER CODE ---
-
-            # Bestehender Code:
-            best_end_capital = best_capital_with_addition # Aktualisiere globales bestes Kapital
-            best_portfolio_result = current_best_result_for_addition # Übernehme das beste Ergebnis
-            candidate_pool.remove(best_next_addition) # Entferne aus Kandidaten
-        else:
+                # *** NEUE BEDINGUNG: Prüfe Max DD UND ob Endkapital besser ist als das des Eltern-Teams ***
+                parent_files, parent_result, parent_coins = beam[parent_idx]
+                if actual_max_dd <= target_max_dd_decimal and result['end_capital'] > parent_result['end_capital']:
+                    children.append((team, result, parent_coins | {_coin_of(strategies_data[cand])}))
+
+        if not children:
             # Keine weitere Verbesserung durch Hinzufügen möglich oder alle Kandidaten verletzen Max DD/Coin-Constraint
             print("Keine weitere Verbesserung des Profits (unter Einhaltung des Max DD & ohne Coin-Kollision) durch Hinzufügen von Strategien gefunden. Optimierung beendet.")
             break # Verlasse die while-Schleife
 
+        # Stabile Sortierung: bei gleichem Endkapital bleibt die Sammel-Reihenfolge
+        children.sort(key=lambda c: c[1]['end_capital'], reverse=True)
+        beam = children[:beam_width]
+
+        round_best_files, round_best_result, _ = beam[0]
+        if round_best_result['end_capital'] > best_end_capital:
+            print(f"-> Füge hinzu: {round_best_files[-1]} (Team: {len(round_best_files)}, Neues Kapital: {round_best_result['end_capital']:.2f} USDT, Max DD: {round_best_result['max_drawdown_pct']:.2f}%)")
+            best_portfolio_files = list(round_best_files)
+            best_portfolio_result = round_best_result
+            best_end_capital = round_best_result['end_capital']
+
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if pruned_total:
+        print(f"Info: {pruned_total} Team(s) per Wachstums-Heuristik verworfen, ohne simuliert zu werden.")
+
+    # Aus dem Pool kommen nur Kennzahlen zurueck -- volles Ergebnis (Trades,
+    # Equity-Kurve) des besten Teams einmal hier nachrechnen.
+    if 'trade_history' not in best_portfolio_result:
+        best_portfolio_result = run_portfolio_simulation(
+            start_capital, _team_sim_data(strategies_data, best_portfolio_files),
+            start_date, end_date, verbose=False)
+
     # --- Ergebnisse speichern ---
     try:
         results_dir = os.path.join(PROJECT_ROOT, 'artifacts', 'results')
@@ -13,58 +13,439 @@ sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
 
 # Imports auf StBot angepasst
 from stbot.strategy.sr_engine import SREngine
-from stbot.strategy.trade_logic import get_titan_signal
-from stbot.analysis.backtester import load_data, _build_fine_path, _get_fine_slice
+from stbot.strategy.trade_logic import compute_titan_signals
+from stbot.analysis.backtester import load_data
+from stbot.analysis.trade_kernel import (BarData, TradeLedger, close_pnl, find_exit,
+                                        new_position, scan_exit, stop_distance)
 
 class Bias:
     BULLISH = "BULLISH"
     BEARISH = "BEARISH"
     NEUTRAL = "NEUTRAL"
 
-def run_portfolio_simulation(start_capital, strategies_data, start_date, end_date, verbose=True):
+
+MAX_ALLOWED_EFFECTIVE_LEVERAGE = 10
+ABSOLUTE_MAX_NOTIONAL_VALUE = 1000000
+MIN_NOTIONAL = 5.0
+
+def _prepared_cache_key(strat):
+    params = strat.get('smc_params', {}) or strat.get('strategy', {})
+    return json.dumps({'strategy': params, 'risk': strat.get('risk_params', {}),
+                       'symbol': strat.get('symbol', ''), 'timeframe': strat.get('timeframe', '')},
+                      sort_keys=True, default=str)
+
+
+def prepare_strategy(strat):
+    """
+    Bereitet EINE Strategie fuer die Portfolio-Simulation vor (ATR, SREngine,
+    vorberechnetes Einstiegssignal) und merkt sich das Ergebnis direkt im
+    uebergebenen Strategie-Dict (Schluessel '_prepared').
+
+    Hintergrund: run_portfolio_optimizer() ruft run_portfolio_simulation() fuer
+    jedes Kandidaten-Team jeder Greedy-Runde auf -- bisher lief dabei fuer JEDES
+    Teammitglied jedes Mal erneut ATR + SREngine.process_dataframe() +
+    get_titan_signal() pro Kerze, obwohl sich an Daten und Parametern einer
+    Strategie zwischen den Aufrufen nichts aendert. Der Cache ist an ALLES
+    gebunden, was im Ergebnis landet: die konkreten Objekte strat['data'] und
+    strat['fine_data'] (Identitaet) sowie Parameter, Symbol und Timeframe --
+    wird eines davon ersetzt, wird neu berechnet (sonst liefe z.B. nach einem
+    Tausch von fine_data still der alte Fein-Pfad weiter).
+    Rueckgabe: None, wenn zu wenig Daten vorhanden sind.
+    """
+    df_source = strat['data']
+    fine_source = strat.get('fine_data')
+    cache_key = _prepared_cache_key(strat)
+    cached = strat.get('_prepared')
+    if (cached is not None and cached['source'] is df_source and cached['fine'] is fine_source
+            and cached['cache_key'] == cache_key):
+        return cached['prepared']
+
+    prepared = None
+    if not df_source.empty and len(df_source) >= 100:
+        df = df_source.copy()
+        params = strat.get('smc_params', {}) # Im Simulator heissen sie evtl. noch smc_params
+        if not params: params = strat.get('strategy', {})
+
+        # 1a. ATR berechnen
+        atr_indicator = ta.volatility.AverageTrueRange(high=df['high'], low=df['low'], close=df['close'], window=14)
+        df['atr'] = atr_indicator.average_true_range()
+
+        # 1b. SR Engine
+        engine = SREngine(settings=params)
+        df = engine.process_dataframe(df)
+
+        # NaN Werte am Anfang entfernen
+        df.dropna(subset=['atr', 'sr_signal'], inplace=True)
+
+        if not df.empty:
+            # 1c. Einstiegssignal fuer alle Kerzen auf einmal (identisch zu
+            # get_titan_signal() mit NEUTRALEM Bias -- im Simulator gibt es
+            # keinen MTF-Bias-Check, SRv2 ist standalone stark).
+            df['titan_signal'] = compute_titan_signals(df, {"strategy": params, "risk": strat.get('risk_params', {})}, Bias.NEUTRAL)
+            prepared = {
+                'data': df,
+                'params': params,
+                'risk_params': strat.get('risk_params', {}),
+                'symbol': strat.get('symbol', ''),
+                'timeframe': strat.get('timeframe', ''),
+                'fine_data': fine_source,
+            }
+
+    strat['_prepared'] = {'source': df_source, 'fine': fine_source, 'cache_key': cache_key, 'prepared': prepared}
+    return prepared
+
+
+def _build_arrays(prepared):
+    """Spalten einer vorbereiteten Strategie als Python-Listen fuer den
+    Simulations-Loop (Element-Zugriff auf Listen ist im reinen Python-Loop
+    deutlich billiger als .loc[ts] auf dem DataFrame). Einmal pro Strategie
+    gebaut und in prepared['arrays'] gemerkt."""
+    arrays = prepared.get('arrays')
+    if arrays is None:
+        df = prepared['data']
+        arrays = {
+            'ts_ns':  df.index.asi8,
+            'times':  df.index,
+            'open':   df['open'].to_numpy(dtype='float64').tolist(),
+            'high':   df['high'].to_numpy(dtype='float64').tolist(),
+            'low':    df['low'].to_numpy(dtype='float64').tolist(),
+            'close':  df['close'].to_numpy(dtype='float64').tolist(),
+            'atr':    df['atr'].to_numpy(dtype='float64').tolist(),
+            'signal': df['titan_signal'].to_numpy().tolist(),
+            # Kerzen + Intrabar-Pfade fuer den gemeinsamen Simulations-Kern
+            'bars':   BarData(df, prepared.get('fine_data')),
+        }
+        prepared['arrays'] = arrays
+    return arrays
+
+
+def _merge_timelines(arrays_list):
+    """
+    k-Wege-Merge der (je Strategie bereits sortierten) Kerzen-Zeitstempel zu
+    EINER Ereignis-Zeitachse. Rueckgabe:
+      timeline_ns -- eindeutige, sortierte Zeitstempel (int64 ns)
+      bounds      -- Gruppengrenzen: Ereignisse [bounds[i], bounds[i+1]) gehoeren zu timeline_ns[i]
+      ev_strat    -- Strategie-Index je Ereignis (innerhalb eines Zeitstempels
+                     in Strategie-Reihenfolge, wie die alte Schleife ueber
+                     processed_strategies)
+      ev_bar      -- Kerzen-Index (Cursor) in die Arrays dieser Strategie
+    Der stabile Sort erkennt die k bereits sortierten Teilfolgen (Timsort-
+    Runs) und ist damit praktisch ein linearer Merge -- statt der frueheren
+    sorted(set(...)) ueber alle Timestamp-Objekte plus `ts in index` /
+    .loc[ts] je Zeitschritt und Strategie.
+    """
+    ts_all = np.concatenate([arr['ts_ns'] for arr in arrays_list])
+    strat_all = np.concatenate([np.full(len(arr['ts_ns']), k, dtype=np.int64) for k, arr in enumerate(arrays_list)])
+    bar_all = np.concatenate([np.arange(len(arr['ts_ns']), dtype=np.int64) for arr in arrays_list])
+    order = np.argsort(ts_all, kind='stable')
+    ts_sorted = ts_all[order]
+    starts = np.flatnonzero(np.diff(ts_sorted)) + 1
+    bounds = np.concatenate(([0], starts, [len(ts_sorted)]))
+    timeline_ns = ts_sorted[bounds[:-1]]
+    return timeline_ns, bounds.tolist(), strat_all[order].tolist(), bar_all[order].tolist()
+
+
+def _plan_entry(signal, entry_price, current_atr, risk_params):
+    """Kapital-UNABHAENGIGER Teil eines Einstiegs (SL-Abstand, Level -- gleiche
+    Exit-Semantik wie run_backtest, siehe trade_kernel.new_position()).
+    None, wenn kein gueltiger SL-Abstand zustande kommt."""
+    sl_dist = stop_distance(entry_price, current_atr, risk_params)
+    if sl_dist <= 0: return None
+
+    sl_pct = sl_dist / entry_price
+    if sl_pct <= 0: return None
+
+    return new_position('long' if signal == 1 else 'short', entry_price, sl_dist, risk_params,
+                        sl_pct=sl_pct,
+                        risk_per_trade=risk_params.get('risk_per_trade_pct', 1.0) / 100.0,
+                        leverage=risk_params.get('leverage', 10))
+
+
+def _size_entry(equity, plan):
+    """Kapital-ABHAENGIGER Teil: Positionsgroesse und gebundene Marge."""
+    risk_usd = equity * plan['risk_per_trade']
+    calc_notional = risk_usd / plan['sl_pct']
+    max_notional = equity * MAX_ALLOWED_EFFECTIVE_LEVERAGE
+    final_notional = min(calc_notional, max_notional, ABSOLUTE_MAX_NOTIONAL_VALUE)
+    margin_used = math.ceil((final_notional / plan['leverage']) * 100) / 100
+    return final_notional, margin_used
+
+
+def _open_position(plan, final_notional, margin_used, ts, symbol_key, timeframe):
+    # Kopie: der Plan (Einzel-Trade-Strom) wird ggf. mehrfach eroeffnet
+    return {
+        **plan,
+        'notional_value': final_notional, 'margin_used': margin_used,
+        'last_known_price': plan['entry_price'],
+        'entry_time': ts,
+        'symbol_key': symbol_key,
+        'timeframe':  timeframe,
+    }
+
+
+def _ledger_strategies(strat_keys, strat_list):
+    # Kategorien fuer TradeLedger -- gleiche Symbol-/Timeframe-Quelle wie _open_position()
+    return [(key, strat.get('symbol') or key, strat.get('timeframe', ''))
+            for key, strat in zip(strat_keys, strat_list)]
+
+
+def _solo_trade_stream(prepared):
+    """
+    Kapital-unabhaengiger Trade-Strom EINER Strategie: alle Einstiegs-
+    Kandidaten (Signal-Kerzen, an denen die Strategie flat ist) mit Entscheidung
+    (genommen / wegen Marge uebersprungen) und Exit-Kerze + Exit-Preis.
+
+    Moeglich, weil Einstiegszeitpunkt, SL/Trailing-Level und Exit nur von den
+    Kerzen der Strategie selbst abhaengen -- das gemeinsame Kapital bestimmt nur
+    die Positionsgroesse (proportional, siehe _size_entry()) und die beiden
+    Ausschluss-Regeln min_notional/Margen-Check. Diese werden bei der
+    Kombination (_combine_trade_streams) mit dem echten Kapital nachgeprueft.
+    Einmal pro Strategie berechnet und in prepared['trade_stream'] gemerkt.
+    """
+    stream = prepared.get('trade_stream')
+    if stream is not None:
+        return stream
+    arr = prepared['arrays']
+    risk_params = prepared['risk_params']
+    bars = arr['bars']
+    candidates = []
+    bar, n = 0, len(arr['close'])
+    while bar < n:
+        signal = arr['signal'][bar]
+        plan = _plan_entry(signal, arr['close'][bar], arr['atr'][bar], risk_params) if signal else None
+        if plan is None:
+            bar += 1
+            continue
+        # Allein (keine anderen Positionen) scheitert der Margen-Check genau
+        # dann, wenn die Marge pro Kapital-Einheit > 1 ist.
+        notional_per_equity = min(plan['risk_per_trade'] / plan['sl_pct'], MAX_ALLOWED_EFFECTIVE_LEVERAGE)
+        taken = notional_per_equity / plan['leverage'] <= 1
+        current = {'bar': bar, 'plan': plan, 'taken': taken, 'exit_bar': None, 'exit_price': None}
+        candidates.append(current)
+        if not taken:
+            bar += 1
+            continue
+        # Exit per Kern (spult offene Kerzen vektoriell vor); auf der Exit-Kerze
+        # selbst ist ein neuer Einstieg moeglich (wie im Kerzen-Loop unten).
+        exit_bar, exit_price = find_exit(_open_position(plan, 0.0, 0.0, None, None, None), bars, bar + 1)
+        if exit_bar is None:
+            break
+        current['exit_bar'], current['exit_price'] = exit_bar, exit_price
+        bar = exit_bar
+    prepared['trade_stream'] = candidates
+    return candidates
+
+
+def _combine_trade_streams(start_capital, strat_keys, strat_list, arrays_list, timeline_ns, timeline):
+    """
+    Analytische Portfolio-Kombination aus den Trade-Stroemen der Einzel-
+    strategien (_solo_trade_stream) -- statt jede Kerze jedes Teammitglieds
+    erneut abzulaufen, werden nur noch die Einstiegs-/Exit-EREIGNISSE in
+    Zeitreihenfolge mit dem gemeinsamen Kapital verrechnet (exakt dieselbe
+    Arithmetik wie der Kerzen-Loop in run_portfolio_simulation) und die
+    Equity-Kurve aus den unrealisierten PnL-Beitraegen vektoriell aufgebaut.
+
+    Gilt nur, solange das Kapital keine Entscheidung kippt: liefert None
+    (-> Aufrufer faellt auf den vollen Kerzen-Loop zurueck), sobald mit dem
+    echten Kapital ein Einstieg anders ausginge als im Einzel-Strom (Marge
+    bindend, min_notional unterschritten, Kapital <= 0) oder die Equity auf
+    <= 0 faellt (Liquidation). Ein "Fortschreiben" eines fertig simulierten
+    Teams um eine Strategie ist nicht exakt moeglich -- die Positionsgroesse
+    haengt vom gemeinsamen Kapital ab, jede neue Strategie veraendert also
+    alle spaeteren Trades des Teams; die Ereignis-Verrechnung ist dafuer
+    linear in der Anzahl Trades.
+    """
+    n_steps = len(timeline_ns)
+    entries_at, closes_at = {}, {}
+    streams = []
+    for k, prepared in enumerate(strat_list):
+        stream = _solo_trade_stream(prepared)
+        streams.append(stream)
+        if not stream:
+            continue
+        step_of_bar = np.searchsorted(timeline_ns, arrays_list[k]['ts_ns'])
+        for ci, cand in enumerate(stream):
+            entries_at.setdefault(int(step_of_bar[cand['bar']]), []).append((k, ci))
+            if cand['exit_bar'] is not None:
+                closes_at.setdefault(int(step_of_bar[cand['exit_bar']]), []).append(k)
+
+    equity = start_capital
+    used_margin = 0.0
+    open_trades = {}     # k -> (candidate, position); Einfuege-Reihenfolge wie open_positions
+    ledger = TradeLedger(_ledger_strategies(strat_keys, strat_list), timeline.tz)
+    realized_steps, realized_values = [], []
+    unrealized_parts = [np.zeros(len(arr['ts_ns'])) for arr in arrays_list]
+
+    for step in sorted(set(entries_at) | set(closes_at)):
+        ts = timeline[step]
+        closing = closes_at.get(step)
+        if closing:
+            for k in [k for k in open_trades if k in closing]:
+                cand, pos = open_trades.pop(k)
+                net_pnl = close_pnl(pos['side'], pos['entry_price'], cand['exit_price'], pos['notional_value'])
+                equity += net_pnl
+                used_margin -= pos['margin_used']
+                ledger.append(k, pos, ts, cand['exit_price'], net_pnl)
+            realized_steps.append(step)
+            realized_values.append(equity)
+        if not open_trades:
+            used_margin = 0.0
+
+        for k, ci in entries_at.get(step, ()):
+            cand = streams[k][ci]
+            plan = cand['plan']
+            if equity > 0:
+                final_notional, margin_used = _size_entry(equity, plan)
+                would_take = final_notional >= MIN_NOTIONAL and used_margin + margin_used <= equity
+            else:
+                would_take = False
+            if would_take != cand['taken']:
+                return None  # Kapital kippt eine Einstiegs-Entscheidung -> voller Loop
+            if not would_take:
+                continue
+            strat = strat_list[k]
+            pos = _open_position(plan, final_notional, margin_used, ts, strat.get('symbol') or strat_keys[k], strat.get('timeframe', ''))
+            open_trades[k] = (cand, pos)
+            used_margin += margin_used
+
+            # Unrealisierter PnL-Beitrag auf den Kerzen ZWISCHEN Einstieg und
+            # Exit (Einstiegskerze: Position existiert erst nach Schritt A;
+            # Exit-Kerze: realisiert). Zeitschritte ohne eigene Kerze nutzen den
+            # letzten bekannten Close, siehe Zuordnung unten.
+            first = cand['bar'] + 1
+            last = cand['exit_bar'] if cand['exit_bar'] is not None else len(arrays_list[k]['ts_ns'])
+            if last > first:
+                closes = np.asarray(arrays_list[k]['close'][first:last])
+                pnl_mult = 1 if pos['side'] == 'long' else -1
+                unrealized_parts[k][first:last] = final_notional * (closes / pos['entry_price'] - 1) * pnl_mult
+
+    # Realisiertes Kapital je Zeitschritt (Stufenfunktion) + unrealisierte
+    # Beitraege (je Strategie die letzte eigene Kerze <= Zeitschritt).
+    steps = np.arange(n_steps)
+    if realized_steps:
+        idx = np.searchsorted(np.asarray(realized_steps), steps, side='right') - 1
+        realized = np.where(idx >= 0, np.asarray(realized_values, dtype='float64')[np.maximum(idx, 0)], start_capital)
+    else:
+        realized = np.full(n_steps, float(start_capital))
+    unrealized = np.zeros(n_steps)
+    for k, arr in enumerate(arrays_list):
+        last_bar = np.searchsorted(arr['ts_ns'], timeline_ns, side='right') - 1
+        unrealized += np.where(last_bar >= 0, unrealized_parts[k][np.maximum(last_bar, 0)], 0.0)
+    equity_values = realized + unrealized
+
+    if n_steps and equity_values.min() <= 0:
+        return None  # Liquidation -> voller Loop bestimmt den exakten Abbruch
+
+    peak = np.maximum(np.maximum.accumulate(equity_values), start_capital) if n_steps else equity_values
+    drawdowns = np.where(peak > 0, (peak - equity_values) / np.where(peak > 0, peak, 1), 0.0)
+    max_drawdown_pct = float(drawdowns.max()) if n_steps else 0.0
+    max_drawdown_date = timeline[int(np.argmax(drawdowns))] if max_drawdown_pct > 0 else None
+    min_equity_ever = min(start_capital, float(equity_values.min())) if n_steps else start_capital
+
+    return _build_result(start_capital, timeline, equity_values, ledger.freeze(), max_drawdown_pct,
+                         max_drawdown_date, min_equity_ever, None)
+
+
+class SimulationResult(dict):
+    """
+    Ergebnis-Dict von run_portfolio_simulation() mit LAZY 'equity_curve' und
+    'trade_history':
+    - Equity/Peak/Drawdown liegen als float64-Arrays vor (equity_arrays) und
+      werden erst beim ersten Zugriff auf result['equity_curve'] /
+      result.get('equity_curve') zum DataFrame zusammengebaut. Die Team-Suche
+      des Portfolio-Optimierers braucht fuer ihre Zwischen-Kandidaten nur die
+      Kennzahlen -- der DataFrame (Timestamp-Index ueber alle Zeitschritte) war
+      dort pro simuliertem Team der groesste Einzelposten an Zeit und Speicher.
+    - Die Trades liegen typisiert in result['trade_ledger'] (TradeLedger);
+      'trade_history' ist die daraus erst bei Bedarf erzeugte Dict-Liste.
+    """
+    _LAZY_KEYS = ('equity_curve', 'trade_history')
+
+    def __init__(self, data, timeline, equity, peak, drawdown):
+        super().__init__(data)
+        self.equity_arrays = {'timestamp': timeline, 'equity': equity, 'peak': peak, 'drawdown_pct': drawdown}
+
+    def _materialize(self, key):
+        if key == 'trade_history':
+            value = self['trade_ledger'].to_dicts()
+        else:
+            arrays = self.equity_arrays
+            if len(arrays['equity']) == 0:
+                value = pd.DataFrame()
+            else:
+                value = pd.DataFrame(arrays)
+                value['timestamp'] = pd.to_datetime(value['timestamp'])
+                value.set_index('timestamp', inplace=True, drop=False)
+        dict.__setitem__(self, key, value)
+        return value
+
+    def __missing__(self, key):
+        if key in self._LAZY_KEYS:
+            return self._materialize(key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self._LAZY_KEYS and not dict.__contains__(self, key):
+            return self._materialize(key)
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        return key in self._LAZY_KEYS or super().__contains__(key)
+
+
+def _curve_peak_drawdown(equity_values):
+    # Peak/Drawdown der Equity-Kurve selbst (ohne Startkapital als Anfangs-Peak,
+    # wie die Spalten 'peak'/'drawdown_pct' schon immer berechnet wurden).
+    peak = np.maximum.accumulate(equity_values) if len(equity_values) else equity_values.copy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = np.where(peak != 0, (peak - equity_values) / peak, 0.0)
+    return peak, drawdown
+
+
+def _build_result(start_capital, timeline, equity_values, ledger, max_drawdown_pct, max_drawdown_date,
+                  min_equity_ever, liquidation_date, peak_values=None, drawdown_values=None):
+    if peak_values is None:
+        peak_values, drawdown_values = _curve_peak_drawdown(equity_values)
+    final_equity = equity_values[-1] if len(equity_values) else start_capital
+    total_pnl_pct = (final_equity / start_capital - 1) * 100 if start_capital > 0 else 0
+    trade_count = len(ledger)
+    wins = int((ledger['pnl'] > 0).sum())
+    win_rate = (wins / trade_count * 100) if trade_count else 0
+
+    return SimulationResult({
+        "start_capital": start_capital,
+        "end_capital": final_equity,
+        "total_pnl_pct": total_pnl_pct,
+        "trade_count": trade_count,
+        "win_rate": win_rate,
+        "max_drawdown_pct": max_drawdown_pct * 100,
+        "max_drawdown_date": max_drawdown_date,
+        "min_equity": min_equity_ever,
+        "liquidation_date": liquidation_date,
+        "trade_ledger": ledger,
+    }, timeline, equity_values, peak_values, drawdown_values)
+
+
+def run_portfolio_simulation(start_capital, strategies_data, start_date, end_date, verbose=True, analytic=True):
     """
     Führt eine chronologische Portfolio-Simulation mit mehreren StBot-Strategien durch.
+    analytic=True: zuerst die schnelle Ereignis-Kombination der Einzel-Trade-
+    Stroeme versuchen (_combine_trade_streams), nur falls das Kapital dort eine
+    Entscheidung kippt der volle Kerzen-Loop.
     """
     if verbose:
         print("\n--- Starte Portfolio-Simulation (StBot SRv2)... ---")
         print("1/3: Bereite Strategie-Daten vor...")
 
     processed_strategies = {}
-    all_timestamps = set()
 
     _iter = tqdm(strategies_data.items(), desc="Verarbeite Strategien") if verbose else strategies_data.items()
     for key, strat in _iter:
         try:
-            df = strat['data'].copy()
-            if df.empty or len(df) < 100: continue
-
-            params = strat.get('smc_params', {}) # Im Simulator heissen sie evtl. noch smc_params
-            if not params: params = strat.get('strategy', {})
-
-            # 1a. ATR berechnen
-            atr_indicator = ta.volatility.AverageTrueRange(high=df['high'], low=df['low'], close=df['close'], window=14)
-            df['atr'] = atr_indicator.average_true_range()
-
-            # 1b. SR Engine
-            engine = SREngine(settings=params)
-            df = engine.process_dataframe(df)
-
-            # NaN Werte am Anfang entfernen
-            df.dropna(subset=['atr', 'sr_signal'], inplace=True)
-
-            if df.empty: continue
-
-            processed_strategies[key] = {
-                'data': df,
-                'params': params,
-                'risk_params': strat.get('risk_params', {}),
-                'symbol': strat.get('symbol', key),
-                'timeframe': strat.get('timeframe', ''),
-                'fine_data': strat.get('fine_data'),
-                'coarse_duration': df.index[1] - df.index[0] if len(df.index) >= 2 else None,
-            }
-
-            all_timestamps.update(df.index)
+            prepared = prepare_strategy(strat)
+            if prepared is None: continue
+            _build_arrays(prepared)
+            processed_strategies[key] = prepared
 
         except Exception as e:
             print(f"Fehler bei Vorbereitung von {key}: {e}")
@@ -72,9 +453,22 @@ def run_portfolio_simulation(start_capital, strategies_data, start_date, end_dat
     if not processed_strategies:
         return None
 
-    sorted_timestamps = sorted(list(all_timestamps))
+    strat_keys = list(processed_strategies.keys())
+    strat_list = [processed_strategies[k] for k in strat_keys]
+    arrays_list = [st['arrays'] for st in strat_list]
+    timeline_ns, bounds, ev_strat, ev_bar = _merge_timelines(arrays_list)
+    tz = arrays_list[0]['times'].tz
+    timeline = pd.DatetimeIndex(timeline_ns, tz='UTC').tz_convert(tz) if tz is not None else pd.DatetimeIndex(timeline_ns)
+
+    if analytic:
+        result = _combine_trade_streams(start_capital, strat_keys, strat_list, arrays_list, timeline_ns, timeline)
+        if result is not None:
+            if verbose:
+                print(f"-> {len(timeline)} Zeitschritte analytisch aus den Einzel-Trade-Stroemen kombiniert.")
+            return result
+
     if verbose:
-        print(f"-> {len(sorted_timestamps)} Zeitschritte zu simulieren.")
+        print(f"-> {len(timeline)} Zeitschritte zu simulieren.")
         print("2/3: Führe Simulation durch...")
 
     equity = start_capital
@@ -84,182 +478,90 @@ def run_portfolio_simulation(start_capital, strategies_data, start_date, end_dat
     min_equity_ever = start_capital
     liquidation_date = None
 
-    open_positions = {} # Key: strategy_key
-    trade_history = []
-    equity_curve = []
-
-    fee_pct = 0.06 / 100
-    max_allowed_effective_leverage = 10
-    absolute_max_notional_value = 1000000
-    min_notional = 5.0
-
-    _ts_iter = tqdm(sorted_timestamps, desc="Simuliere") if verbose else sorted_timestamps
-    for ts in _ts_iter:
+    open_positions = {} # Key: Strategie-Index (Position in strat_keys)
+    used_margin = 0.0   # laufende Summe margin_used aller offenen Positionen
+    ledger = TradeLedger(_ledger_strategies(strat_keys, strat_list), tz)
+    # Vorallokierte Equity-Kurve (statt ein Dict je Zeitschritt); 'peak'/'drawdown'
+    # sind die Kurven-Spalten (laufendes Maximum der Kurve selbst), nicht der
+    # Startkapital-basierte Peak fuer max_drawdown_pct weiter unten.
+    n_steps = len(timeline)
+    equity_values = np.empty(n_steps, dtype='float64')
+    peak_values = np.empty(n_steps, dtype='float64')
+    drawdown_values = np.empty(n_steps, dtype='float64')
+    curve_peak = -np.inf
+    filled = 0
+
+    _step_iter = tqdm(range(len(timeline)), desc="Simuliere") if verbose else range(len(timeline))
+    for step in _step_iter:
         if liquidation_date: break
 
+        ts = timeline[step]
+        # Strategien mit einer Kerze zu diesem Zeitstempel -> Cursor in deren Arrays
+        bars_now = {ev_strat[e]: ev_bar[e] for e in range(bounds[step], bounds[step + 1])}
+
         current_total_equity = equity
         unrealized_pnl = 0
         positions_to_close = []
 
         # A) Offene Positionen managen
-        for key, pos in open_positions.items():
-            strat = processed_strategies.get(key)
-            if not strat or ts not in strat['data'].index:
+        for k, pos in open_positions.items():
+            bar = bars_now.get(k)
+            if bar is None:
                 if pos.get('last_known_price'):
                     pnl_mult = 1 if pos['side'] == 'long' else -1
                     unrealized_pnl += pos['notional_value'] * (pos['last_known_price'] / pos['entry_price'] - 1) * pnl_mult
                 continue
 
-            current_candle = strat['data'].loc[ts]
-            pos['last_known_price'] = current_candle['close']
-
-            # Live platziert KEINE feste TP-Order (siehe trade_manager.py) - nur ein harter
-            # SL-Trigger und ein Trailing-Stop (Aktivierung bei activation_rr, Rueckzug bei
-            # callback_rate). Die zuvor hier simulierte statische TP-Order existiert live nicht
-            # und ueberzeichnete die Portfolio-Auswahl (Live-vs-Backtest-Analyse 2026-07-30).
-            callback_rate = pos['callback_rate']
-            o, h, l, c = current_candle['open'], current_candle['high'], current_candle['low'], current_candle['close']
-            # Intracandle-Pfad: bevorzugt aus echten feineren Kerzen aufgebaut
-            # (oraclebot-Muster), sonst Fallback auf die alte 4-Punkte-Annaeherung.
-            path = None
-            fine_data = strat.get('fine_data')
-            coarse_duration = strat.get('coarse_duration')
-            if fine_data is not None and coarse_duration is not None:
-                fine_slice = _get_fine_slice(fine_data, ts, ts + coarse_duration)
-                if fine_slice is not None and not fine_slice.empty:
-                    path = _build_fine_path(fine_slice)
-            if not path:
-                path = [o, l, h, c] if c >= o else [o, h, l, c]
-
-            exit_price = None
-            for p in path:
-                if pos['side'] == 'long':
-                    if p <= pos['stop_loss']:
-                        exit_price = pos['stop_loss']
-                        break
-                    if not pos['trailing_active'] and p >= pos['activation_price']:
-                        pos['trailing_active'] = True
-                        pos['peak_price'] = p
-                    if pos['trailing_active']:
-                        pos['peak_price'] = max(pos['peak_price'], p)
-                        trail_level = pos['peak_price'] * (1 - callback_rate)
-                        if p <= trail_level:
-                            exit_price = trail_level
-                            break
-                else:
-                    if p >= pos['stop_loss']:
-                        exit_price = pos['stop_loss']
-                        break
-                    if not pos['trailing_active'] and p <= pos['activation_price']:
-                        pos['trailing_active'] = True
-                        pos['peak_price'] = p
-                    if pos['trailing_active']:
-                        pos['peak_price'] = min(pos['peak_price'], p)
-                        trail_level = pos['peak_price'] * (1 + callback_rate)
-                        if p >= trail_level:
-                            exit_price = trail_level
-                            break
+            arr = arrays_list[k]
+            c = arr['close'][bar]
+            pos['last_known_price'] = c
+
+            exit_price = scan_exit(pos, arr['bars'].path(bar))
 
             if exit_price:
-                pnl_pct = (exit_price / pos['entry_price'] - 1) if pos['side'] == 'long' else (1 - exit_price / pos['entry_price'])
-                pnl_usd = pos['notional_value'] * pnl_pct
-                total_fees = pos['notional_value'] * fee_pct * 2
-                net_pnl = pnl_usd - total_fees
+                net_pnl = close_pnl(pos['side'], pos['entry_price'], exit_price, pos['notional_value'])
                 equity += net_pnl
-                trade_history.append({
-                    'strategy_key': key,
-                    'ts':         ts.isoformat() if hasattr(ts, 'isoformat') else str(ts),
-                    'entry_time': pos.get('entry_time', ts).isoformat() if hasattr(pos.get('entry_time', ts), 'isoformat') else str(pos.get('entry_time', ts)),
-                    'symbol':     pos.get('symbol_key', key),
-                    'timeframe':  pos.get('timeframe', ''),
-                    'direction':  pos['side'],
-                    'entry':      pos['entry_price'],
-                    'exit':       exit_price,
-                    'pnl':        net_pnl,
-                    'leverage':   pos.get('leverage', 0),
-                    'margin_used': round(pos.get('margin_used', 0), 4),
-                })
-                positions_to_close.append(key)
+                ledger.append(k, pos, ts, exit_price, net_pnl)
+                positions_to_close.append(k)
             else:
                 pnl_mult = 1 if pos['side'] == 'long' else -1
-                unrealized_pnl += pos['notional_value'] * (current_candle['close'] / pos['entry_price'] - 1) * pnl_mult
+                unrealized_pnl += pos['notional_value'] * (c / pos['entry_price'] - 1) * pnl_mult
 
-        for key in positions_to_close:
-            del open_positions[key]
+        for k in positions_to_close:
+            used_margin -= open_positions.pop(k)['margin_used']
+        if not open_positions:
+            used_margin = 0.0  # Rundungsdrift der laufenden Summe verwerfen
 
         # B) Neue Positionen öffnen
         if equity > 0:
-            for key, strat in processed_strategies.items():
-                if key in open_positions: continue
-                if ts not in strat['data'].index: continue
-
-                current_candle = strat['data'].loc[ts]
-                
-                # Kein MTF Bias Check im Simulator nötig, SRv2 ist standalone stark
-                market_bias = Bias.NEUTRAL
-                
-                # Statt Slice übergeben wir nur aktuelle Candle, da sr_signal schon da ist
-                # trade_logic ignoriert data_slice wenn 'sr_signal' in current_candle ist.
-                params_for_logic = {"strategy": strat['params'], "risk": strat['risk_params']}
-                side, price = get_titan_signal(strat['data'], current_candle, params_for_logic, market_bias)
-
-                if side:
-                    risk_params = strat['risk_params']
-                    entry_price = current_candle['close']
-                    current_atr = current_candle['atr']
-
-                    atr_mult = risk_params.get('atr_multiplier_sl', 2.0)
-                    min_sl = risk_params.get('min_sl_pct', 0.5) / 100.0
-                    sl_dist = max(current_atr * atr_mult, entry_price * min_sl)
-
-                    if sl_dist <= 0: continue
-
-                    risk_per_trade = risk_params.get('risk_per_trade_pct', 1.0) / 100.0
-                    risk_usd = equity * risk_per_trade
-
-                    sl_pct = sl_dist / entry_price
-                    if sl_pct <= 0: continue
-
-                    calc_notional = risk_usd / sl_pct
-                    leverage = risk_params.get('leverage', 10)
-
-                    max_notional = equity * max_allowed_effective_leverage
-                    final_notional = min(calc_notional, max_notional, absolute_max_notional_value)
-                    if final_notional < min_notional: continue
-
-                    margin_used = math.ceil((final_notional / leverage) * 100) / 100
-                    current_used_margin = sum(p['margin_used'] for p in open_positions.values())
-
-                    if current_used_margin + margin_used > equity: continue
-
-                    rr = risk_params.get('risk_reward_ratio', 2.0)
-                    act_rr = risk_params.get('trailing_stop_activation_rr', 2.0)
-
-                    if side == 'buy':
-                        sl = entry_price - sl_dist
-                        tp = entry_price + sl_dist * rr
-                        act = entry_price + sl_dist * act_rr
-                    else:
-                        sl = entry_price + sl_dist
-                        tp = entry_price - sl_dist * rr
-                        act = entry_price - sl_dist * act_rr
-
-                    open_positions[key] = {
-                        'side': 'long' if side == 'buy' else 'short',
-                        'entry_price': entry_price, 'stop_loss': sl, 'take_profit': tp,
-                        'activation_price': act, 'trailing_active': False,
-                        'peak_price': entry_price, 'callback_rate': risk_params.get('trailing_stop_callback_rate_pct', 1.0)/100,
-                        'notional_value': final_notional, 'margin_used': margin_used,
-                        'last_known_price': entry_price,
-                        'entry_time': ts,
-                        'symbol_key': strat.get('symbol', key),
-                        'timeframe':  strat.get('timeframe', ''),
-                        'leverage':   leverage,
-                    }
+            for k, bar in bars_now.items():
+                if k in open_positions: continue
+
+                # Signal einmalig in prepare_strategy() vorberechnet (siehe dort)
+                arr = arrays_list[k]
+                signal = arr['signal'][bar]
+                if signal not in (1, -1): continue
+
+                strat = strat_list[k]
+                plan = _plan_entry(signal, arr['close'][bar], arr['atr'][bar], strat['risk_params'])
+                if plan is None: continue
+
+                final_notional, margin_used = _size_entry(equity, plan)
+                if final_notional < MIN_NOTIONAL: continue
+                # Laufende Summe statt sum(...) ueber alle offenen Positionen je Kandidat
+                if used_margin + margin_used > equity: continue
+
+                open_positions[k] = _open_position(plan, final_notional, margin_used, ts,
+                                                   strat.get('symbol') or strat_keys[k], strat.get('timeframe', ''))
+                used_margin += margin_used
 
         # C) Tracking
         current_total_equity = equity + unrealized_pnl
-        equity_curve.append({'timestamp': ts, 'equity': current_total_equity})
+        curve_peak = max(curve_peak, current_total_equity)
+        equity_values[step] = current_total_equity
+        peak_values[step] = curve_peak
+        drawdown_values[step] = (curve_peak - current_total_equity) / curve_peak if curve_peak != 0 else 0.0
+        filled = step + 1
 
         peak_equity = max(peak_equity, current_total_equity)
         drawdown = (peak_equity - current_total_equity) / peak_equity if peak_equity > 0 else 0
@@ -274,28 +576,6 @@ def run_portfolio_simulation(start_capital, strategies_data, start_date, end_dat
     # --- 3. Abschluss ---
     if verbose:
         print("3/3: Bereite Ergebnisse vor...")
-    final_equity = equity_curve[-1]['equity'] if equity_curve else start_capital
-    total_pnl_pct = (final_equity / start_capital - 1) * 100 if start_capital > 0 else 0
-    wins = sum(1 for t in trade_history if t['pnl'] > 0)
-    win_rate = (wins / len(trade_history) * 100) if trade_history else 0
-
-    equity_df = pd.DataFrame(equity_curve)
-    if not equity_df.empty:
-        equity_df['peak'] = equity_df['equity'].cummax()
-        equity_df['drawdown_pct'] = ((equity_df['peak'] - equity_df['equity']) / equity_df['peak'].replace(0, np.nan)).fillna(0)
-        equity_df['timestamp'] = pd.to_datetime(equity_df['timestamp'])
-        equity_df.set_index('timestamp', inplace=True, drop=False)
-
-    return {
-        "start_capital": start_capital,
-        "end_capital": final_equity,
-        "total_pnl_pct": total_pnl_pct,
-        "trade_count": len(trade_history),
-        "win_rate": win_rate,
-        "max_drawdown_pct": max_drawdown_pct * 100,
-        "max_drawdown_date": max_drawdown_date,
-        "min_equity": min_equity_ever,
-        "liquidation_date": liquidation_date,
-        "trade_history": trade_history,
-        "equity_curve": equity_df
-    }
+    return _build_result(start_capital, timeline[:filled], equity_values[:filled], ledger.freeze(),
+                         max_drawdown_pct, max_drawdown_date, min_equity_ever, liquidation_date,
+                         peak_values[:filled], drawdown_values[:filled])
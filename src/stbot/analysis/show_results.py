@@ -2,6 +2,7 @@
 import os
 import sys
 import json
+import numpy as np
 import pandas as pd
 from datetime import date
 import logging
@@ -23,6 +24,7 @@ sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
 from stbot.analysis.backtester import load_data, run_backtest, FINE_TF_MAP, LazyFineData
 from stbot.analysis.portfolio_simulator import run_portfolio_simulation
 from stbot.analysis.portfolio_optimizer import run_portfolio_optimizer
+from stbot.analysis.equity_curve import to_ns, equity_at, strategy_curves
 from stbot.utils.telegram import send_document
 
 # --- Einzel-Analyse ---
@@ -288,16 +290,16 @@ def _generate_portfolio_chart(final_sim, portfolio_files, capital, start_date, e
     eq_times = eq_df['timestamp'].astype(str).tolist()
     eq_vals  = eq_df['equity'].tolist()
 
-    win_x, win_y   = [], []
-    loss_x, loss_y = [], []
-    for t in trade_history:
-        ts  = str(t.get('ts', ''))
-        row = eq_df[eq_df['timestamp'] <= pd.to_datetime(t['ts'])]
-        eq_at = float(row['equity'].iloc[-1]) if not row.empty else capital
-        if float(t['pnl']) > 0:
-            win_x.append(ts);  win_y.append(eq_at)
-        else:
-            loss_x.append(ts); loss_y.append(eq_at)
+    # Equity je Trade per Binaersuche auf der Kurve (siehe equity_curve.py)
+    # statt eines DataFrame-Filters ueber alle Zeitschritte je Trade.
+    trade_ts   = [str(t.get('ts', '')) for t in trade_history]
+    trade_ns   = to_ns(trade_ts)
+    trade_pnl  = np.array([float(t['pnl']) for t in trade_history], dtype='float64')
+    trade_eq   = equity_at(to_ns(eq_df['timestamp']), eq_df['equity'], trade_ns, default=capital)
+    wins       = trade_pnl > 0
+    win_x      = [ts for ts, w in zip(trade_ts, wins.tolist()) if w]
+    loss_x     = [ts for ts, w in zip(trade_ts, wins.tolist()) if not w]
+    win_y, loss_y = trade_eq[wins].tolist(), trade_eq[~wins].tolist()
 
     n_strats  = len(portfolio_files)
     pairs = []
@@ -333,22 +335,12 @@ def _generate_portfolio_chart(final_sim, portfolio_files, capital, start_date, e
         '#ec4899', '#14b8a6', '#a3e635', '#fb923c',
         '#e879f9', '#38bdf8',
     ]
-    strat_trades = {}
-    for t in trade_history:
-        sym = t.get('symbol', '').split('/')[0]
-        tf  = t.get('timeframe', '')
-        k   = f"{sym}/{tf}"
-        strat_trades.setdefault(k, []).append(t)
-
-    for idx, (strat_key, trades) in enumerate(sorted(strat_trades.items())):
-        trades_sorted = sorted(trades, key=lambda x: x.get('ts', ''))
-        eq = capital
-        xs = [str(trades_sorted[0].get('ts', ''))[:16]]
-        ys = [capital]
-        for t in trades_sorted:
-            eq += float(t['pnl'])
-            xs.append(str(t.get('ts', ''))[:16])
-            ys.append(round(eq, 4))
+    strat_keys = [f"{t.get('symbol', '').split('/')[0]}/{t.get('timeframe', '')}" for t in trade_history]
+    curves = strategy_curves(strat_keys, trade_ns, trade_pnl, capital)
+
+    for idx, (strat_key, (sel, curve)) in enumerate(curves.items()):
+        xs = [trade_ts[sel[0]][:16]] + [trade_ts[i][:16] for i in sel.tolist()]
+        ys = [capital] + [round(v, 4) for v in curve[1:].tolist()]
         color = STRAT_COLORS[idx % len(STRAT_COLORS)]
         fig.add_trace(go.Scatter(
             x=xs, y=ys, mode='lines', name=strat_key,
@@ -407,122 +399,96 @@ def _generate_portfolio_chart(final_sim, portfolio_files, capital, start_date, e
         print(f"  {YELLOW}Telegram nicht konfiguriert — nur lokal gespeichert.{NC}")
 
 
-def _generate_trades_excel(final_sim, capital):
-    try:
-        import openpyxl
-        from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-        from openpyxl.utils import get_column_letter
-    except ImportError:
-        print(f"  {YELLOW}openpyxl nicht installiert — Excel übersprungen. (pip install openpyxl){NC}")
-        return
-
-    trade_history = final_sim.get('trade_history', [])
-    if not trade_history:
-        print(f"  {YELLOW}Keine Trades — Excel übersprungen.{NC}")
-        return
+def _trade_rows(final_sim, capital, stats):
+    """
+    Zeilen (stil, werte) fuer _generate_trades_excel -- aus dem TradeLedger
+    blockweise (keine trade_history-Dict-Liste fuer alle Trades), sonst aus
+    einer vorhandenen trade_history. Zaehlt nebenbei Trades/Wins/Endkapital
+    in `stats` fuer die Zusammenfassung.
+    """
+    ledger = final_sim.get('trade_ledger')
+    if ledger is not None:
+        def _source():
+            for chunk in ledger.iter_chunks():
+                dates = ledger.times('entry_time', chunk).strftime('%Y-%m-%d %H:%M')
+                yield from zip(dates, ledger.labels('symbol', chunk), ledger.labels('timeframe', chunk),
+                               chunk['direction'].tolist(), chunk['entry'].tolist(), chunk['exit'].tolist(),
+                               chunk['pnl'].tolist(), chunk['leverage'].tolist(), chunk['margin_used'].tolist())
+        trades = ((d, sym, tf, 'LONG' if direction == 1 else 'SHORT', entry, exit_p, pnl, lev, margin)
+                  for d, sym, tf, direction, entry, exit_p, pnl, lev, margin in _source())
+    else:
+        trades = ((str(t.get('entry_time', t.get('ts', '')))[:16].replace('T', ' '),
+                   t.get('symbol', ''), t.get('timeframe', ''), t.get('direction', '').upper(),
+                   t.get('entry', 0), t.get('exit', 0), t['pnl'], t.get('leverage', 1), t.get('margin_used', 0))
+                  for t in final_sim.get('trade_history', []))
 
     equity = capital
-    rows   = []
-    for i, t in enumerate(trade_history):
-        pnl      = float(t['pnl'])
+    for i, (datum, sym, tf, dir_, entry, exit_p, pnl, lev, margin) in enumerate(trades):
+        pnl      = float(pnl)
         equity  += pnl
-        sym      = t.get('symbol', '')
-        tf       = t.get('timeframe', '')
         strat    = f"{sym.split('/')[0]}/{tf}" if sym else tf
-        dir_     = t.get('direction', '').upper()
-        entry    = round(float(t.get('entry', 0)), 6)
-        exit_p   = round(float(t.get('exit',  0)), 6)
+        entry    = round(float(entry), 6)
+        exit_p   = round(float(exit_p), 6)
         ergebnis = 'TP erreicht' if pnl > 0 else 'SL erreicht'
-        lev      = float(t.get('leverage', 1) or 1)
-        margin   = float(t.get('margin_used', 0))
+        lev      = float(lev or 1)
+        margin   = float(margin)
         if entry > 0:
             raw_move = (exit_p - entry) / entry * 100.0
             move_pct = raw_move if dir_ == 'LONG' else -raw_move
         else:
             move_pct = 0.0
-        rows.append({
-            'Nr':                 i + 1,
-            'Datum':              str(t.get('entry_time', t.get('ts', '')))[:16].replace('T', ' '),
-            'Strategie':          strat,
-            'Richtung':           dir_,
-            'Hebel':              int(lev) if lev else '—',
-            'Reale Bewegung (%)': round(move_pct, 4),
-            'Marge (USDT)':       round(margin, 4),
-            'Entry':              entry,
-            'Exit':               exit_p,
-            'Ergebnis':           ergebnis,
-            'PnL (USDT)':         round(pnl,    4),
-            'Kapital':            round(equity, 4),
-        })
-
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = 'Trades'
-
-    header_fill = PatternFill('solid', fgColor='1E3A5F')
-    win_fill    = PatternFill('solid', fgColor='D6F4DC')
-    loss_fill   = PatternFill('solid', fgColor='FAD7D7')
-    alt_fill    = PatternFill('solid', fgColor='F2F2F2')
-    thin_border = Border(
-        left=Side(style='thin', color='CCCCCC'), right=Side(style='thin', color='CCCCCC'),
-        top=Side(style='thin', color='CCCCCC'),  bottom=Side(style='thin', color='CCCCCC'),
-    )
-    col_widths = {
-        'Nr': 5, 'Datum': 18, 'Strategie': 22, 'Richtung': 10,
-        'Hebel': 8, 'Reale Bewegung (%)': 18, 'Marge (USDT)': 14,
-        'Entry': 14, 'Exit': 14, 'Ergebnis': 14, 'PnL (USDT)': 14, 'Kapital': 16,
-    }
-
-    headers = list(rows[0].keys())
-    for col, h in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=h)
-        cell.fill      = header_fill
-        cell.font      = Font(bold=True, color='FFFFFF', size=11)
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        cell.border    = thin_border
-        ws.column_dimensions[get_column_letter(col)].width = col_widths.get(h, 14)
-    ws.row_dimensions[1].height = 22
-
-    for r_idx, row in enumerate(rows, 2):
-        if row['Ergebnis'] == 'TP erreicht':
-            fill = win_fill
-        elif r_idx % 2 == 0:
-            fill = loss_fill
-        else:
-            fill = alt_fill
-        for col, key in enumerate(headers, 1):
-            cell = ws.cell(row=r_idx, column=col, value=row[key])
-            cell.fill      = fill
-            cell.border    = thin_border
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            if key in ('Entry', 'Exit', 'PnL (USDT)', 'Kapital', 'Reale Bewegung (%)', 'Marge (USDT)'):
-                cell.number_format = '#,##0.0000'
-        ws.row_dimensions[r_idx].height = 18
-
-    total = len(rows)
-    wins  = sum(1 for r in rows if r['Ergebnis'] == 'TP erreicht')
-    sr    = total + 3
-    pnl_total = rows[-1]['Kapital'] - capital if rows else 0.0
-    pnl_pct   = pnl_total / capital * 100 if capital else 0.0
-    ws.cell(row=sr, column=1, value='Zusammenfassung').font = Font(bold=True, size=11)
-    for label, value in [
-        ('Trades gesamt', total),
-        ('Win-Rate',      f"{wins / total * 100:.1f}%" if total else '—'),
-        ('PnL',           f"{pnl_pct:+.1f}%"),
-        ('Endkapital',    f"{rows[-1]['Kapital']:.2f} USDT" if rows else '—'),
-    ]:
-        ws.cell(row=sr, column=1, value=label).font = Font(bold=True)
-        ws.cell(row=sr, column=2, value=value)
-        sr += 1
+        kapital = round(equity, 4)
+        stats['total'] += 1
+        stats['wins']  += ergebnis == 'TP erreicht'
+        stats['kapital'] = kapital
+        # Zeile r_idx = i + 2 (Kopfzeile = 1): Verlust-Zeilen abwechselnd rot/grau
+        style = 'win' if ergebnis == 'TP erreicht' else ('loss' if i % 2 == 0 else 'alt')
+        yield style, (i + 1, datum, strat, dir_, int(lev) if lev else '—', round(move_pct, 4),
+                      round(margin, 4), entry, exit_p, ergebnis, round(pnl, 4), kapital)
+
+
+def _generate_trades_excel(final_sim, capital):
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        print(f"  {YELLOW}openpyxl nicht installiert — Excel übersprungen. (pip install openpyxl){NC}")
+        return
+    from stbot.analysis.excel_report import write_trade_workbook
+
+    ledger = final_sim.get('trade_ledger')
+    has_trades = len(ledger) > 0 if ledger is not None else bool(final_sim.get('trade_history', []))
+    if not has_trades:
+        print(f"  {YELLOW}Keine Trades — Excel übersprungen.{NC}")
+        return
+
+    columns = [('Nr', 5, False), ('Datum', 18, False), ('Strategie', 22, False), ('Richtung', 10, False),
+               ('Hebel', 8, False), ('Reale Bewegung (%)', 18, True), ('Marge (USDT)', 14, True),
+               ('Entry', 14, True), ('Exit', 14, True), ('Ergebnis', 14, False),
+               ('PnL (USDT)', 14, True), ('Kapital', 16, True)]
+    stats = {'total': 0, 'wins': 0, 'kapital': None}
+
+    def _pnl_pct():
+        pnl_total = stats['kapital'] - capital if stats['total'] else 0.0
+        return pnl_total / capital * 100 if capital else 0.0
+
+    def _summary():
+        total = stats['total']
+        return [
+            ('Trades gesamt', total),
+            ('Win-Rate',      f"{stats['wins'] / total * 100:.1f}%" if total else '—'),
+            ('PnL',           f"{_pnl_pct():+.1f}%"),
+            ('Endkapital',    f"{stats['kapital']:.2f} USDT" if total else '—'),
+        ]
 
     out_dir  = os.path.join(PROJECT_ROOT, 'artifacts', 'charts')
     os.makedirs(out_dir, exist_ok=True)
     out_file = os.path.join(out_dir, 'stbot_trades.xlsx')
-    wb.save(out_file)
+    write_trade_workbook(out_file, columns, _trade_rows(final_sim, capital, stats), _summary)
     print(f"  {GREEN}Excel gespeichert: stbot_trades.xlsx{NC}")
 
     bot_token, chat_id = _get_telegram_cfg()
     if bot_token and chat_id:
+        total, wins, pnl_pct = stats['total'], stats['wins'], _pnl_pct()
         caption = (f"StBot Trades — {total} Trades | "
                    f"WR: {wins / total * 100:.1f}% | PnL: {pnl_pct:+.1f}%" if total else "StBot Trades")
         send_document(bot_token, chat_id, out_file, caption=caption)
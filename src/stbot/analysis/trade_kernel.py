@@ -0,0 +1,543 @@
+# src/stbot/analysis/trade_kernel.py
+"""
+Gemeinsamer Simulations-Kern fuer alle Backtest-Einstiege (run_backtest,
+Portfolio-Simulation, interactive_status, daten/realistic_backtest.py).
+
+Bisher war die Exit-Logik (harter SL + Trailing-Stop) viermal kopiert -- mit
+feinen Unterschieden: die Portfolio-Simulation kannte weder Breakeven noch die
+enge Trailing-Stufe und nahm min_sl_pct=0.5 als Default (run_backtest: 0.3),
+interactive_status simulierte noch eine statische TP-Order und trailte auf
+Kerzen-High/Low, realistic_backtest lief auf 1m-High/Low ab der Einstiegs-
+KERZE (sah also die Kerze, an deren Close eingestiegen wird). Status-Charts
+zeigten dadurch andere Trades als der Optimizer bewertet hatte.
+
+Jetzt gibt es genau EINE Exit-Semantik (scan_exit, die von run_backtest) und
+EINEN Kerzen-Loop (find_exit). Der Loop ist nicht mehr "jede Kerze in Python":
+solange eine Position offen ist, wird per NumPy vorab geprueft, ab welcher
+Kerze ueberhaupt etwas passieren KANN (SL erreicht, Aktivierung/Breakeven
+erreicht, Trail-Level mit dem hoechstmoeglichen Peak erreichbar) -- die
+Kerzen davor aendern am Positionszustand nichts ausser dem Peak (laufendes
+Maximum, ebenfalls vektoriell). Nur die Kandidaten-Kerze wird exakt Punkt
+fuer Punkt abgelaufen. Die Vorpruefung ist eine notwendige Bedingung, die
+Ergebnisse sind damit identisch zum frueheren Loop ueber jede Kerze.
+
+Ergebnis einer Einzel-Simulation ist ein TradeLedger (typisiertes Trade-
+Protokoll, dasselbe Format wie in der Portfolio-Simulation).
+"""
+import bisect
+
+import numpy as np
+import pandas as pd
+
+FEE_PCT = 0.06 / 100  # Bitget Taker ca.
+MAX_EFFECTIVE_LEVERAGE = 10  # Hardcap effektiver Hebel (Notional / Kapital)
+ABSOLUTE_MAX_NOTIONAL = 1000000
+
+# Erste Vorpruef-Blockgroesse (Kerzen); waechst je Block, die meisten Trades
+# schliessen nach wenigen Dutzend Kerzen.
+_SCREEN_CHUNK = 64
+_SCREEN_CHUNK_MAX = 4096
+
+_MISSING = object()
+
+
+# ---------------------------------------------------------------------------
+# Intrabar-Pfad
+# ---------------------------------------------------------------------------
+
+def get_fine_slice(fine_data, start_ts, end_ts):
+    """Liest ein Fein-Daten-Fenster aus -- akzeptiert sowohl einen bereits
+    komplett geladenen DataFrame (alte, eager Nutzung) als auch ein
+    LazyFineData-Objekt (neue, on-demand Nutzung), per Duck-Typing."""
+    if fine_data is None:
+        return None
+    if hasattr(fine_data, 'get_slice'):
+        return fine_data.get_slice(start_ts, end_ts)
+    index = fine_data.index
+    if index.is_monotonic_increasing:
+        # Sortierter Index: binaere Suche statt Vergleich ueber alle Fein-Kerzen
+        return fine_data.iloc[index.searchsorted(start_ts, 'left'):index.searchsorted(end_ts, 'left')]
+    return fine_data.loc[(index >= start_ts) & (index < end_ts)]
+
+
+def build_fine_path(fine_slice):
+    """
+    Baut aus den feineren Kerzen innerhalb einer Coarse-Kerze eine granulare
+    Preis-Pfad-Liste (statt der 4-Punkte-Annaeherung [o,l,h,c]/[o,h,l,c] anhand
+    der Kerzenfarbe). Jede Fein-Kerze traegt ihrerseits [open, low/high in
+    Farbrichtung, close] bei -- deutlich naeher an der Realitaet als eine
+    einzelne Grobkerze.
+    """
+    o = fine_slice['open'].to_numpy(dtype='float64')
+    h = fine_slice['high'].to_numpy(dtype='float64')
+    l = fine_slice['low'].to_numpy(dtype='float64')
+    c = fine_slice['close'].to_numpy(dtype='float64')
+    bullish = c >= o
+    points = np.empty((len(o), 4))
+    points[:, 0] = o
+    points[:, 1] = np.where(bullish, l, h)
+    points[:, 2] = np.where(bullish, h, l)
+    points[:, 3] = c
+    return points.ravel().tolist()
+
+
+def _fine_path_bounds(times, coarse_duration, fine_data, coarse_max, coarse_min):
+    """Min/Max des Intrabar-Pfads je Coarse-Kerze bei komplett geladenen
+    Fein-Daten (Kerzen ohne Fein-Daten: 4-Punkte-Pfad). None, wenn das nicht
+    vorab bestimmbar ist (LazyFineData, unsortierter Index)."""
+    if not isinstance(fine_data, pd.DataFrame) or not fine_data.index.is_monotonic_increasing:
+        return None, None
+    fine_ns = fine_data.index.asi8
+    coarse_ns = times.asi8
+    starts = np.searchsorted(fine_ns, coarse_ns, 'left')
+    ends = np.searchsorted(fine_ns, coarse_ns + coarse_duration.value, 'left')
+    has_fine = ends > starts
+    path_max, path_min = coarse_max.copy(), coarse_min.copy()
+    if has_fine.any():
+        cols = [fine_data[col].to_numpy(dtype='float64') for col in ('open', 'high', 'low', 'close')]
+        # Sentinel am Ende: reduceat braucht Indizes < len, ends darf == len sein
+        fine_max = np.append(np.fmax.reduce(cols), np.nan)
+        fine_min = np.append(np.fmin.reduce(cols), np.nan)
+        bounds = np.empty(2 * int(has_fine.sum()), dtype=np.int64)
+        bounds[0::2], bounds[1::2] = starts[has_fine], ends[has_fine]
+        path_max[has_fine] = np.fmax.reduceat(fine_max, bounds)[0::2]
+        path_min[has_fine] = np.fmin.reduceat(fine_min, bounds)[0::2]
+    return path_max, path_min
+
+
+class BarData:
+    """
+    Kerzen einer Strategie fuer den Simulations-Kern: OHLC als Python-Listen
+    (Element-Zugriff im Punkt-Loop) und als Arrays (Vorpruefung), dazu die
+    Intrabar-Pfade -- bevorzugt aus echten feineren Kerzen (oraclebot-Muster),
+    je Kerze einmal gebaut und gemerkt, sonst die 4-Punkte-Annaeherung anhand
+    der Kerzenfarbe.
+    """
+
+    def __init__(self, frame, fine_data=None):
+        self.times = frame.index
+        self.open = frame['open'].to_numpy(dtype='float64').tolist()
+        self.high = frame['high'].to_numpy(dtype='float64').tolist()
+        self.low = frame['low'].to_numpy(dtype='float64').tolist()
+        self.close = frame['close'].to_numpy(dtype='float64').tolist()
+        self.fine_data = fine_data
+        self.coarse_duration = self.times[1] - self.times[0] if len(self.times) >= 2 else None
+        self._fine_paths = {}
+
+        cols = [frame[col].to_numpy(dtype='float64') for col in ('open', 'high', 'low', 'close')]
+        coarse_max, coarse_min = np.fmax.reduce(cols), np.fmin.reduce(cols)
+        if fine_data is None or self.coarse_duration is None:
+            self.path_max, self.path_min = coarse_max, coarse_min
+        else:
+            self.path_max, self.path_min = _fine_path_bounds(self.times, self.coarse_duration, fine_data,
+                                                             coarse_max, coarse_min)
+
+    def __len__(self):
+        return len(self.close)
+
+    def path(self, bar):
+        if self.fine_data is not None and self.coarse_duration is not None:
+            fine_path = self._fine_paths.get(bar, _MISSING)
+            if fine_path is _MISSING:
+                ts = self.times[bar]
+                fine_slice = get_fine_slice(self.fine_data, ts, ts + self.coarse_duration)
+                fine_path = build_fine_path(fine_slice) if fine_slice is not None and not fine_slice.empty else None
+                self._fine_paths[bar] = fine_path
+            if fine_path:
+                return fine_path
+        o, h, l, c = self.open[bar], self.high[bar], self.low[bar], self.close[bar]
+        return (o, l, h, c) if c >= o else (o, h, l, c)
+
+
+# ---------------------------------------------------------------------------
+# Position: Level, Groesse, Exit
+# ---------------------------------------------------------------------------
+
+def stop_distance(entry_price, atr, risk_params):
+    """SL-Abstand: ATR-Vielfaches, mindestens min_sl_pct vom Einstiegspreis."""
+    atr_multiplier_sl = risk_params.get('atr_multiplier_sl', 2.0)
+    min_sl_pct = risk_params.get('min_sl_pct', 0.3) / 100.0
+    return max(atr * atr_multiplier_sl, entry_price * min_sl_pct)
+
+
+def size_position(capital, entry_price, sl_dist, risk_params):
+    """(Notional, Marge) fuer einen Einstieg mit Risiko risk_per_trade_pct vom
+    Kapital, oder None, wenn kein gueltiger SL-Abstand bzw. die Marge das
+    Kapital uebersteigt."""
+    risk_amount_usd = capital * (risk_params.get('risk_per_trade_pct', 1.0) / 100)
+    sl_pct = sl_dist / entry_price
+    if sl_pct <= 0:
+        return None
+    final_notional = min(risk_amount_usd / sl_pct, capital * MAX_EFFECTIVE_LEVERAGE, ABSOLUTE_MAX_NOTIONAL)
+    margin_needed = final_notional / risk_params.get('leverage', 10)
+    if margin_needed > capital:
+        return None
+    return final_notional, margin_needed
+
+
+def new_position(side, entry_price, sl_dist, risk_params, **fields):
+    """
+    Positions-Dict ('long'/'short') mit allen Exit-Leveln. Live platziert KEINE
+    feste TP-Order (siehe trade_manager.py) -- take_profit ist nur informativ.
+
+    Profit-Protection (optional, standardmaessig aus): breakeven_trigger_rr
+    zieht den SL auf den Einstieg, sobald der Preis dieses RR-Vielfache
+    erreicht; ab tight_trail_rr gilt die engere tight_callback_rate_pct.
+    """
+    rr = risk_params.get('risk_reward_ratio', 2.0)
+    activation_rr = risk_params.get('trailing_stop_activation_rr', 2.0)
+    callback_rate = risk_params.get('trailing_stop_callback_rate_pct', 1.0) / 100
+    breakeven_trigger_rr = risk_params.get('breakeven_trigger_rr', 0)  # 0 = aus
+    tight_trail_rr = risk_params.get('tight_trail_rr', 0)  # 0 = aus
+    tight_callback_rate = risk_params.get('tight_callback_rate_pct', 0) / 100
+
+    if side == 'long':
+        sl = entry_price - sl_dist
+        tp = entry_price + sl_dist * rr
+        act = entry_price + sl_dist * activation_rr
+        breakeven_price = entry_price + sl_dist * breakeven_trigger_rr if breakeven_trigger_rr > 0 else None
+        tight_price = entry_price + sl_dist * tight_trail_rr if tight_trail_rr > 0 else None
+    else:
+        sl = entry_price + sl_dist
+        tp = entry_price - sl_dist * rr
+        act = entry_price - sl_dist * activation_rr
+        breakeven_price = entry_price - sl_dist * breakeven_trigger_rr if breakeven_trigger_rr > 0 else None
+        tight_price = entry_price - sl_dist * tight_trail_rr if tight_trail_rr > 0 else None
+
+    position = {
+        'side': side, 'entry_price': entry_price, 'sl_dist': sl_dist,
+        'stop_loss': sl, 'take_profit': tp, 'activation_price': act,
+        'callback_rate': callback_rate,
+        'breakeven_price': breakeven_price, 'breakeven_done': False,
+        'tight_price': tight_price, 'tight_callback_rate': tight_callback_rate,
+        # Kleinster moeglicher Rueckzug -- fuer die Vorpruefung in find_exit()
+        'min_callback_rate': min(callback_rate, tight_callback_rate) if tight_price is not None else callback_rate,
+        'trailing_active': False, 'peak_price': entry_price,
+        'exit_reason': None,
+    }
+    position.update(fields)
+    return position
+
+
+def scan_exit(pos, path):
+    """Laeuft den Intrabar-Pfad fuer eine offene Position ab (harter SL,
+    Breakeven, dann Trailing-Stop) und liefert den Exit-Preis oder None.
+    Aktualisiert stop_loss/breakeven_done/trailing_active/peak_price und bei
+    einem Exit exit_reason ('SL' / 'TRAILING') in `pos`."""
+    breakeven_price = pos['breakeven_price']
+    tight_price = pos['tight_price']
+    if pos['side'] == 'long':
+        for p in path:
+            if p <= pos['stop_loss']:
+                pos['exit_reason'] = 'SL'
+                return pos['stop_loss']
+            if breakeven_price is not None and not pos['breakeven_done'] and p >= breakeven_price:
+                pos['stop_loss'] = max(pos['stop_loss'], pos['entry_price'])
+                pos['breakeven_done'] = True
+            if not pos['trailing_active'] and p >= pos['activation_price']:
+                pos['trailing_active'] = True
+                pos['peak_price'] = p
+            if pos['trailing_active']:
+                pos['peak_price'] = max(pos['peak_price'], p)
+                active_callback = pos['callback_rate']
+                if tight_price is not None and p >= tight_price:
+                    active_callback = pos['tight_callback_rate']
+                trail_level = pos['peak_price'] * (1 - active_callback)
+                if p <= trail_level:
+                    pos['exit_reason'] = 'TRAILING'
+                    return trail_level
+    else:
+        for p in path:
+            if p >= pos['stop_loss']:
+                pos['exit_reason'] = 'SL'
+                return pos['stop_loss']
+            if breakeven_price is not None and not pos['breakeven_done'] and p <= breakeven_price:
+                pos['stop_loss'] = min(pos['stop_loss'], pos['entry_price'])
+                pos['breakeven_done'] = True
+            if not pos['trailing_active'] and p <= pos['activation_price']:
+                pos['trailing_active'] = True
+                pos['peak_price'] = p
+            if pos['trailing_active']:
+                pos['peak_price'] = min(pos['peak_price'], p)
+                active_callback = pos['callback_rate']
+                if tight_price is not None and p <= tight_price:
+                    active_callback = pos['tight_callback_rate']
+                trail_level = pos['peak_price'] * (1 + active_callback)
+                if p >= trail_level:
+                    pos['exit_reason'] = 'TRAILING'
+                    return trail_level
+    return None
+
+
+def _next_event_bar(pos, bars, bar, stop):
+    """
+    Erste Kerze in [bar, stop), an der fuer `pos` etwas passieren KANN (SL,
+    Breakeven, Trailing-Aktivierung, Trailing-Exit). Uebersprungene Kerzen
+    veraendern nur den Peak einer aktiven Trailing-Position -- der wird hier
+    als laufendes Maximum/Minimum nachgefuehrt. Trail-Test mit dem groesst-
+    moeglichen Peak (inkl. der Kerze selbst) und dem kleinsten Rueckzug ist
+    eine notwendige Bedingung fuer einen Exit; Rundung ist monoton, der Test
+    verpasst also nie einen Exit des exakten Punkt-Loops.
+    """
+    chunk = _SCREEN_CHUNK
+    long = pos['side'] == 'long'
+    while bar < stop:
+        end = min(bar + chunk, stop)
+        hi, lo = bars.path_max[bar:end], bars.path_min[bar:end]
+        trailing = pos['trailing_active']
+        pending_breakeven = pos['breakeven_price'] is not None and not pos['breakeven_done']
+        with np.errstate(invalid='ignore'):
+            if long:
+                hit = lo <= pos['stop_loss']
+                if pending_breakeven:
+                    hit |= hi >= pos['breakeven_price']
+                if trailing:
+                    peaks = np.fmax.accumulate(np.concatenate(([pos['peak_price']], hi)))
+                    hit |= lo <= peaks[1:] * (1 - pos['min_callback_rate'])
+                else:
+                    hit |= hi >= pos['activation_price']
+            else:
+                hit = hi >= pos['stop_loss']
+                if pending_breakeven:
+                    hit |= lo <= pos['breakeven_price']
+                if trailing:
+                    peaks = np.fmin.accumulate(np.concatenate(([pos['peak_price']], lo)))
+                    hit |= hi >= peaks[1:] * (1 + pos['min_callback_rate'])
+                else:
+                    hit |= lo <= pos['activation_price']
+        events = np.flatnonzero(hit)
+        if len(events):
+            if trailing:
+                pos['peak_price'] = float(peaks[events[0]])
+            return bar + int(events[0])
+        if trailing:
+            pos['peak_price'] = float(peaks[-1])
+        bar = end
+        chunk = min(chunk * 4, _SCREEN_CHUNK_MAX)
+    return stop
+
+
+def find_exit(pos, bars, start, stop=None):
+    """Exit-Kerze und Exit-Preis der Position ab Kerze `start` (Einstiegskerze
+    selbst zaehlt nicht mehr), oder (None, None), wenn sie bis `stop` offen
+    bleibt. Mit vorab bestimmbaren Pfad-Grenzen wird bis zur naechsten
+    moeglichen Ereignis-Kerze vorgespult (siehe _next_event_bar)."""
+    stop = len(bars) if stop is None else stop
+    screen = bars.path_max is not None
+    bar = start
+    while bar < stop:
+        if screen:
+            bar = _next_event_bar(pos, bars, bar, stop)
+            if bar >= stop:
+                break
+        exit_price = scan_exit(pos, bars.path(bar))
+        if exit_price:
+            return bar, exit_price
+        bar += 1
+    return None, None
+
+
+def close_pnl(side, entry_price, exit_price, notional_value):
+    """Netto-PnL (USDT) inkl. Taker-Gebuehr fuer Ein- und Ausstieg."""
+    pnl_pct = (exit_price / entry_price - 1) if side == 'long' else (1 - exit_price / entry_price)
+    pnl_usd = notional_value * pnl_pct
+    total_fees = notional_value * FEE_PCT * 2
+    return pnl_usd - total_fees
+
+
+# ---------------------------------------------------------------------------
+# Trade-Ledger
+# ---------------------------------------------------------------------------
+
+# Typisiertes Trade-Ledger (ein Datensatz je geschlossenem Trade). Zeiten als
+# int64-Nanosekunden (UTC), Strategie als Code in TradeLedger.strategies
+# (Schluessel/Symbol/Timeframe stehen dort genau einmal), Richtung 1/-1.
+LEDGER_DTYPE = np.dtype([
+    ('strategy',    'u2'),
+    ('direction',   'i1'),
+    ('entry_time',  'i8'),
+    ('exit_time',   'i8'),
+    ('entry',       'f8'),
+    ('exit',        'f8'),
+    ('pnl',         'f8'),
+    ('leverage',    'f8'),
+    ('margin_used', 'f8'),
+])
+
+
+class TradeLedger:
+    """
+    Spaltenweises Trade-Protokoll einer Simulation. Waehrend der Simulation
+    wird je Trade nur an Python-Listen angehaengt (kein isoformat() je Trade
+    mehr); freeze() baut daraus ein NumPy-Structured-Array (records), dessen
+    Spalten (ledger['pnl'], ledger['exit_time'], ...) die Report-Writer direkt
+    als Views nutzen. Strings entstehen erst dort bzw. in to_dicts() -- der
+    Kompatibilitaets-Ansicht als bisherige trade_history der Portfolio-
+    Simulation (Liste von Dicts mit ISO-Zeitstempeln).
+    """
+
+    def __init__(self, strategies, tz=None):
+        # strategies: Liste (strategy_key, symbol, timeframe), Index = Code
+        self.strategies = list(strategies)
+        self.tz = tz
+        self._columns = {name: [] for name in LEDGER_DTYPE.names}
+        self.records = None
+
+    def append(self, code, pos, ts, exit_price, net_pnl):
+        cols = self._columns
+        entry_time = pos.get('entry_time', ts)
+        cols['strategy'].append(code)
+        cols['direction'].append(1 if pos['side'] == 'long' else -1)
+        cols['entry_time'].append(entry_time.value)
+        cols['exit_time'].append(ts.value)
+        cols['entry'].append(pos['entry_price'])
+        cols['exit'].append(exit_price)
+        cols['pnl'].append(net_pnl)
+        cols['leverage'].append(pos.get('leverage', 0))
+        cols['margin_used'].append(round(pos.get('margin_used', 0), 4))
+
+    def freeze(self):
+        records = np.empty(len(self._columns['pnl']), dtype=LEDGER_DTYPE)
+        for name, values in self._columns.items():
+            records[name] = values
+        self.records = records
+        self._columns = None
+        return self
+
+    def __len__(self):
+        return len(self.records) if self.records is not None else len(self._columns['pnl'])
+
+    def __getitem__(self, column):
+        return self.records[column]
+
+    def times(self, column, records=None):
+        """Zeit-Spalte als DatetimeIndex in der Zeitzone der Simulation
+        (records: ein Block aus iter_chunks(), sonst alle Trades)."""
+        records = self.records if records is None else records
+        idx = pd.DatetimeIndex(records[column], tz='UTC')
+        return idx.tz_convert(self.tz) if self.tz is not None else idx.tz_localize(None)
+
+    def labels(self, field, records=None):
+        """Kategorie-Spalte ('strategy_key'/'symbol'/'timeframe') als Liste je Trade."""
+        records = self.records if records is None else records
+        pos = {'strategy_key': 0, 'symbol': 1, 'timeframe': 2}[field]
+        lookup = [cat[pos] for cat in self.strategies]
+        return [lookup[c] for c in records['strategy'].tolist()]
+
+    def iter_chunks(self, size=5000):
+        """
+        Trades blockweise (Views auf records) -- die Excel-Writer formatieren
+        Block fuer Block, statt Strings/Dicts fuer alle Trades gleichzeitig
+        im Speicher zu halten.
+        """
+        records = self.records if self.records is not None else np.empty(0, dtype=LEDGER_DTYPE)
+        for start in range(0, len(records), size):
+            yield records[start:start + size]
+
+    def to_dicts(self):
+        # Kompatibilitaets-Ansicht: exakt das fruehere trade_history-Format
+        recs = self.records
+        if recs is None or not len(recs):
+            return []
+        exit_iso = [t.isoformat() for t in self.times('exit_time')]
+        entry_iso = [t.isoformat() for t in self.times('entry_time')]
+        trades = []
+        for i, (code, direction, entry, exit_price, pnl, leverage, margin) in enumerate(zip(
+                recs['strategy'].tolist(), recs['direction'].tolist(), recs['entry'].tolist(),
+                recs['exit'].tolist(), recs['pnl'].tolist(), recs['leverage'].tolist(),
+                recs['margin_used'].tolist())):
+            strategy_key, symbol, timeframe = self.strategies[code]
+            trades.append({
+                'strategy_key': strategy_key,
+                'ts':         exit_iso[i],
+                'entry_time': entry_iso[i],
+                'symbol':     symbol,
+                'timeframe':  timeframe,
+                'direction':  'long' if direction == 1 else 'short',
+                'entry':      entry,
+                'exit':       exit_price,
+                'pnl':        pnl,
+                'leverage':   int(leverage) if float(leverage).is_integer() else leverage,
+                'margin_used': margin,
+            })
+        return trades
+
+
+# ---------------------------------------------------------------------------
+# Einzel-Strategie-Simulation
+# ---------------------------------------------------------------------------
+
+def simulate_trades(bars, sides, atr, risk_params, start_capital, strategy=('', '', ''), close_at_end=False):
+    """
+    Eine Strategie, eine Position zur Zeit, Kapital wird nach jedem Trade
+    fortgeschrieben (Zinseszins). Einstieg am Close einer Signal-Kerze
+    (sides: 1 = long, -1 = short, 0 = nichts), kein Re-Entry auf der Exit-
+    Kerze. close_at_end: eine am Datenende noch offene Position zum letzten
+    Close schliessen (exit_reason 'HORIZON_END'), sonst wird sie verworfen.
+
+    Rueckgabe: {'capital', 'trades_count', 'wins_count', 'max_drawdown_pct',
+    'ledger' (TradeLedger, eingefroren), 'positions' (geschlossene Positions-
+    Dicts inkl. entry_time/exit_time/exit_price/net_pnl/exit_reason)}.
+    Drawdown wird wie bisher nur an Trade-Schluessen gemessen.
+    """
+    n = len(bars)
+    times, close = bars.times, bars.close
+    atr = np.asarray(atr, dtype='float64').tolist()
+    leverage = risk_params.get('leverage', 10)
+    ledger = TradeLedger([strategy], times.tz)
+    positions = []
+
+    capital = start_capital
+    peak_capital = start_capital
+    max_drawdown_pct = 0.0
+    trades_count = wins_count = 0
+
+    candidates = np.flatnonzero(np.asarray(sides)).tolist()
+    sides = np.asarray(sides).tolist()
+    cursor, bar = 0, 0
+    while capital > 0:
+        cursor = bisect.bisect_left(candidates, bar, cursor)
+        if cursor >= len(candidates):
+            break
+        bar = candidates[cursor]
+
+        entry_price = close[bar]
+        current_atr = atr[bar]
+        if current_atr <= 0:
+            bar += 1
+            continue
+        sl_dist = stop_distance(entry_price, current_atr, risk_params)
+        sizing = size_position(capital, entry_price, sl_dist, risk_params)
+        if sizing is None:
+            bar += 1
+            continue
+        notional_value, margin_used = sizing
+
+        pos = new_position('long' if sides[bar] == 1 else 'short', entry_price, sl_dist, risk_params,
+                           notional_value=notional_value, margin_used=margin_used,
+                           leverage=leverage, entry_time=times[bar])
+        exit_bar, exit_price = find_exit(pos, bars, bar + 1)
+        if exit_bar is None:
+            if not close_at_end:
+                break
+            exit_bar, exit_price = n - 1, close[n - 1]
+            pos['exit_reason'] = 'HORIZON_END'
+
+        net_pnl = close_pnl(pos['side'], entry_price, exit_price, notional_value)
+        capital += net_pnl
+        if net_pnl > 0:
+            wins_count += 1
+        trades_count += 1
+        pos.update(exit_time=times[exit_bar], exit_price=exit_price, net_pnl=net_pnl)
+        ledger.append(0, pos, pos['exit_time'], exit_price, net_pnl)
+        positions.append(pos)
+
+        peak_capital = max(peak_capital, capital)
+        if peak_capital > 0:
+            max_drawdown_pct = max(max_drawdown_pct, (peak_capital - capital) / peak_capital)
+        bar = exit_bar + 1
+
+    return {
+        'capital': capital, 'trades_count': trades_count, 'wins_count': wins_count,
+        'max_drawdown_pct': max_drawdown_pct, 'ledger': ledger.freeze(), 'positions': positions,
+    }
@@ -0,0 +1,155 @@
+# src/stbot/strategy/async_cycle.py
+"""
+Nebenlaeufiger Handelszyklus fuer mehrere Strategien (Daemon-Modus, siehe
+stbot/strategy/daemon.py).
+
+Bisher liefen die Strategien eines Zyklus strikt nacheinander mit blockierenden
+ccxt-Calls (Positionen, OHLCV, HTF-OHLCV, Balance, Ticker, Orders, plus
+time.sleep(2) nach dem Entry) -- die Zyklusdauer war die SUMME aller
+Strategien. Jetzt in zwei Phasen:
+
+1. Vorab-Abruf: die reinen Lese-Calls aller faelligen Strategien gleichzeitig
+   ueber den ccxt-async-Client (ccxt.async_support, asyncio.gather): OHLCV des
+   Handels-Timeframes und HTF-OHLCV je (symbol, timeframe) ueber den
+   rollierenden Kerzen-Cache (stbot/utils/candle_cache.py), dazu EIN konto-weiter
+   Schnappschuss (alle Positionen, alle Trigger-Orders -- je ein
+   Bulk-Call statt je Symbol, siehe exchange.AccountSnapshot).
+2. Ausfuehrung: je Strategie der bestehende (synchrone) full_trade_cycle() mit
+   den vorab geladenen Daten in einem eigenen Thread (asyncio.to_thread), alle
+   Strategien parallel. Strategien auf DEMSELBEN Symbol (z.B. BTC 1h und BTC 4h)
+   laufen ueber einen asyncio.Lock je Symbol weiterhin nacheinander -- die
+   Order-Reihenfolge je Symbol (Housekeeper -> Entry -> SL/TSL) bleibt damit
+   garantiert, auch fuer Positionen, die sich ein Symbol teilen. Der Entry
+   selbst (Guthaben live lesen -> Positionsgroesse -> Market-Order) laeuft
+   zusaetzlich konto-weit unter Exchange.account_lock -- sonst dimensionierten
+   Strategien auf verschiedenen Symbolen aus demselben freien Guthaben.
+
+Die Order-Platzierung selbst bleibt bewusst auf dem synchronen Exchange-Wrapper
+(Retry-/Rundungs-Logik in exchange.py) -- die Zyklusdauer naehert sich damit der
+Dauer der langsamsten einzelnen Strategie.
+"""
+import asyncio
+import logging
+
+from stbot.utils import candle_cache
+from stbot.utils.exchange import AccountSnapshot, ohlcv_to_frame
+from stbot.utils.timeframe_utils import timeframe_to_seconds
+from stbot.strategy.run import run_cycle
+
+logger = logging.getLogger(__name__)
+
+# Wie in trade_manager.check_and_open_new_position()
+OHLCV_LIMIT = 1000
+HTF_OHLCV_LIMIT = 100
+
+
+async def _fetch_frame(client, symbol, timeframe, limit):
+    """Inkrementeller Abruf ueber den rollierenden Kerzen-Cache (wie
+    Exchange.fetch_recent_ohlcv, nur mit dem async-Client)."""
+    fetch_kwargs = candle_cache.plan_fetch(symbol, timeframe, limit)
+    data = await client.fetch_ohlcv(symbol, timeframe, **fetch_kwargs)
+    if not data:
+        return None
+    frame = ohlcv_to_frame(data, client.parse_timeframe(timeframe))
+    return candle_cache.store(symbol, timeframe, frame, limit, 'since' in fetch_kwargs)
+
+
+def _resamplable(htf, sources):
+    """True, wenn einer der in diesem Zyklus geladenen Timeframes (Sekunden)
+    den HTF mit HTF_OHLCV_LIMIT (+1 angeschnittene) Kerzen abdeckt."""
+    htf_s = timeframe_to_seconds(htf)
+    return any(src < htf_s and htf_s % src == 0 and OHLCV_LIMIT * src >= (HTF_OHLCV_LIMIT + 1) * htf_s
+               for src in sources)
+
+
+async def _fetch_snapshot(client):
+    params = {'productType': 'USDT-FUTURES'}
+    positions, orders = await asyncio.gather(
+        client.fetch_positions(None, params=params),
+        client.fetch_open_orders(None, params={**params, 'stop': True}),
+        return_exceptions=True,
+    )
+    if isinstance(positions, Exception):
+        raise positions
+    if isinstance(orders, Exception):
+        logger.info(f"Bulk-Abruf der Trigger-Orders nicht verfuegbar ({orders}) -- Orders weiter je Symbol.")
+        orders = None
+    return AccountSnapshot(positions, orders)
+
+
+async def prefetch_cycle_data(exchange, params_list):
+    """
+    Laedt fuer alle Strategien gleichzeitig OHLCV und HTF-OHLCV sowie den
+    Konto-Schnappschuss (wird auf `exchange` installiert; der Aufrufer raeumt
+    ihn mit exchange.clear_account_snapshot() wieder ab).
+    Rueckgabe: Liste (gleiche Reihenfolge wie params_list) von prefetched-Dicts
+    fuer full_trade_cycle(). Fehlgeschlagene Abrufe fehlen im Dict einfach --
+    der synchrone Zyklus holt sie dann wie bisher selbst (inkl. Cache-Fallback).
+    """
+    client = exchange.create_async_client()
+    try:
+        # Je (symbol, timeframe) nur EIN Abruf, auch wenn mehrere Strategien ihn teilen
+        frames = {}
+        for params in params_list:
+            frames.setdefault((params['market']['symbol'], params['market']['timeframe']), OHLCV_LIMIT)
+        loaded = {}
+        for symbol, timeframe in frames:
+            loaded.setdefault(symbol, set()).add(timeframe_to_seconds(timeframe))
+        for params in params_list:
+            symbol, htf = params['market']['symbol'], params['market'].get('htf')
+            # HTF, der sich aus einem geladenen niedrigeren Timeframe resampeln laesst, nicht extra holen
+            if htf and not _resamplable(htf, loaded[symbol]):
+                frames.setdefault((symbol, htf), HTF_OHLCV_LIMIT)
+
+        keys = [None] + list(frames)
+        coros = [_fetch_snapshot(client)] + [_fetch_frame(client, sym, tf, limit) for (sym, tf), limit in frames.items()]
+        results = await asyncio.gather(*coros, return_exceptions=True)
+
+        fetched = {}
+        for key, result in zip(keys, results):
+            if key is None:
+                if isinstance(result, Exception):
+                    logger.warning(f"Konto-Schnappschuss fehlgeschlagen, nutze Einzelabfragen: {result}")
+                else:
+                    exchange.set_account_snapshot(result)
+            elif isinstance(result, Exception):
+                logger.warning(f"Vorab-Abruf {key[1]} für {key[0]} fehlgeschlagen: {result}")
+            elif result is not None:
+                fetched[key] = result
+
+        prefetched = [{} for _ in params_list]
+        for i, params in enumerate(params_list):
+            symbol, htf = params['market']['symbol'], params['market'].get('htf')
+            ohlcv = fetched.get((symbol, params['market']['timeframe']))
+            if ohlcv is not None:
+                prefetched[i]['ohlcv'] = ohlcv.copy()
+            if htf:
+                htf_data = fetched.get((symbol, htf))
+                if htf_data is None:
+                    htf_data = candle_cache.resample_from_cache(symbol, htf, HTF_OHLCV_LIMIT)
+                if htf_data is not None:
+                    prefetched[i]['htf_ohlcv'] = htf_data.copy()
+        return prefetched
+    finally:
+        await client.close()
+
+
+async def run_cycles_async(exchange, jobs, telegram_config):
+    """jobs: Liste (params, logger) der in diesem Zyklus faelligen Strategien."""
+    prefetched = await prefetch_cycle_data(exchange, [params for params, _ in jobs])
+
+    symbol_locks = {}
+    for params, _ in jobs:
+        symbol_locks.setdefault(params['market']['symbol'], asyncio.Lock())
+
+    async def _run(job, data):
+        params, job_logger = job
+        async with symbol_locks[params['market']['symbol']]:
+            await asyncio.to_thread(run_cycle, exchange, telegram_config, params, job_logger, data)
+
+    await asyncio.gather(*(_run(job, data) for job, data in zip(jobs, prefetched)))
+
+
+def run_cycles(exchange, jobs, telegram_config):
+    """Synchroner Einstieg fuer den Daemon: ein Zyklus, eigene Event-Loop."""
+    asyncio.run(run_cycles_async(exchange, jobs, telegram_config))
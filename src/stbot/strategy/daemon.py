@@ -0,0 +1,167 @@
+# src/stbot/strategy/daemon.py
+"""
+Resident Live-Daemon (master_runner.py --daemon).
+
+Ersetzt den Cron-Takt "alle 15 Minuten je Strategie einen frischen run.py-
+Prozess starten": jeder dieser Prozesse importierte pandas/ccxt/ta neu, lud
+die Bitget-Maerkte neu, las secret.json neu -- und lief erst irgendwann im
+Cron-Raster nach dem Kerzenschluss los (plus 2s Pause je Strategie im
+Master-Runner). Hier bleibt EIN Prozess am Leben, haelt die Exchange-Clients
+und die Strategie-Configs im Speicher und wacht exakt an den Kerzenschluss-
+Grenzen der aktiven Timeframes auf (CLOSE_DELAY_SECONDS Puffer, damit Bitget
+die gerade geschlossene Kerze schon ausliefert).
+
+Die Strategie-Liste wird neu geladen, sobald sich settings.json oder
+optimization_results.json aendern (woechentlicher Auto-Optimizer) -- ein
+Neustart des Daemons ist dafuer nicht noetig. Die Config der faelligen
+Strategien (configs/config_*.json) wird wie im Cron-Modus bei JEDEM Zyklus
+frisch gelesen: optimizer.py und update.sh schreiben sie, ohne eine der
+beobachteten Dateien anzufassen.
+"""
+import json
+import math
+import os
+import signal
+import sys
+import threading
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from stbot.utils.exchange import Exchange
+from stbot.utils.timeframe_utils import timeframe_to_seconds
+from stbot.strategy.run import load_config, setup_logging, run_cycle
+from stbot.strategy.async_cycle import run_cycles
+
+# Puffer nach dem Kerzenschluss: fetch_ohlcv liefert die gerade geschlossene
+# Kerze erst, wenn Bitget sie intern abgeschlossen hat (ein paar hundert ms).
+CLOSE_DELAY_SECONDS = 0.3
+# Wartezeit, wenn gerade keine Strategie aktiv ist (Settings werden danach neu geprueft)
+IDLE_SLEEP_SECONDS = 60
+
+
+def next_candle_close(now, tf_seconds):
+    """Naechste Kerzenschluss-Grenze (Unix-Sekunden) nach `now`. Bitget-Kerzen
+    bis einschliesslich 1d sind an der Unix-Epoche (UTC) ausgerichtet."""
+    return (math.floor(now / tf_seconds) + 1) * tf_seconds
+
+
+def _build_slots(strategies):
+    """(symbol, timeframe, use_macd) -> geladene Config + Logger je Strategie."""
+    slots = []
+    for symbol, timeframe, use_macd in strategies:
+        try:
+            slots.append({
+                'symbol': symbol,
+                'timeframe': timeframe,
+                'use_macd': use_macd,
+                'tf_seconds': timeframe_to_seconds(timeframe),
+                'params': load_config(symbol, timeframe, use_macd),
+                'logger': setup_logging(symbol, timeframe),
+            })
+        except Exception as e:
+            print(f"Fehler beim Laden der Strategie {symbol} ({timeframe}): {e}. Überspringe.")
+    return slots
+
+
+def _reload_params(slot):
+    """Config des Slots frisch von Disk (eine kleine JSON-Datei, gleiche
+    Fallback-Reihenfolge wie load_config); bei Fehlern bleibt die zuletzt
+    geladene Config aktiv."""
+    try:
+        slot['params'] = load_config(slot['symbol'], slot['timeframe'], slot['use_macd'])
+    except Exception as e:
+        slot['logger'].warning(f"Config konnte nicht neu geladen werden ({e}) -- nutze zuletzt geladene.")
+
+
+def _file_state(paths):
+    return tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in paths)
+
+
+def run_daemon(load_strategies, watch_files=(), on_wake=None, close_delay=CLOSE_DELAY_SECONDS,
+               stop_event=None, concurrent=True):
+    """
+    Hauptschleife des Daemons.
+    load_strategies: Callable -> Liste (symbol, timeframe, use_macd) der aktiven Strategien.
+    watch_files:     Dateien, deren Aenderung ein Neuladen der Strategie-Liste ausloest.
+    on_wake:         optionaler Callback bei jedem Aufwachen (z.B. Auto-Optimizer-Check).
+    stop_event:      threading.Event zum Beenden (sonst per SIGINT/SIGTERM).
+    concurrent:      faellige Strategien eines Kerzenschlusses nebenlaeufig ausfuehren
+                     (stbot/strategy/async_cycle.py) statt nacheinander.
+    """
+    stop_event = stop_event or threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop_event.set())
+
+    with open(os.path.join(PROJECT_ROOT, 'secret.json'), 'r') as f:
+        secrets = json.load(f)
+    accounts = secrets.get('stbot', [])
+    telegram_config = secrets.get('telegram', {})
+    if not isinstance(accounts, list) or not accounts:
+        print("Fehler: Keine Account-Konfigurationen unter 'stbot' in secret.json gefunden.")
+        return
+
+    # Exchange-Clients einmalig aufbauen (Maerkte werden nur hier geladen)
+    exchanges = []
+    for account in accounts:
+        exchange = Exchange(account)
+        if not exchange.markets:
+            print(f"Fehler: Exchange für Account '{account.get('name', 'Standard')}' konnte nicht initialisiert werden.")
+            continue
+        exchanges.append(exchange)
+    if not exchanges:
+        return
+
+    slots, watched_state = [], None
+    print(f"Daemon gestartet ({len(exchanges)} Account(s)). Warte auf Kerzenschluss...", flush=True)
+
+    while not stop_event.is_set():
+        state = _file_state(watch_files)
+        if state != watched_state:
+            slots = _build_slots(load_strategies())
+            watched_state = state
+            names = ', '.join(f"{s['symbol']} ({s['timeframe']})" for s in slots) or 'keine'
+            print(f"Strategien geladen: {names}", flush=True)
+
+        if not slots:
+            stop_event.wait(IDLE_SLEEP_SECONDS)
+            continue
+
+        wake_at = min(next_candle_close(time.time(), s['tf_seconds']) for s in slots)
+        if stop_event.wait(max(0.0, wake_at + close_delay - time.time())):
+            break
+
+        due = [s for s in slots if int(round(wake_at)) % s['tf_seconds'] == 0]
+        for slot in due:
+            _reload_params(slot)
+        if on_wake:
+            try:
+                on_wake()
+            except Exception as e:
+                print(f"Fehler im Wake-Callback: {e}")
+
+        for exchange in exchanges:
+            for slot in due:
+                slot['logger'].info(f"--- Kerzenschluss {slot['timeframe']}: Starte Zyklus "
+                                    f"({time.time() - wake_at:.2f}s nach Schluss) ---")
+            try:
+                if concurrent and len(due) > 1:
+                    try:
+                        run_cycles(exchange, [(s['params'], s['logger']) for s in due], telegram_config)
+                        continue
+                    except Exception as e:
+                        print(f"Nebenläufiger Zyklus fehlgeschlagen ({e}) -- führe Strategien nacheinander aus.")
+                # Ein konto-weiter Schnappschuss fuer alle faelligen Strategien
+                exchange.refresh_account_snapshot()
+                for slot in due:
+                    run_cycle(exchange, telegram_config, slot['params'], slot['logger'])
+            finally:
+                # Nie in den naechsten Kerzenschluss mitnehmen
+                exchange.clear_account_snapshot()
+
+        print(f"Zyklus für {len(due)} Strategie(n) abgeschlossen, "
+              f"{time.time() - wake_at:.2f}s nach Kerzenschluss.", flush=True)
+
+    print("Daemon beendet.", flush=True)
@@ -77,6 +77,34 @@ def load_config(symbol, timeframe, use_macd_filter):
     return config
 
 
+def _report_critical_error(e, params, telegram_config, logger):
+    # Fange alle unerwarteten Fehler im Hauptzyklus ab
+    symbol_f = params.get('market', {}).get('symbol', 'Unbekannt')
+    tf_f = params.get('market', {}).get('timeframe', 'N/A')
+    logger.critical(f"!!! KRITISCHER FEHLER im Hauptzyklus für {symbol_f} ({tf_f}) !!!")
+    logger.critical(f"Fehlerdetails: {e}", exc_info=True) # Loggt den Traceback
+    # Sende Telegram Nachricht bei kritischem Fehler
+    try:
+        error_message = f"🚨 *Kritischer Fehler* in StBot für *{symbol_f} ({tf_f})*:\n\n`{e}`\n\nBot-Instanz könnte instabil sein."
+        send_message(
+            telegram_config.get('bot_token'),
+            telegram_config.get('chat_id'),
+            error_message
+        )
+    except Exception as tel_e:
+        logger.error(f"Konnte keine Telegram-Fehlermeldung senden: {tel_e}")
+
+
+def run_cycle(exchange, telegram_config, params, logger, prefetched=None):
+    """ Ein Handelszyklus mit einer bereits initialisierten Exchange-Instanz
+    (vom Daemon wiederverwendet, siehe stbot/strategy/daemon.py). """
+    try:
+        # 'model' und 'scaler' werden als None übergeben und ignoriert
+        full_trade_cycle(exchange, None, None, params, telegram_config, logger, prefetched)
+    except Exception as e:
+        _report_critical_error(e, params, telegram_config, logger)
+
+
 def run_for_account(account, telegram_config, params, model, scaler, logger):
     """ Führt den Handelszyklus für einen Account aus. """
     try:
@@ -93,25 +121,16 @@ def run_for_account(account, telegram_config, params, model, scaler, logger):
             logger.critical("Exchange konnte nicht initialisiert werden (Märkte nicht geladen). Breche Zyklus ab.")
             return
 
-        # 'model' und 'scaler' werden als None übergeben und ignoriert
-        full_trade_cycle(exchange, None, None, params, telegram_config, logger)
-
     except Exception as e:
-        # Fange alle unerwarteten Fehler im Hauptzyklus ab
-        symbol_f = params.get('market', {}).get('symbol', 'Unbekannt')
-        tf_f = params.get('market', {}).get('timeframe', 'N/A')
-        logger.critical(f"!!! KRITISCHER FEHLER im Hauptzyklus für {symbol_f} ({tf_f}) !!!")
-        logger.critical(f"Fehlerdetails: {e}", exc_info=True) # Loggt den Traceback
-        # Sende Telegram Nachricht bei kritischem Fehler
-        try:
-            error_message = f"🚨 *Kritischer Fehler* in StBot für *{symbol_f} ({tf_f})*:\n\n`{e}`\n\nBot-Instanz könnte instabil sein."
-            send_message(
-                telegram_config.get('bot_token'),
-                telegram_config.get('chat_id'),
-                error_message
-            )
-        except Exception as tel_e:
-            logger.error(f"Konnte keine Telegram-Fehlermeldung senden: {tel_e}")
+        _report_critical_error(e, params, telegram_config, logger)
+        return
+
+    # Positionen/Orders einmal konto-weit laden (siehe AccountSnapshot)
+    exchange.refresh_account_snapshot()
+    try:
+        run_cycle(exchange, telegram_config, params, logger)
+    finally:
+        exchange.clear_account_snapshot()
 
 
 def main():
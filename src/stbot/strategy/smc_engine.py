@@ -1,3 +1,8 @@
+import heapq
+import itertools
+import math
+from array import array
+
 import pandas as pd
 import numpy as np
 import yfinance as yf
@@ -15,9 +20,16 @@ class Bias(Enum):
     BEARISH = -1
     NEUTRAL = 0
 
+# Kerzen je Block, fuer den die Preise der Kerzen-Schleife als Python-Floats
+# vorliegen (siehe process_dataframe)
+_CHUNK = 4096
+
 # --- 2. Datenstrukturen (ersetzt Pine 'type' UDTs) ---
+# slots=True: kein __dict__ je Objekt (etwa halber Speicher je Pivot/OB/FVG);
+# Bias bleibt ein Enum -- die Mitglieder sind Singletons, kosten je Objekt
+# nur einen Zeiger.
 
-@dataclass
+@dataclass(slots=True)
 class Pivot:
     """ Speichert den Zustand eines Swing- oder Internal-Pivots """
     currentLevel: float = np.nan
@@ -26,7 +38,7 @@ class Pivot:
     barTime: int = 0
     barIndex: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class OrderBlock:
     """ Speichert die Daten für einen Order Block """
     barHigh: float
@@ -35,7 +47,7 @@ class OrderBlock:
     bias: Bias
     mitigated: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class FVG:
     """ Speichert die Daten für ein Fair Value Gap """
     top: float  # Immer der höhere Preis
@@ -44,12 +56,104 @@ class FVG:
     startTime: int
     mitigated: bool = False
 
+
+class EventLog:
+    """
+    Spaltenweises Ereignis-Protokoll (BOS/CHoCH/FVG) statt eines Dicts je
+    Ereignis: Typ-Code (int8, Index in EVENT_TYPES), Zeit und Kerzen-Index
+    (int64), Level (float64; bei FVGs Top in `level`, Boden in `level2`,
+    sonst NaN). Ein Ereignis kostet so 33 Byte statt ~0.5 KB (Dict + Tupel +
+    Python-Floats) -- bei mehrjaehrigen 1m-Daten mit hunderten Ereignissen je
+    1000 Kerzen war das Protokoll der groesste Posten der Engine.
+
+    Lesend verhaelt es sich wie die bisherige Liste: len(), Iteration und
+    Index/Slice liefern Dicts {'time', 'index', 'type', 'level'} (FVG-level
+    als Tupel (top, bottom)); to_frame() gibt die Spalten als DataFrame.
+    """
+    EVENT_TYPES = (
+        'Internal Bullish CHoCH', 'Internal Bullish BOS',
+        'Internal Bearish CHoCH', 'Internal Bearish BOS',
+        'Swing Bullish CHoCH', 'Swing Bullish BOS',
+        'Swing Bearish CHoCH', 'Swing Bearish BOS',
+        'Bullish FVG', 'Bearish FVG',
+    )
+    CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+    _FVG_CODES = (CODES['Bullish FVG'], CODES['Bearish FVG'])
+
+    def __init__(self):
+        self.codes = array('b')
+        self.times = array('q')
+        self.indices = array('q')
+        self.levels = array('d')
+        self.levels2 = array('d')
+
+    def append(self, event_type: str, time: int, index: int, level: float, level2: float = math.nan):
+        self.codes.append(self.CODES[event_type])
+        self.times.append(time)
+        self.indices.append(index)
+        self.levels.append(level)
+        self.levels2.append(level2)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _event(self, i: int) -> dict:
+        code = self.codes[i]
+        level = (self.levels[i], self.levels2[i]) if code in self._FVG_CODES else self.levels[i]
+        return {"time": self.times[i], "index": self.indices[i],
+                "type": self.EVENT_TYPES[code], "level": level}
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._event(i) for i in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError('EventLog index out of range')
+        return self._event(key)
+
+    def __iter__(self):
+        return (self._event(i) for i in range(len(self)))
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            'time': np.frombuffer(self.times, dtype=np.int64),
+            'index': np.frombuffer(self.indices, dtype=np.int64),
+            'type': pd.Categorical.from_codes(np.frombuffer(self.codes, dtype=np.int8),
+                                              categories=list(self.EVENT_TYPES)),
+            'level': np.frombuffer(self.levels, dtype=np.float64),
+            'level2': np.frombuffer(self.levels2, dtype=np.float64),
+        })
+
 # --- 3. Die Haupt-Engine-Klasse ---
 
 class SMCEngine:
     """
     Diese Klasse bildet die zustandsbehaftete Logik des Pine-Skripts nach.
     Sie wird Kerze für Kerze mit Daten gefüttert.
+
+    Laufzeit: Bisher schnitt _leg() je Kerze und Laenge Listen-Slices
+    (self.highs[...]) aus und rief max()/min() darauf auf, und die Mitigation
+    lief je Kerze ueber ALLE je gespeicherten OBs/FVGs (auch die laengst
+    mitigierten) -- O(Kerzen x Objekte), bei langen 1m-Datensaetzen
+    (evaluator.evaluate_dataset) quadratisch. Jetzt:
+    - Die Leg-Wechsel haengen nur an den Preisen, nicht am Engine-Zustand:
+      process_dataframe berechnet sie vorab vektoriell (gleitendes Max/Min
+      ueber `size` Kerzen per pandas rolling -- intern eine monotone Deque,
+      O(n) statt O(n x size)). _getCurrentStructure schaut je Kerze nur nach.
+    - Aktive OBs/FVGs liegen zusaetzlich in Heaps, sortiert nach ihrem
+      Mitigations-Level (bullische FVG: hoechster Boden zuerst, baerische
+      FVG: niedrigstes Top zuerst, OBs analog). Je Kerze wird nur die Spitze
+      geprueft, angefasst werden nur tatsaechlich mitigierte Objekte --
+      O(log k) je Objekt statt O(k) je Kerze.
+    - FVG-Kandidaten (3-Kerzen-Muster) ebenfalls vorab als Maske.
+
+    Speicher: Die Preis-Historie bleibt als float64/int64-Arrays (self.highs,
+    ...) statt als Python-Listen ueber alle Kerzen (~4 x 32 Byte je Kerze);
+    die Kerzen-Schleife holt sich die Werte blockweise (_CHUNK Kerzen) als
+    Python-Floats. Ereignisse landen im spaltenweisen EventLog, Pivots/OBs/
+    FVGs sind Slot-Dataclasses.
+    Ereignisse und Ergebnisse sind identisch zur Kerze-fuer-Kerze-Version.
     """
     def __init__(self, settings: dict):
         # --- Inputs ---
@@ -71,78 +175,74 @@ class SMCEngine:
         self.internal_leg_state = Leg.BULLISH
         
         # --- Datenspeicherung ---
-        # Wir müssen die gesamte Historie für Lookbacks speichern
-        self.highs = []
-        self.lows = []
-        self.closes = []
-        self.times = []
+        # Wir müssen die gesamte Historie für Lookbacks speichern (NumPy-Arrays)
+        self.highs = np.empty(0)
+        self.lows = np.empty(0)
+        self.closes = np.empty(0)
+        self.times = np.empty(0, dtype=np.int64)
         
         # --- Ergebnislisten ---
         self.swingOrderBlocks: list[OrderBlock] = []
         self.internalOrderBlocks: list[OrderBlock] = []
         self.fairValueGaps: list[FVG] = []
+
+        # --- Aktive (unmitigierte) Objekte, nach Mitigations-Level sortiert ---
+        # Eintraege (schluessel, laufende Nr., objekt); die Nr. entscheidet
+        # bei gleichem Level, Objekte selbst werden nie verglichen.
+        self._seq = itertools.count()
+        self._bearish_obs = []   # min-Heap ueber barHigh
+        self._bullish_obs = []   # max-Heap ueber barLow (negiert)
+        self._bullish_fvgs = []  # max-Heap ueber bottom (negiert)
+        self._bearish_fvgs = []  # min-Heap ueber top
         
         # Ein Protokoll aller erkannten Ereignisse
-        self.event_log = []
+        self.event_log = EventLog()
 
     # --- 1. Logik zur Pivot-Erkennung (leg & getCurrentStructure) ---
-    
-    def _leg(self, size: int, index: int, current_leg_state: Leg) -> Leg:
-        """ Portierung der 'leg'-Funktion """
-        # `high[size]` in Pine ist `self.highs[index - size]`
-        if index < size:
-            return current_leg_state  # Nicht genügend Daten
-
-        # `ta.highest(size)` in Pine ist `max(high[0]...high[size-1])`
-        # bezogen auf den aktuellen `index` ist das `max(self.highs[index-size+1 : index+1])`
-        try:
-            window_highs = self.highs[index - size + 1 : index + 1]
-            window_lows = self.lows[index - size + 1 : index + 1]
-            
-            if not window_highs or not window_lows:
-                return current_leg_state
 
-            pivot_high_candidate = self.highs[index - size]
-            pivot_low_candidate = self.lows[index - size]
-
-            newLegHigh = pivot_high_candidate > max(window_highs)
-            newLegLow = pivot_low_candidate < min(window_lows)
-        except Exception:
-            return current_leg_state # Fallback bei Datenproblemen
+    @staticmethod
+    def _leg_changes(highs: pd.Series, lows: pd.Series, size: int) -> np.ndarray:
+        """
+        Vektorisierte Portierung der 'leg'-Funktion fuer alle Kerzen: je
+        Kerze der NEUE Leg-Zustand, falls er wechselt, sonst -1.
 
-        if newLegHigh:
-            return Leg.BEARISH
-        elif newLegLow:
-            return Leg.BULLISH
-        else:
-            return current_leg_state  # Kein Wechsel
+        Pine: newLegHigh = high[size] > ta.highest(size), d.h. die Kerze
+        `index - size` liegt ueber dem Max. der Kerzen index-size+1 .. index
+        (analog Low/Min). Vor `size` Kerzen (shift -> NaN) kein Wechsel.
+        """
+        new_leg_high = (highs.shift(size) > highs.rolling(size).max()).to_numpy()
+        new_leg_low = (lows.shift(size) < lows.rolling(size).min()).to_numpy()
+        # Zustand je Kerze: BEARISH bei neuem Hoch, sonst BULLISH bei neuem
+        # Tief, sonst unveraendert (Start: BULLISH)
+        state = np.where(new_leg_high, Leg.BEARISH.value,
+                         np.where(new_leg_low, Leg.BULLISH.value, np.nan))
+        state = pd.Series(state).ffill().fillna(Leg.BULLISH.value).to_numpy().astype(np.int8)
+        prev = np.concatenate(([Leg.BULLISH.value], state[:-1]))
+        return np.where(state != prev, state, -1).astype(np.int8)
+
+    def _getCurrentStructure(self, size: int, index: int, internal: bool, change: int):
+        """ Portierung von 'getCurrentStructure' (change: vorab berechneter Leg-Wechsel, -1 = keiner) """
+        # Auf Änderung prüfen (startOfNewLeg)
+        if change < 0:
+            return
+        new_leg = Leg(change)
 
-    def _getCurrentStructure(self, size: int, index: int, internal: bool):
-        """ Portierung von 'getCurrentStructure' """
-        
-        prev_leg = self.internal_leg_state if internal else self.swing_leg_state
-        new_leg = self._leg(size, index, prev_leg)
-        
         # Zustand aktualisieren
         if internal:
             self.internal_leg_state = new_leg
         else:
             self.swing_leg_state = new_leg
 
-        # Auf Änderung prüfen (startOfNewLeg)
-        if new_leg == prev_leg:
-            return
-
         # Ein neuer Pivot wurde `size` Kerzen zuvor bestätigt
         pivot_index = index - size
         if pivot_index < 0: return
         
-        pivot_time = self.times[pivot_index]
+        pivot_time = int(self.times[pivot_index])
 
         if new_leg == Leg.BULLISH:  # Ein Pivot-Tief (Low) wurde bestätigt
             p_ivot = self.internalLow if internal else self.swingLow
             p_ivot.lastLevel = p_ivot.currentLevel
-            p_ivot.currentLevel = self.lows[pivot_index]
+            p_ivot.currentLevel = float(self.lows[pivot_index])
             p_ivot.crossed = False
             p_ivot.barTime = pivot_time
             p_ivot.barIndex = pivot_index
@@ -150,7 +250,7 @@ class SMCEngine:
         elif new_leg == Leg.BEARISH:  # Ein Pivot-Hoch (High) wurde bestätigt
             p_ivot = self.internalHigh if internal else self.swingHigh
             p_ivot.lastLevel = p_ivot.currentLevel
-            p_ivot.currentLevel = self.highs[pivot_index]
+            p_ivot.currentLevel = float(self.highs[pivot_index])
             p_ivot.crossed = False
             p_ivot.barTime = pivot_time
             p_ivot.barIndex = pivot_index
@@ -163,54 +263,43 @@ class SMCEngine:
             return  # Ungültiger Bereich
 
         # Finde die Kerze mit dem Extremum im Bereich zwischen Pivot und Break
-        try:
-            window_highs = self.highs[p_ivot.barIndex : index]
-            window_lows = self.lows[p_ivot.barIndex : index]
-
-            if bias == Bias.BULLISH:  # Sucht nach bärischem OB (letzte rote Kerze)
-                ob_index_in_window = np.argmax(window_highs)
-            else:  # Sucht nach bullischem OB (letzte grüne Kerze)
-                ob_index_in_window = np.argmin(window_lows)
-            
-            ob_index = p_ivot.barIndex + ob_index_in_window
+        # (argmax/argmin direkt auf dem Array-View, kein Listen-Slice)
+        if bias == Bias.BULLISH:  # Sucht nach bärischem OB (letzte rote Kerze)
+            ob_index = p_ivot.barIndex + int(np.argmax(self.highs[p_ivot.barIndex : index]))
+        else:  # Sucht nach bullischem OB (letzte grüne Kerze)
+            ob_index = p_ivot.barIndex + int(np.argmin(self.lows[p_ivot.barIndex : index]))
+
+        new_ob = OrderBlock(
+            barHigh=float(self.highs[ob_index]),
+            barLow=float(self.lows[ob_index]),
+            barTime=int(self.times[ob_index]),
+            bias=bias
+        )
+
+        ob_list = self.internalOrderBlocks if internal else self.swingOrderBlocks
+        ob_list.append(new_ob)
+        if bias == Bias.BEARISH:
+            heapq.heappush(self._bearish_obs, (new_ob.barHigh, next(self._seq), new_ob))
+        else:
+            heapq.heappush(self._bullish_obs, (-new_ob.barLow, next(self._seq), new_ob))
 
-            new_ob = OrderBlock(
-                barHigh=self.highs[ob_index],
-                barLow=self.lows[ob_index],
-                barTime=self.times[ob_index],
-                bias=bias
-            )
-            
-            ob_list = self.internalOrderBlocks if internal else self.swingOrderBlocks
-            ob_list.append(new_ob)
-        except Exception as e:
-            # Dieser Fehler kann auftreten, wenn das Fenster leer ist (z.B. p_ivot.barIndex == index)
-            # print(f"Fehler beim Speichern des OB: {e} | Pivot Index: {p_ivot.barIndex}, Current Index: {index}")
-            pass
-
-    def _displayStructure(self, index: int, internal: bool):
+    def _displayStructure(self, index: int, current_close: float, internal: bool):
         """ Portierung von 'displayStructure' (BOS/CHoCH-Erkennung) """
-        current_close = self.closes[index]
-        current_time = self.times[index]
-
         p_ivot_high = self.internalHigh if internal else self.swingHigh
         p_ivot_low = self.internalLow if internal else self.swingLow
         trend = self.internalTrend if internal else self.swingTrend
         
         # --- Bullischer Bruch ---
         if (not p_ivot_high.crossed and  
-            not pd.isna(p_ivot_high.currentLevel) and  
+            not math.isnan(p_ivot_high.currentLevel) and  
             current_close > p_ivot_high.currentLevel):
             
             tag = "CHoCH" if trend == Bias.BEARISH else "BOS"
             p_ivot_high.crossed = True
             new_trend = Bias.BULLISH
             
-            self.event_log.append({
-                "time": current_time, "index": index,
-                "type": f"{'Internal' if internal else 'Swing'} Bullish {tag}",
-                "level": p_ivot_high.currentLevel
-            })
+            self.event_log.append(f"{'Internal' if internal else 'Swing'} Bullish {tag}",
+                                  int(self.times[index]), index, p_ivot_high.currentLevel)
             
             self._storeOrdeBlock(p_ivot_high, index, internal, Bias.BULLISH)
             
@@ -219,18 +308,15 @@ class SMCEngine:
 
         # --- Bärischer Bruch ---
         if (not p_ivot_low.crossed and  
-            not pd.isna(p_ivot_low.currentLevel) and  
+            not math.isnan(p_ivot_low.currentLevel) and  
             current_close < p_ivot_low.currentLevel):
 
             tag = "CHoCH" if trend == Bias.BULLISH else "BOS"
             p_ivot_low.crossed = True
             new_trend = Bias.BEARISH
             
-            self.event_log.append({
-                "time": current_time, "index": index,
-                "type": f"{'Internal' if internal else 'Swing'} Bearish {tag}",
-                "level": p_ivot_low.currentLevel
-            })
+            self.event_log.append(f"{'Internal' if internal else 'Swing'} Bearish {tag}",
+                                  int(self.times[index]), index, p_ivot_low.currentLevel)
 
             self._storeOrdeBlock(p_ivot_low, index, internal, Bias.BEARISH)
             
@@ -239,38 +325,29 @@ class SMCEngine:
 
     # --- 3. Logik zur Mitigation (Löschung) ---
 
-    def _deleteOrderBlocks(self, index: int):
+    def _deleteOrderBlocks(self, current_high: float, current_low: float, current_close: float):
         """ Portierung von 'deleteOrderBlocks' (OB-Mitigation) """
-        current_high = self.highs[index]
-        current_low = self.lows[index]
-        current_close = self.closes[index]
-        
         bearish_mit_source = current_close if self.ob_mitigation == 'Close' else current_high
         bullish_mit_source = current_close if self.ob_mitigation == 'Close' else current_low
-        
-        for ob in self.internalOrderBlocks + self.swingOrderBlocks:
-            if ob.mitigated:
-                continue
-            
-            if ob.bias == Bias.BEARISH and bearish_mit_source > ob.barHigh:
-                ob.mitigated = True
-            elif ob.bias == Bias.BULLISH and bullish_mit_source < ob.barLow:
-                ob.mitigated = True
 
-    def _drawFairValueGaps(self, index: int):
+        # Nur die Heap-Spitzen pruefen: liegt die Quelle nicht ueber dem
+        # niedrigsten aktiven barHigh, ist auch kein anderer baerischer OB betroffen.
+        bearish = self._bearish_obs
+        while bearish and bearish_mit_source > bearish[0][0]:
+            heapq.heappop(bearish)[2].mitigated = True
+        bullish = self._bullish_obs
+        while bullish and bullish_mit_source < -bullish[0][0]:
+            heapq.heappop(bullish)[2].mitigated = True
+
+    def _drawFairValueGaps(self, index: int, bullish_fvg: bool, bearish_fvg: bool):
         """ Portierung von 'drawFairValueGaps' (FVG-Erkennung) """
-        if index < 2: return # Braucht 3 Kerzen
-
-        last_close = self.closes[index - 1]
-        current_high = self.highs[index]
-        current_low = self.lows[index]
-        last_2_high = self.highs[index - 2]
-        last_2_low = self.lows[index - 2]
-        current_time = self.times[index]
-
-        # Pine-Logik (vereinfacht, ohne 'threshold')
-        bullish_fvg = (current_low > last_2_high) and (last_close > last_2_high)
-        bearish_fvg = (current_high < last_2_low) and (last_close < last_2_low)
+        # Pine-Logik (vereinfacht, ohne 'threshold') -- vorab als Maske
+        # (process_dataframe); ab Kerze 2 (braucht 3 Kerzen)
+        current_high = float(self.highs[index])
+        current_low = float(self.lows[index])
+        last_2_high = float(self.highs[index - 2])
+        last_2_low = float(self.lows[index - 2])
+        current_time = int(self.times[index])
         
         if bullish_fvg:
             new_fvg = FVG(
@@ -280,10 +357,8 @@ class SMCEngine:
                 startTime = current_time
             )
             self.fairValueGaps.append(new_fvg)
-            self.event_log.append({
-                "time": current_time, "index": index, "type": "Bullish FVG",
-                "level": (new_fvg.top, new_fvg.bottom)
-            })
+            heapq.heappush(self._bullish_fvgs, (-new_fvg.bottom, next(self._seq), new_fvg))
+            self.event_log.append("Bullish FVG", current_time, index, new_fvg.top, new_fvg.bottom)
 
         if bearish_fvg:
             new_fvg = FVG(
@@ -293,24 +368,17 @@ class SMCEngine:
                 startTime = current_time
             )
             self.fairValueGaps.append(new_fvg)
-            self.event_log.append({
-                "time": current_time, "index": index, "type": "Bearish FVG",
-                "level": (new_fvg.top, new_fvg.bottom)
-            })
+            heapq.heappush(self._bearish_fvgs, (new_fvg.top, next(self._seq), new_fvg))
+            self.event_log.append("Bearish FVG", current_time, index, new_fvg.top, new_fvg.bottom)
 
-    def _deleteFairValueGaps(self, index: int):
+    def _deleteFairValueGaps(self, current_high: float, current_low: float):
         """ Portierung von 'deleteFairValueGaps' (FVG-Mitigation) """
-        current_low = self.lows[index]
-        current_high = self.highs[index]
-
-        for fvg in self.fairValueGaps:
-            if fvg.mitigated:
-                continue
-            
-            if fvg.bias == Bias.BULLISH and current_low < fvg.bottom:
-                fvg.mitigated = True
-            elif fvg.bias == Bias.BEARISH and current_high > fvg.top:
-                fvg.mitigated = True
+        bullish = self._bullish_fvgs
+        while bullish and current_low < -bullish[0][0]:
+            heapq.heappop(bullish)[2].mitigated = True
+        bearish = self._bearish_fvgs
+        while bearish and current_high > bearish[0][0]:
+            heapq.heappop(bearish)[2].mitigated = True
 
     # --- 4. Öffentliche Hauptmethode ---
     
@@ -320,36 +388,51 @@ class SMCEngine:
         """
         # 1. Daten vorbereiten
         df = df.sort_index()
-        self.highs = df['high'].tolist()
-        self.lows = df['low'].tolist()
-        self.closes = df['close'].tolist()
+        self.highs = df['high'].to_numpy(dtype=np.float64)
+        self.lows = df['low'].to_numpy(dtype=np.float64)
+        self.closes = df['close'].to_numpy(dtype=np.float64)
         
         if pd.api.types.is_datetime64_any_dtype(df.index):
-            self.times = df.index.astype(np.int64).tolist() # Zeit als int
+            self.times = df.index.astype(np.int64).to_numpy() # Zeit als int
         else:
-            self.times = df.index.astype(int).tolist()
-
-        # 2. Schleife durch jede Kerze (jeden 'Bar')
-        for i in range(len(df)):
-            # Die Ausführungsreihenfolge ist wichtig!
-            # Wir approximieren die Reihenfolge aus dem Pine-Skript.
-            
-            # 1. FVG-Mitigation
-            self._deleteFairValueGaps(i)
-            
-            # 2. Struktur-Pivots finden
-            self._getCurrentStructure(self.swingsLength, i, internal=False)
-            self._getCurrentStructure(self.internalLength, i, internal=True)
-            
-            # 3. BOS/CHoCH prüfen
-            self._displayStructure(i, internal=True)
-            self._displayStructure(i, internal=False)
-            
-            # 4. OB-Mitigation
-            self._deleteOrderBlocks(i)
-            
-            # 5. Neue FVGs finden
-            self._drawFairValueGaps(i)
+            self.times = df.index.astype(int).to_numpy(dtype=np.int64)
+
+        # Preis-abhaengige Teile vorab fuer alle Kerzen (siehe Klassen-Doku)
+        highs, lows, closes = pd.Series(self.highs), pd.Series(self.lows), pd.Series(self.closes)
+        swing_changes = self._leg_changes(highs, lows, self.swingsLength)
+        internal_changes = self._leg_changes(highs, lows, self.internalLength)
+        last_close, last_2_high, last_2_low = closes.shift(1), highs.shift(2), lows.shift(2)
+        bullish_fvgs = ((lows > last_2_high) & (last_close > last_2_high)).to_numpy()
+        bearish_fvgs = ((highs < last_2_low) & (last_close < last_2_low)).to_numpy()
+
+        # 2. Schleife durch jede Kerze (jeden 'Bar'), blockweise mit Python-Werten
+        for start in range(0, len(df), _CHUNK):
+            stop = min(start + _CHUNK, len(df))
+            for i, high, low, close, swing_change, internal_change, bull_fvg, bear_fvg in zip(
+                    range(start, stop), self.highs[start:stop].tolist(), self.lows[start:stop].tolist(),
+                    self.closes[start:stop].tolist(), swing_changes[start:stop].tolist(),
+                    internal_changes[start:stop].tolist(), bullish_fvgs[start:stop].tolist(),
+                    bearish_fvgs[start:stop].tolist()):
+                # Die Ausführungsreihenfolge ist wichtig!
+                # Wir approximieren die Reihenfolge aus dem Pine-Skript.
+
+                # 1. FVG-Mitigation
+                self._deleteFairValueGaps(high, low)
+
+                # 2. Struktur-Pivots finden
+                self._getCurrentStructure(self.swingsLength, i, False, swing_change)
+                self._getCurrentStructure(self.internalLength, i, True, internal_change)
+
+                # 3. BOS/CHoCH prüfen
+                self._displayStructure(i, close, internal=True)
+                self._displayStructure(i, close, internal=False)
+
+                # 4. OB-Mitigation
+                self._deleteOrderBlocks(high, low, close)
+
+                # 5. Neue FVGs finden
+                if bull_fvg or bear_fvg:
+                    self._drawFairValueGaps(i, bull_fvg, bear_fvg)
 
         # 3. Ergebnisse zurückgeben
         return {
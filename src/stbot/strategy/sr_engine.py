@@ -21,14 +21,8 @@ class SREngine:
         self.maxnumsr = settings.get('max_sr_levels', 5)
         self.min_strength = settings.get('min_strength', 2)
 
-    def process_dataframe(self, df: pd.DataFrame):
-        """
-        Verarbeitet den DataFrame und fügt die Spalte 'sr_signal' hinzu.
-        1 = Resistance Break (Buy), -1 = Support Break (Sell), 0 = Neutral
-        """
-        if df.empty: return df
-        df = df.copy()
-        
+    def _pivot_inputs(self, df: pd.DataFrame):
+        """Pivot-Flags/-Werte und Kanal-Breite je Kerze (Arrays fuer die Iteration)."""
         # 1. Basis-Daten bestimmen
         if self.ppsrc == 'High/Low':
             src1 = df['high']
@@ -64,14 +58,116 @@ class SREngine:
             highest_300 = df['high'].rolling(300, min_periods=50).max()
             lowest_300 = df['low'].rolling(300, min_periods=50).min()
             cwidths = (highest_300 - lowest_300) * self.channel_w_pct / 100
+
+        return (df['close'].values, pivot_high_confirmed.values, pivot_low_confirmed.values,
+                pivot_val_high.values, pivot_val_low.values, cwidths.fillna(0).values)
+
+    def _build_zones(self, pivotvals, current_cwidth):
+        """S/R-Zonen (staerkste zuerst, ueberlappungsfrei) aus den letzten Pivots."""
+        temp_zones = []
+        
+        for p_ref in pivotvals:
+            lo = p_ref
+            hi = p_ref
+            strength = 0
+            
+            for p_comp in pivotvals:
+                wdth = 0.0
+                if p_comp <= lo: wdth = hi - p_comp
+                else: wdth = p_comp - lo
+                
+                if wdth <= current_cwidth:
+                    if p_comp <= hi: lo = min(lo, p_comp)
+                    else: hi = max(hi, p_comp)
+                    strength += 1
+            
+            temp_zones.append({'hi': hi, 'lo': lo, 'strength': strength})
+        
+        temp_zones.sort(key=lambda x: x['strength'], reverse=True)
+        
+        final_zones = []
+        for z in temp_zones:
+            if z['strength'] < self.min_strength: continue
+            
+            is_overlapping = False
+            for existing in final_zones:
+                if (existing['hi'] >= z['lo'] and existing['hi'] <= z['hi']) or \
+                   (existing['lo'] >= z['lo'] and existing['lo'] <= z['hi']) or \
+                   (z['hi'] >= existing['lo'] and z['hi'] <= existing['hi']):
+                    is_overlapping = True
+                    break
+            
+            if not is_overlapping:
+                final_zones.append(z)
+                if len(final_zones) >= self.maxnumsr:
+                    break
+        return final_zones
+
+    @staticmethod
+    def _effective_cwidth(arr_cwidth, closes, i):
+        current_cwidth = arr_cwidth[i]
+        # Fallback, falls Berechnung noch nicht möglich war, aber min_periods erfüllt ist
+        if current_cwidth == 0 and i > 50:
+             # Kleiner Standardwert als Fallback
+             current_cwidth = closes[i] * 0.01
+        return current_cwidth
+
+    def zones_at(self, df: pd.DataFrame, bars=(-1,)):
+        """
+        S/R-Zonen (Liste {'hi', 'lo', 'strength'}) an den Kerzen-Positionen
+        `bars` (auch negativ, z.B. -1 = letzte Kerze), in derselben Reihenfolge.
+        Ohne Signal-Durchlauf: die Pivot-Liste einer Kerze sind die letzten
+        max_pivots bestaetigten Pivots bis dahin (binaere Suche), die
+        O(p^2)-Zonenbildung laeuft nur fuer die angefragten Kerzen.
+        """
+        if df.empty: return [[] for _ in bars]
+        closes, idx_pivot_h, idx_pivot_l, val_pivot_h, val_pivot_l, arr_cwidth = self._pivot_inputs(df)
+        # Je Kerze hoechstens ein neuer Pivot (High hat Vorrang), NaN zaehlt nicht
+        new_vals = np.where(idx_pivot_h, val_pivot_h, np.where(idx_pivot_l, val_pivot_l, np.nan))
+        pivot_pos = np.flatnonzero(~np.isnan(new_vals))
+        pivot_vals = new_vals[pivot_pos].tolist()
+
+        snapshots = []
+        for bar in bars:
+            i = bar + len(df) if bar < 0 else bar
+            count = int(np.searchsorted(pivot_pos, i, side='right'))
+            if count == 0:
+                snapshots.append([])
+                continue
+            # Neueste zuerst (wie pivotvals.insert(0, ...) in process_dataframe)
+            pivotvals = pivot_vals[max(0, count - self.maxnumpp):count][::-1]
+            snapshots.append(self._build_zones(pivotvals, self._effective_cwidth(arr_cwidth, closes, i)))
+        return snapshots
+
+    def process_dataframe(self, df: pd.DataFrame, zone_bars=None, zone_history=False):
+        """
+        Verarbeitet den DataFrame und fügt die Spalte 'sr_signal' hinzu.
+        1 = Resistance Break (Buy), -1 = Support Break (Sell), 0 = Neutral
+
+        zone_bars: optionale Kerzen-Positionen (auch negativ) -- die S/R-Zonen
+        dieser Kerzen aus DEMSELBEN Durchlauf landen in self.zone_snapshots
+        (Liste, gleiche Reihenfolge wie zone_bars), z.B. fuer Status-Charts.
+
+        zone_history=True: zusaetzlich self.zone_history, eine Intervall-Tabelle
+        (DataFrame hi, lo, strength, valid_from, valid_to) -- je Zone EIN
+        Eintrag von der Kerze, ab der sie im Zonen-Satz ist, bis zur Kerze, ab
+        der sie es nicht mehr ist (valid_to exklusiv; NaT = an der letzten
+        Kerze noch aktiv). Geschrieben wird nur, wenn sich der Zonen-Satz
+        aendert -- statt einer Zonen-Liste je Kerze, die auf langen
+        1h-Historien den Speicher sprengen wuerde.
+        """
+        self.zone_snapshots = [[] for _ in (zone_bars or ())]
+        history = _ZoneHistory() if zone_history else None
+        self.zone_history = history.to_frame(df.index) if history is not None and df.empty else None
+        if df.empty: return df
+        df = df.copy()
         
         # 4. Iteration durch die Kerzen
-        closes = df['close'].values
-        idx_pivot_h = pivot_high_confirmed.values
-        idx_pivot_l = pivot_low_confirmed.values
-        val_pivot_h = pivot_val_high.values
-        val_pivot_l = pivot_val_low.values
-        arr_cwidth = cwidths.fillna(0).values
+        closes, idx_pivot_h, idx_pivot_l, val_pivot_h, val_pivot_l, arr_cwidth = self._pivot_inputs(df)
+        # Kerzen-Position -> Indizes in zone_snapshots
+        wanted = {}
+        for k, bar in enumerate(zone_bars or ()):
+            wanted.setdefault(bar + len(df) if bar < 0 else bar, []).append(k)
         
         signals = np.zeros(len(df), dtype=int)
         pivotvals = []
@@ -91,50 +187,13 @@ class SREngine:
             
             if not pivotvals: continue
                 
-            current_cwidth = arr_cwidth[i]
-            # Fallback, falls Berechnung noch nicht möglich war, aber min_periods erfüllt ist
-            if current_cwidth == 0 and i > 50:
-                 # Kleiner Standardwert als Fallback
-                 current_cwidth = closes[i] * 0.01 
-
             # B. S/R Zonen berechnen
-            temp_zones = []
-            
-            for p_ref in pivotvals:
-                lo = p_ref
-                hi = p_ref
-                strength = 0
-                
-                for p_comp in pivotvals:
-                    wdth = 0.0
-                    if p_comp <= lo: wdth = hi - p_comp
-                    else: wdth = p_comp - lo
-                    
-                    if wdth <= current_cwidth:
-                        if p_comp <= hi: lo = min(lo, p_comp)
-                        else: hi = max(hi, p_comp)
-                        strength += 1
-                
-                temp_zones.append({'hi': hi, 'lo': lo, 'strength': strength})
-            
-            temp_zones.sort(key=lambda x: x['strength'], reverse=True)
-            
-            final_zones = []
-            for z in temp_zones:
-                if z['strength'] < self.min_strength: continue
-                
-                is_overlapping = False
-                for existing in final_zones:
-                    if (existing['hi'] >= z['lo'] and existing['hi'] <= z['hi']) or \
-                       (existing['lo'] >= z['lo'] and existing['lo'] <= z['hi']) or \
-                       (z['hi'] >= existing['lo'] and z['hi'] <= existing['hi']):
-                        is_overlapping = True
-                        break
-                
-                if not is_overlapping:
-                    final_zones.append(z)
-                    if len(final_zones) >= self.maxnumsr:
-                        break
+            final_zones = self._build_zones(pivotvals, self._effective_cwidth(arr_cwidth, closes, i))
+            if i in wanted:
+                for k in wanted[i]:
+                    self.zone_snapshots[k] = final_zones
+            if history is not None:
+                history.update(i, final_zones)
             
             # C. Breakout Check
             if i == 0: continue
@@ -158,4 +217,51 @@ class SREngine:
                     break
 
         df['sr_signal'] = signals
+        if history is not None:
+            self.zone_history = history.to_frame(df.index)
         return df
+
+
+class _ZoneHistory:
+    """Sammelt Zonen-Intervalle waehrend process_dataframe() (spaltenweise)."""
+
+    def __init__(self):
+        self._key = ()
+        self._open = {}  # (hi, lo, strength) -> Start-Position
+        self._rows = {'hi': [], 'lo': [], 'strength': [], 'start': [], 'end': []}
+
+    def _emit(self, zone, start, end):
+        rows = self._rows
+        rows['hi'].append(zone[0])
+        rows['lo'].append(zone[1])
+        rows['strength'].append(zone[2])
+        rows['start'].append(start)
+        rows['end'].append(end)
+
+    def update(self, i, zones):
+        key = tuple((z['hi'], z['lo'], z['strength']) for z in zones)
+        if key == self._key:
+            return
+        current = set(key)
+        for zone in [z for z in self._open if z not in current]:
+            self._emit(zone, self._open.pop(zone), i)
+        for zone in key:
+            self._open.setdefault(zone, i)
+        self._key = key
+
+    def to_frame(self, index):
+        for zone, start in self._open.items():
+            self._emit(zone, start, -1)
+        self._open = {}
+        rows = self._rows
+        start = np.asarray(rows['start'], dtype=np.int64)
+        end = np.asarray(rows['end'], dtype=np.int64)
+        valid_to = index[np.maximum(end, 0)] if len(end) else index[:0]
+        frame = pd.DataFrame({
+            'hi': np.asarray(rows['hi'], dtype='float64'),
+            'lo': np.asarray(rows['lo'], dtype='float64'),
+            'strength': np.asarray(rows['strength'], dtype=np.int64),
+            'valid_from': index[start] if len(start) else index[:0],
+            'valid_to': valid_to.where(end >= 0) if len(end) else valid_to,
+        })
+        return frame.sort_values(['valid_from', 'strength'], ascending=[True, False], kind='stable').reset_index(drop=True)
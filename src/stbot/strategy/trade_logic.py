@@ -1,4 +1,5 @@
 # src/stbot/strategy/trade_logic.py
+import numpy as np
 import pandas as pd
 
 def get_titan_signal(processed_data: pd.DataFrame, current_candle: pd.Series, params: dict, market_bias=None):
@@ -55,3 +56,36 @@ def get_titan_signal(processed_data: pd.DataFrame, current_candle: pd.Series, pa
         return signal_side, close_price
 
     return None, None
+
+
+def compute_titan_signals(processed_data: pd.DataFrame, params: dict = None, market_bias=None):
+    """
+    Vektorisierte Variante von get_titan_signal() fuer ALLE Kerzen eines
+    bereits von der SREngine verarbeiteten DataFrames auf einmal.
+    Rueckgabe: int8-Array (1 = buy, -1 = sell, 0 = kein Signal).
+
+    Muss exakt dieselben Regeln wie get_titan_signal() abbilden -- dort ist
+    vol_avg der Mittelwert der LETZTEN 20 Kerzen des gesamten uebergebenen
+    DataFrames (nicht ein rollierendes Fenster), also fuer alle Kerzen
+    derselbe Wert. NaN-Volumen blockiert (wie im skalaren Vergleich) nicht.
+    """
+    if processed_data is None or processed_data.empty or 'sr_signal' not in processed_data.columns:
+        return np.zeros(0 if processed_data is None else len(processed_data), dtype=np.int8)
+
+    signal_val = processed_data['sr_signal'].to_numpy(dtype='float64')
+    sides = np.where(signal_val == 1, 1, np.where(signal_val == -1, -1, 0)).astype(np.int8)
+
+    if 'volume' in processed_data.columns:
+        vol_avg = processed_data['volume'].tail(20).mean()
+        volume = processed_data['volume'].to_numpy(dtype='float64')
+        with np.errstate(invalid='ignore'):
+            weak = volume < vol_avg * 1.2
+        sides[(signal_val != 0) & weak] = 0
+
+    if market_bias and market_bias != "NEUTRAL":
+        if market_bias == "BULLISH":
+            sides[sides == -1] = 0
+        elif market_bias == "BEARISH":
+            sides[sides == 1] = 0
+
+    return sides
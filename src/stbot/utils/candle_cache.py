@@ -0,0 +1,126 @@
+# src/stbot/utils/candle_cache.py
+"""
+Rollierender OHLCV-Cache im Speicher, geteilt von allen Live-Strategien eines
+Prozesses (Daemon: alle Accounts/Strategien; Cron: die eine Strategie inkl. HTF).
+
+Vorher holte check_and_open_new_position() bei JEDEM Zyklus 1000 Kerzen des
+Handels-Timeframes plus 100 HTF-Kerzen -- obwohl sich zwei aufeinanderfolgende
+Zyklen um 999 Kerzen ueberschneiden und mehrere Strategien dasselbe Symbol
+handeln. Jetzt je (symbol, timeframe) ein DataFrame geschlossener Kerzen:
+
+- Erstabruf wie bisher (limit Kerzen), danach nur noch die Kerzen AB der
+  letzten gecachten (since=letzte Kerze -> 1 Kerze Ueberlappung, damit eine
+  nachtraeglich korrigierte Kerze ueberschrieben wird). Pro Zyklus sind das
+  wenige Kerzen statt 1000.
+- Hoehere Timeframes werden, wo moeglich, aus dem gecachten niedrigeren
+  Timeframe desselben Symbols resampelt (z.B. 4h-HTF aus den 1h-Kerzen) -- nur
+  wenn jede HTF-Kerze vollstaendig abgedeckt ist (keine Luecken, keine halben
+  Kerzen am Rand), sonst wird der HTF wie gewohnt (inkrementell) geladen.
+  Bitget-Kerzen bis 1d sind an der Unix-Epoche (UTC) ausgerichtet, die
+  Resample-Buckets (origin='epoch') damit identisch.
+
+Abruf und Zusammenfuehren sind getrennt (plan_fetch / store), damit der
+synchrone Wrapper (Exchange.fetch_recent_ohlcv) und der asynchrone Vorab-Abruf
+(stbot/strategy/async_cycle.py) denselben Cache benutzen.
+"""
+import threading
+
+import pandas as pd
+
+from stbot.utils.timeframe_utils import timeframe_to_seconds
+
+# Obergrenze je (symbol, timeframe) -- entspricht dem groessten Live-Abruf (1000)
+MAX_CANDLES = 1000
+
+_CACHE = {}   # (symbol, timeframe) -> DataFrame (UTC-Index, nur geschlossene Kerzen)
+_LOCK = threading.Lock()
+
+
+def _now_ms():
+    return int(pd.Timestamp.now(tz='UTC').value // 1_000_000)
+
+
+def plan_fetch(symbol, timeframe, limit):
+    """
+    kwargs fuer fetch_ohlcv(symbol, timeframe, **kwargs): inkrementell ab der
+    letzten gecachten Kerze, oder ein voller Abruf (leerer Cache, zu wenig
+    Historie, Luecke groesser als MAX_CANDLES).
+    """
+    limit = min(limit, MAX_CANDLES)
+    tf_ms = timeframe_to_seconds(timeframe) * 1000
+    with _LOCK:
+        cached = _CACHE.get((symbol, timeframe))
+    # limit - 1: der volle Abruf liefert die laufende Kerze mit, die
+    # ohlcv_to_frame verwirft
+    if cached is None or len(cached) < limit - 1:
+        return {'limit': limit}
+    last_ms = int(cached.index[-1].value // 1_000_000)
+    missing = (_now_ms() - last_ms) // tf_ms + 2
+    if missing > MAX_CANDLES:
+        return {'limit': limit}
+    return {'since': last_ms, 'limit': int(missing)}
+
+
+def store(symbol, timeframe, frame, limit, incremental):
+    """
+    Fuehrt einen abgerufenen Frame (bereits ohne offene Kerze, siehe
+    exchange.ohlcv_to_frame) in den Cache ein und liefert die letzten `limit`
+    Kerzen als Kopie (Aufrufer haengen Spalten wie 'atr' an).
+    """
+    key = (symbol, timeframe)
+    with _LOCK:
+        cached = _CACHE.get(key)
+        if incremental and cached is not None:
+            merged = pd.concat([cached, frame])
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        else:
+            merged = frame
+        merged = merged.iloc[-MAX_CANDLES:]
+        _CACHE[key] = merged
+        return merged.tail(limit).copy()
+
+
+def get_cached(symbol, timeframe, limit):
+    """Letzte `limit` Kerzen aus dem Cache (Kopie) oder None."""
+    with _LOCK:
+        cached = _CACHE.get((symbol, timeframe))
+        return cached.tail(limit).copy() if cached is not None and not cached.empty else None
+
+
+def resample_from_cache(symbol, timeframe, limit):
+    """
+    `limit` Kerzen von `timeframe` aus einem gecachten niedrigeren Timeframe
+    desselben Symbols, oder None, falls keiner sie vollstaendig abdeckt.
+    Die feinste passende Quelle wird zuerst versucht; die juengste HTF-Kerze
+    muss bereits geschlossen sein (alle Teilkerzen vorhanden).
+    """
+    target_s = timeframe_to_seconds(timeframe)
+    now = pd.Timestamp(_now_ms(), unit='ms', tz='UTC')
+    with _LOCK:
+        sources = [(timeframe_to_seconds(tf), df) for (sym, tf), df in _CACHE.items()
+                   if sym == symbol and tf != timeframe and not df.empty]
+    for source_s, df in sorted(sources, key=lambda s: s[0]):
+        if source_s >= target_s or target_s % source_s:
+            continue
+        # Quelle muss aktuell sein (letzte geschlossene Kerze vorhanden), sonst
+        # wuerde ein veralteter HTF still weiterverwendet
+        last_closed = now.floor(f"{source_s}s") - pd.Timedelta(seconds=source_s)
+        if df.index[-1] < last_closed:
+            continue
+        ratio = target_s // source_s
+        resampler = df.resample(f"{target_s}s", origin='epoch', label='left', closed='left')
+        out = resampler.agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+        counts = resampler['close'].count()
+        # Die noch laufende HTF-Kerze gehoert nicht dazu (wie ohlcv_to_frame)
+        closed = out.index + pd.Timedelta(seconds=target_s) <= now
+        out, complete = out[closed], (counts == ratio)[closed]
+        # Nur den zusammenhaengenden, vollstaendigen Block am Ende verwenden
+        if complete.empty or not complete.iloc[-1]:
+            continue
+        incomplete = (~complete).to_numpy().nonzero()[0]
+        start = incomplete[-1] + 1 if len(incomplete) else 0
+        block = out.iloc[start:]
+        if len(block) < limit:
+            continue
+        return block.tail(limit).copy()
+    return None
@@ -8,6 +8,8 @@ import logging
 import os
 import threading
 
+from stbot.utils import candle_cache
+
 logger = logging.getLogger(__name__)
 
 # Prozessweiter Markets-Cache: LazyFineData/load_data() erzeugen pro Tages-Fetch
@@ -21,6 +23,17 @@ logger = logging.getLogger(__name__)
 _markets_cache = {}
 _markets_cache_lock = threading.Lock()
 
+# Konto-weite Entry-Sperre je API-Key: im Daemon laufen die Strategien eines
+# Zyklus parallel in Threads (async_cycle.run_cycles_async). Der asyncio.Lock je
+# Symbol trennt nur Strategien desselben Symbols -- zwei Strategien auf
+# verschiedenen Symbolen lasen sonst dasselbe freie Guthaben und dimensionierten
+# beide ihre Position daraus (Summe ueber dem Risiko-Budget, im Extremfall
+# InsufficientFunds beim zweiten Entry). Guthaben lesen -> Groesse berechnen ->
+# Order platzieren laeuft deshalb konto-weit unter dieser Sperre (siehe
+# Exchange.account_lock, trade_manager.check_and_open_new_position).
+_account_locks = {}
+_account_locks_guard = threading.Lock()
+
 # --- Pfad für Fallback-Cache ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 
@@ -42,6 +55,93 @@ def load_data_from_cache_or_fetch(symbol, timeframe, start_date_str, end_date_st
     return pd.DataFrame()
 
 
+def ohlcv_to_frame(data, tf_seconds):
+    """
+    Rohe ccxt-OHLCV-Liste -> DataFrame mit UTC-Index. Letzte Kerze wird
+    verworfen, falls sie noch nicht geschlossen ist (fetch_ohlcv liefert sonst
+    die gerade laufende Kerze als letzte Zeile -> würde Signale auf Basis
+    unvollständiger Daten auslösen, siehe Live-vs-Backtest-Analyse 2026-07-30).
+    Gemeinsam genutzt von fetch_recent_ohlcv() und dem asynchronen Vorab-Abruf
+    (stbot/strategy/async_cycle.py).
+    """
+    df = pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms', utc=True)
+    df.set_index('timestamp', inplace=True)
+    df.sort_index(inplace=True)
+
+    if not df.empty and tf_seconds:
+        last_close_time = df.index[-1] + pd.Timedelta(seconds=tf_seconds)
+        if last_close_time > pd.Timestamp.now(tz='UTC'):
+            df = df.iloc[:-1]
+    return df
+
+
+def _parse_usdt_free(balance):
+    if 'USDT' in balance and 'free' in balance['USDT']:
+        return float(balance['USDT']['free'])
+    if 'info' in balance and 'data' in balance['info']:
+           for asset in balance['info']['data']:
+                if asset.get('marginCoin') == 'USDT':
+                     return float(asset.get('available', 0))
+    return 0
+
+
+def _open_only(positions):
+    return [p for p in positions if float(p.get('contracts', 0) or 0) > 0]
+
+
+class AccountSnapshot:
+    """
+    Konto-Schnappschuss eines Zyklus: ALLE offenen Positionen und ALLE offenen
+    Trigger-Orders aus je EINEM Bulk-Call. Die
+    symbolbezogenen Abfragen (fetch_open_positions(symbol), ...) werden daraus
+    bedient, statt je Strategie und Zyklus mehrfach dieselben REST-Calls
+    abzusetzen (vorher: Positionen bis zu 4x je Strategie -- Zyklusbeginn,
+    zweimal im Housekeeper, vor dem Entry).
+
+    Das Guthaben gehoert bewusst NICHT dazu: der einzige Verbraucher (Sizing
+    in check_and_open_new_position) liest es unter Exchange.account_lock immer
+    live -- ein Schnappschuss-Wert waere je Zyklus ein unnoetiger REST-Call.
+
+    Invalidierung explizit durch die Order-Methoden von Exchange: eine
+    Market-Order macht Positionen und Orders des Symbols ungueltig,
+    Trigger-/Trailing-Orders und Stornos nur die Orders. Ungueltige Eintraege
+    gehen danach wieder live an die API. orders=None bedeutet "Bulk-Abruf nicht
+    verfuegbar" -> Orders immer live.
+    """
+
+    def __init__(self, positions, orders=None):
+        self._lock = threading.Lock()
+        self._positions = {}
+        for p in _open_only(positions):
+            self._positions.setdefault(p.get('symbol'), []).append(p)
+        self._orders = None
+        if orders is not None:
+            self._orders = {}
+            for o in orders:
+                self._orders.setdefault(o.get('symbol'), []).append(o)
+        self._stale_positions = set()
+        self._stale_orders = set()
+
+    def positions(self, symbol):
+        """Offene Positionen des Symbols oder None (nicht/nicht mehr im Schnappschuss)."""
+        with self._lock:
+            if symbol in self._stale_positions:
+                return None
+            return list(self._positions.get(symbol, []))
+
+    def trigger_orders(self, symbol):
+        with self._lock:
+            if self._orders is None or symbol in self._stale_orders:
+                return None
+            return list(self._orders.get(symbol, []))
+
+    def invalidate(self, symbol, positions=False, orders=False):
+        with self._lock:
+            if positions: self._stale_positions.add(symbol)
+            if orders: self._stale_orders.add(symbol)
+
+
 class Exchange:
     def __init__(self, account_config):
         self.account = account_config
@@ -85,40 +185,98 @@ class Exchange:
         if self.markets is not None and self.exchange.markets is not self.markets:
             self.exchange.set_markets(self.markets)
 
+        self.snapshot = None  # AccountSnapshot des laufenden Zyklus (siehe refresh_account_snapshot)
+        with _account_locks_guard:
+            self.account_lock = _account_locks.setdefault(self.account.get('apiKey'), threading.Lock())
+
+    # --- 0. ACCOUNT SNAPSHOT (ein Bulk-Abruf je Zyklus) ---
+
+    def refresh_account_snapshot(self):
+        """Laedt Positionen und Trigger-Orders des gesamten Kontos in je
+        einem Call und bedient daraus die symbolbezogenen Abfragen bis
+        clear_account_snapshot(). Bei Fehlern bleibt der Schnappschuss aus und
+        alles laeuft wie bisher live."""
+        if not self.markets: return None
+        params = {'productType': 'USDT-FUTURES'}
+        try:
+            positions = self.exchange.fetch_positions(None, params=params)
+        except Exception as e:
+            logger.warning(f"Konto-Schnappschuss fehlgeschlagen, nutze Einzelabfragen: {e}")
+            self.snapshot = None
+            return None
+        try:
+            orders = self.exchange.fetch_open_orders(None, params={**params, 'stop': True})
+        except Exception as e:
+            logger.info(f"Bulk-Abruf der Trigger-Orders nicht verfuegbar ({e}) -- Orders weiter je Symbol.")
+            orders = None
+        self.snapshot = AccountSnapshot(positions, orders)
+        return self.snapshot
+
+    def set_account_snapshot(self, snapshot):
+        self.snapshot = snapshot
+
+    def clear_account_snapshot(self):
+        self.snapshot = None
+
+    def _invalidate_snapshot(self, symbol, **kinds):
+        if self.snapshot is not None:
+            self.snapshot.invalidate(symbol, **kinds)
+
+    def create_async_client(self):
+        """
+        ccxt-async-Client (ccxt.async_support) mit denselben Zugangsdaten und den
+        bereits geladenen Maerkten (set_markets, kein Netzwerk-Call). Gehoert zu
+        genau einer Event-Loop -- der Aufrufer muss ihn mit `await client.close()`
+        wieder schliessen (siehe stbot/strategy/async_cycle.py).
+        """
+        import ccxt.async_support as ccxt_async
+        client = ccxt_async.bitget({
+            'apiKey': self.account.get('apiKey'),
+            'secret': self.account.get('secret'),
+            'password': self.account.get('password'),
+            'options': {
+                'defaultType': 'swap',
+            },
+            'enableRateLimit': True,
+        })
+        if self.markets is not None:
+            client.set_markets(self.markets)
+        return client
+
     # --- 1. DATA FETCHING (Live Data Priority) ---
 
     def fetch_recent_ohlcv(self, symbol, timeframe, limit=300):
+        """
+        Letzte `limit` geschlossene Kerzen ueber den rollierenden Kerzen-Cache
+        (stbot/utils/candle_cache.py): nach dem Erstabruf nur noch die neuen
+        Kerzen, hoehere Timeframes wenn moeglich resampelt aus einem gecachten
+        niedrigeren Timeframe desselben Symbols.
+        """
         if not self.markets: return pd.DataFrame()
 
+        resampled = candle_cache.resample_from_cache(symbol, timeframe, limit)
+        if resampled is not None:
+            return resampled
+
         # IMMER zuerst Live-API versuchen!
         try:
-            effective_limit = min(limit, 1000)
-            data = self.exchange.fetch_ohlcv(symbol, timeframe, limit=effective_limit)
+            fetch_kwargs = candle_cache.plan_fetch(symbol, timeframe, limit)
+            data = self.exchange.fetch_ohlcv(symbol, timeframe, **fetch_kwargs)
 
             if data:
-                df = pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms', utc=True)
-                df.set_index('timestamp', inplace=True)
-                df.sort_index(inplace=True)
-
-                # Letzte Kerze verwerfen, falls sie noch nicht geschlossen ist (fetch_ohlcv liefert
-                # sonst die gerade laufende Kerze als letzte Zeile -> würde Signale auf Basis
-                # unvollständiger Daten auslösen, siehe Live-vs-Backtest-Analyse 2026-07-30).
-                if not df.empty:
-                    try:
-                        tf_seconds = self.exchange.parse_timeframe(timeframe)
-                        last_close_time = df.index[-1] + pd.Timedelta(seconds=tf_seconds)
-                        if last_close_time > pd.Timestamp.now(tz='UTC'):
-                            df = df.iloc[:-1]
-                    except Exception:
-                        pass
-
-                return df
+                frame = ohlcv_to_frame(data, self.exchange.parse_timeframe(timeframe))
+                return candle_cache.store(symbol, timeframe, frame, limit, 'since' in fetch_kwargs)
 
         except Exception as e:
             logger.error(f"FEHLER bei Live-API-Abruf für {symbol}: {e}. Versuche Fallback.")
 
-        # Fallback auf Cache
+        # Fallback 1: Kerzen-Cache (hoechstens ein paar Kerzen alt)
+        cached = candle_cache.get_cached(symbol, timeframe, limit)
+        if cached is not None:
+            logger.warning(f"WARNUNG: Verwende Kerzen-Cache ohne aktuelle Kerzen für {symbol}!")
+            return cached
+
+        # Fallback 2: CSV-Cache
         data = load_data_from_cache_or_fetch(symbol, timeframe, '2021-01-01', datetime.now().strftime('%Y-%m-%d'))
         if not data.empty:
             logger.warning(f"WARNUNG: Verwende veraltete Cache-Daten für {symbol}!")
@@ -269,6 +427,7 @@ class Exchange:
             if 'instId' in clean_params: del clean_params['instId']
             if 'symbol' in clean_params: del clean_params['symbol']
 
+            self._invalidate_snapshot(symbol, positions=True, orders=True)
             return self.exchange.create_order(symbol, 'market', side, rounded_amount, params=clean_params)
         except ccxt.InsufficientFunds as e:
             logger.error("Zu wenig Guthaben für Order.")
@@ -293,6 +452,7 @@ class Exchange:
             if 'symbol' in order_params: del order_params['symbol']
 
             logger.info(f"Sende Trigger Order: Side={side}, Price={rounded_price}")
+            self._invalidate_snapshot(symbol, orders=True)
             return self.exchange.create_order(symbol, 'market', side, rounded_amount, params=order_params)
         except Exception as e:
             logger.error(f"Fehler bei Trigger Order: {e}")
@@ -311,6 +471,7 @@ class Exchange:
                 'trailingPercent': callback_rate_float,
                 'productType': 'USDT-FUTURES'
             }
+            self._invalidate_snapshot(symbol, orders=True)
             return self.exchange.create_order(symbol, 'market', side, rounded_amount, params=order_params)
         except Exception as e:
             logger.error(f"Fehler bei Trailing Stop: {e}")
@@ -320,6 +481,9 @@ class Exchange:
 
     def fetch_open_positions(self, symbol):
         if not self.markets: return []
+        if self.snapshot is not None:
+            cached = self.snapshot.positions(symbol)
+            if cached is not None: return cached
         try:
             params = {'productType': 'USDT-FUTURES'}
             positions = self.exchange.fetch_positions([symbol], params=params)
@@ -330,6 +494,9 @@ class Exchange:
 
     def fetch_open_trigger_orders(self, symbol):
         if not self.markets: return []
+        if self.snapshot is not None:
+            cached = self.snapshot.trigger_orders(symbol)
+            if cached is not None: return cached
         try:
             params = {'productType': 'USDT-FUTURES', 'stop': True}
             return self.exchange.fetch_open_orders(symbol, params=params)
@@ -338,17 +505,12 @@ class Exchange:
             return []
 
     def fetch_balance_usdt(self):
+        # Immer live (nicht im AccountSnapshot) -- siehe account_lock
         if not self.markets: return 0
         try:
             params = {'productType': 'USDT-FUTURES'}
             balance = self.exchange.fetch_balance(params=params)
-            if 'USDT' in balance and 'free' in balance['USDT']:
-                return float(balance['USDT']['free'])
-            if 'info' in balance and 'data' in balance['info']:
-                   for asset in balance['info']['data']:
-                        if asset.get('marginCoin') == 'USDT':
-                             return float(asset.get('available', 0))
-            return 0
+            return _parse_usdt_free(balance)
         except Exception as e:
             logger.error(f"Fehler bei Balance: {e}")
             return 0
@@ -357,6 +519,7 @@ class Exchange:
         """Brute Force Löschung: Erst Massen-Löschen, dann gezieltes Einzel-Löschen"""
         if not self.markets: return 0
         count = 0
+        self._invalidate_snapshot(symbol, orders=True)
 
         # 1. Versuch: Massen-Löschung (Schnell)
         try:
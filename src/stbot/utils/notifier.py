@@ -0,0 +1,101 @@
+# src/stbot/utils/notifier.py
+"""
+Benachrichtigungs-Queue mit Hintergrund-Worker (Telegram-Text + Entry-Chart).
+
+Vorher rief check_and_open_new_position() direkt nach dem Platzieren der
+Orders send_message() und _send_stbot_chart() auf -- matplotlib-PNG rendern
+plus blockierende requests.post-Uploads (10s/30s Timeout) im Handelsprozess.
+Im Daemon verzoegerte eine langsame Telegram-API damit den Zyklus der naechsten
+Strategie (bzw. hielt den Symbol-Lock im nebenlaeufigen Zyklus).
+
+Jetzt legt der Handelspfad nur noch einen Job in die Queue (submit) und kehrt
+sofort zurueck. EIN Worker-Thread je Prozess arbeitet die Jobs in Reihenfolge
+ab (Text vor Chart), rendert dort auch den Chart, und wiederholt fehlgeschlagene
+Sendungen mit Backoff (Job liefert False -> erneuter Versuch). Gleiche
+dedupe_keys innerhalb von DEDUPE_TTL_SECONDS werden verworfen (z.B. zweimal
+derselbe Entry nach einem Retry im Handelspfad).
+
+Kurzlebige Prozesse (Cron: ein run.py je Strategie) warten beim Beenden per
+atexit bis zu FLUSH_TIMEOUT_SECONDS auf die ausstehenden Jobs -- der Handel
+selbst ist zu diesem Zeitpunkt schon abgeschlossen.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 5
+DEDUPE_TTL_SECONDS = 600
+FLUSH_TIMEOUT_SECONDS = 90
+
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+_recent_keys = {}   # dedupe_key -> Zeitpunkt der Annahme
+
+
+def _run_job(job, description):
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            if job() is not False:
+                return
+            logger.warning(f"Benachrichtigung '{description}' fehlgeschlagen (Versuch {attempt}/{MAX_ATTEMPTS}).")
+        except Exception as e:
+            logger.warning(f"Benachrichtigung '{description}' fehlgeschlagen (Versuch {attempt}/{MAX_ATTEMPTS}): {e}")
+        if attempt < MAX_ATTEMPTS:
+            time.sleep(RETRY_BACKOFF_SECONDS * attempt)
+    logger.error(f"Benachrichtigung '{description}' endgültig verworfen.")
+
+
+def _work():
+    while True:
+        job, description = _queue.get()
+        try:
+            _run_job(job, description)
+        finally:
+            _queue.task_done()
+
+
+def _ensure_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_work, name='stbot-notifier', daemon=True)
+            _worker.start()
+
+
+def submit(job, description='', dedupe_key=None):
+    """
+    Reiht einen Job ein (Callable ohne Argumente; Rueckgabe False = erneut
+    versuchen). Gibt False zurueck, wenn der dedupe_key kuerzlich schon
+    angenommen wurde.
+    """
+    if dedupe_key is not None:
+        now = time.time()
+        with _worker_lock:
+            for key, ts in list(_recent_keys.items()):
+                if now - ts > DEDUPE_TTL_SECONDS:
+                    del _recent_keys[key]
+            if dedupe_key in _recent_keys:
+                logger.info(f"Benachrichtigung '{description}' bereits eingereiht -- übersprungen.")
+                return False
+            _recent_keys[dedupe_key] = now
+    _ensure_worker()
+    _queue.put((job, description))
+    return True
+
+
+def flush(timeout=FLUSH_TIMEOUT_SECONDS):
+    """Wartet (hoechstens timeout Sekunden), bis alle Jobs abgearbeitet sind."""
+    deadline = time.time() + timeout
+    while _queue.unfinished_tasks and time.time() < deadline:
+        time.sleep(0.1)
+    if _queue.unfinished_tasks:
+        logger.warning(f"{_queue.unfinished_tasks} Benachrichtigung(en) beim Beenden nicht gesendet.")
+
+
+atexit.register(flush)
@@ -0,0 +1,112 @@
+# src/stbot/utils/state_store.py
+"""
+Kleiner Key-Value-Store auf einer JSON-Datei (artifacts/db/trade_lock.json).
+
+Vorher las is_trade_locked(), set_trade_lock() und der Re-Entry-Check bei
+JEDEM Aufruf die komplette Datei neu ein, und save_trade_lock() schrieb sie
+nicht-atomar neu (open(..., 'w') + json.dump). Mehrere gleichzeitig laufende
+run.py-Prozesse (Cron/master_runner) bzw. Zyklus-Threads (Daemon) konnten
+dabei (a) eine halb geschriebene Datei lesen -> JSONDecodeError, und (b) sich
+gegenseitig Schluessel ueberschreiben (lesen - aendern - schreiben ohne Lock:
+der zweite Schreiber verwirft den Eintrag des ersten).
+
+Jetzt:
+- Lesen aus einem In-Process-Cache; neu eingelesen wird nur, wenn sich die
+  Datei geaendert hat (os.stat: mtime/Groesse/Inode -- ein os.replace eines
+  anderen Prozesses erzeugt immer einen neuen Inode).
+- Schreiben nur als Aenderung einzelner Schluessel (update(values, delete)):
+  unter einer exklusiven Datei-Sperre (fcntl.flock auf <datei>.lock, wirkt
+  prozessuebergreifend) wird der aktuelle Stand neu geladen, die Schluessel
+  gemergt und die Datei atomar ersetzt (Temp-Datei + fsync + os.replace).
+  Mehrere Schluessel eines Vorgangs (z.B. Sperre + letzter Entry-Preis) gehen
+  in EINEN Schreibvorgang.
+Das Dokument bleibt wenige Zeilen gross und menschenlesbar -- ein Neuschreiben
+unter Lock ist hier billiger als eine SQLite-Datenbank einzufuehren.
+"""
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl  # POSIX; auf Windows nur prozessinterne Sperre
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class JsonStateStore:
+    def __init__(self, path, indent=4, json_default=None):
+        # indent=None/json_default=float fuer grosse, maschinell gelesene
+        # Dokumente mit numpy-Werten (z.B. optimizer.TRIAL_CACHE_FILE).
+        self.path = path
+        self._indent = indent
+        self._json_default = json_default
+        self._lock_path = path + '.lock'
+        self._mutex = threading.Lock()
+        self._data = {}
+        self._signature = None
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _refresh(self):
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        data = {}
+        if signature is not None:
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"State-Datei {self.path} nicht lesbar ({e}) -- behandle sie als leer.")
+        self._data, self._signature = data, signature
+
+    @contextmanager
+    def _exclusive(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self._lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, data):
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=self._indent, default=self._json_default)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def get(self, key, default=None):
+        with self._mutex:
+            self._refresh()
+            return self._data.get(key, default)
+
+    def snapshot(self):
+        """Kopie des gesamten Dokuments."""
+        with self._mutex:
+            self._refresh()
+            return dict(self._data)
+
+    def update(self, values=None, delete=()):
+        """Setzt/loescht einzelne Schluessel (ein atomarer Schreibvorgang)."""
+        with self._mutex, self._exclusive():
+            self._refresh()
+            data = dict(self._data)
+            data.update(values or {})
+            for key in delete:
+                data.pop(key, None)
+            self._write(data)
+            self._data, self._signature = data, self._file_signature()
@@ -5,9 +5,10 @@ import logging
 logger = logging.getLogger(__name__)
 
 def send_message(bot_token, chat_id, message):
+    """Gibt True bei Erfolg zurueck, sonst False (fuer Retries, siehe notifier.py)."""
     if not bot_token or not chat_id:
         logger.warning("Telegram Bot-Token oder Chat-ID nicht konfiguriert.")
-        return
+        return False
 
     # Escape MarkdownV2 characters
     escape_chars = r'_*[]()~`>#+-=|{}.!'
@@ -32,17 +33,19 @@ def send_message(bot_token, chat_id, message):
              logger.error(f"Fehler beim Senden der Telegram-Nachricht (Status {response.status_code}): {response.text}")
         # Optional: Erfolgsmeldung loggen
         # logger.debug(f"Telegram-Nachricht erfolgreich gesendet an Chat {chat_id}.")
+        return True
     except requests.exceptions.RequestException as e:
         logger.error(f"Netzwerkfehler beim Senden der Telegram-Nachricht: {e}")
     except Exception as e:
         logger.error(f"Allgemeiner Fehler beim Senden der Telegram-Nachricht: {e}")
+    return False
 
 
 def send_photo(bot_token, chat_id, file_path, caption=""):
-    """Sendet ein Bild (PNG/JPG) an einen Telegram-Chat."""
+    """Sendet ein Bild (PNG/JPG) an einen Telegram-Chat. True bei Erfolg."""
     if not bot_token or not chat_id:
         logger.warning("Telegram Bot-Token oder Chat-ID nicht konfiguriert.")
-        return
+        return False
     api_url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
     try:
         with open(file_path, 'rb') as img:
@@ -50,12 +53,14 @@ def send_photo(bot_token, chat_id, file_path, caption=""):
                                      data={'chat_id': chat_id, 'caption': caption},
                                      files={'photo': img}, timeout=30)
             response.raise_for_status()
+        return True
     except FileNotFoundError:
         logger.error(f"Bild nicht gefunden: {file_path}")
     except requests.exceptions.RequestException as e:
         logger.error(f"Fehler beim Senden des Fotos: {e}")
     except Exception as e:
         logger.error(f"Unerwarteter Fehler beim Foto-Versand: {e}")
+    return False
 
 
 def send_document(bot_token, chat_id, file_path, caption=""):
@@ -39,3 +39,16 @@ def determine_htf(timeframe):
         return '1d' 
         
     return best_htf
+
+
+def timeframe_to_seconds(timeframe):
+    """
+    Timeframe-String ('15m', '4h', '1d', '1w') -> Sekunden. Entspricht
+    ccxt.Exchange.parse_timeframe(), aber ohne Exchange-Instanz (z.B. fuer die
+    Kerzenschluss-Planung im Daemon, siehe stbot/strategy/daemon.py).
+    """
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+    amount, unit = timeframe[:-1], timeframe[-1]
+    if unit not in units or not amount.isdigit():
+        raise ValueError(f"Unbekannter Timeframe: {timeframe}")
+    return int(amount) * units[unit]
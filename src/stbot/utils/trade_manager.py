@@ -1,20 +1,23 @@
 # /root/stbot/src/stbot/utils/trade_manager.py
-import json
 import logging
 import os
 import time
 from datetime import datetime, timedelta
+from functools import partial
 
 import ccxt
 import numpy as np
 import pandas as pd
 import ta
 import math
+import threading
 
 # Imports angepasst auf stbot
 from stbot.strategy.sr_engine import SREngine
 from stbot.strategy.trade_logic import get_titan_signal
 from stbot.utils.exchange import Exchange
+from stbot.utils import notifier
+from stbot.utils.state_store import JsonStateStore
 from stbot.utils.telegram import send_message, send_photo
 from stbot.utils.timeframe_utils import determine_htf
 
@@ -22,6 +25,9 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 ARTIFACTS_PATH = os.path.join(PROJECT_ROOT, 'artifacts')
 DB_PATH = os.path.join(ARTIFACTS_PATH, 'db')
 TRADE_LOCK_FILE = os.path.join(DB_PATH, 'trade_lock.json')
+# Prozessweiter Store (Cache + atomare, prozessuebergreifend gesperrte
+# Schreibvorgaenge, siehe stbot/utils/state_store.py)
+_trade_lock_store = JsonStateStore(TRADE_LOCK_FILE)
 
 class Bias:
     BULLISH = "BULLISH"
@@ -56,31 +62,18 @@ def determine_market_bias(htf_df):
     except Exception as e:
         return Bias.NEUTRAL
 
-def load_or_create_trade_lock():
-    os.makedirs(DB_PATH, exist_ok=True)
-    if os.path.exists(TRADE_LOCK_FILE):
-        with open(TRADE_LOCK_FILE, 'r') as f:
-            return json.load(f)
-    return {}
-
-def save_trade_lock(trade_lock):
-    with open(TRADE_LOCK_FILE, 'w') as f:
-        json.dump(trade_lock, f, indent=4)
-
 def is_trade_locked(symbol_timeframe):
-    trade_lock = load_or_create_trade_lock()
-    lock_time_str = trade_lock.get(symbol_timeframe)
+    lock_time_str = _trade_lock_store.get(symbol_timeframe)
     if lock_time_str:
         lock_time = datetime.strptime(lock_time_str, "%Y-%m-%d %H:%M:%S")
         if datetime.now() < lock_time:
             return True
     return False
 
-def set_trade_lock(symbol_timeframe, lock_duration_minutes=60):
+def set_trade_lock(symbol_timeframe, lock_duration_minutes=60, extra=None):
+    """extra: weitere Schluessel, die im selben Schreibvorgang gesetzt werden."""
     lock_time = datetime.now() + timedelta(minutes=lock_duration_minutes)
-    trade_lock = load_or_create_trade_lock()
-    trade_lock[symbol_timeframe] = lock_time.strftime("%Y-%m-%d %H:%M:%S")
-    save_trade_lock(trade_lock)
+    _trade_lock_store.update({symbol_timeframe: lock_time.strftime("%Y-%m-%d %H:%M:%S"), **(extra or {})})
 
 def housekeeper_routine(exchange, symbol, logger):
     try:
@@ -107,6 +100,43 @@ def housekeeper_routine(exchange, symbol, logger):
 
 # ─── Chart-Generierung: SR-Breakout-Kerzendiagramm ───────────────────────────
 
+# matplotlib wird erst beim ersten Chart geladen (einmal je Prozess, nicht bei
+# jedem Aufruf) -- None = noch nicht versucht, False = nicht installiert.
+_chart_backend = None
+# Figure-Vorlage je Thread (Notifier-Worker bzw. show_chart.py): statt pro
+# Chart plt.subplots() + plt.close() wird dieselbe Figure geleert und neu
+# bezeichnet. Direkt ueber Figure/FigureCanvasAgg statt pyplot -- kein globaler
+# pyplot-Zustand, damit unabhaengig vom aufrufenden Thread.
+_chart_templates = threading.local()
+_CHART_DPI = 130
+
+
+def _load_chart_backend():
+    global _chart_backend
+    if _chart_backend is None:
+        try:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.collections import LineCollection, PolyCollection
+            _chart_backend = (Figure, FigureCanvasAgg, LineCollection, PolyCollection)
+        except ImportError:
+            _chart_backend = False
+    return _chart_backend
+
+
+def _chart_figure(Figure, FigureCanvasAgg):
+    fig = getattr(_chart_templates, 'fig', None)
+    if fig is None:
+        fig = Figure(figsize=(14, 7), dpi=_CHART_DPI)
+        FigureCanvasAgg(fig)
+        fig.patch.set_facecolor('#0d1117')
+        fig.add_subplot(111)
+        _chart_templates.fig = fig
+    ax = fig.axes[0]
+    ax.clear()
+    return fig, ax
+
+
 def _generate_stbot_chart_png(processed_df: pd.DataFrame, signal_side: str,
                                entry_price: float, sl_price: float, tp_price: float,
                                symbol: str, timeframe: str, rr: float,
@@ -115,13 +145,10 @@ def _generate_stbot_chart_png(processed_df: pd.DataFrame, signal_side: str,
     Zeichnet Kerzendiagramm mit EMA20/50, SR-Breakout-Marker und Entry/SL/TP-Tags.
     Gibt Pfad zur temporaeren PNG-Datei zurueck (oder None bei Fehler).
     """
-    try:
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
-        import matplotlib.patches as mpatches
-    except ImportError:
+    backend = _load_chart_backend()
+    if not backend:
         return None
+    Figure, FigureCanvasAgg, LineCollection, PolyCollection = backend
 
     if processed_df is None or processed_df.empty:
         return None
@@ -140,8 +167,7 @@ def _generate_stbot_chart_png(processed_df: pd.DataFrame, signal_side: str,
     lows   = display_df['low'].values
     closes = display_df['close'].values
 
-    fig, ax = plt.subplots(figsize=(14, 7))
-    fig.patch.set_facecolor('#0d1117')
+    fig, ax = _chart_figure(Figure, FigureCanvasAgg)
     ax.set_facecolor('#0d1117')
     bar_w = 0.6
 
@@ -175,23 +201,28 @@ def _generate_stbot_chart_png(processed_df: pd.DataFrame, signal_side: str,
     ax.plot(xs, ema20, color='#00bcd4', linewidth=1.1, label='EMA20', zorder=4, alpha=0.85)
     ax.plot(xs, ema50, color='#ff9800', linewidth=1.1, label='EMA50', zorder=4, alpha=0.85)
 
-    # 4. Kerzen + SR-Signal-Marker
-    sr_signals = display_df['sr_signal'].values if 'sr_signal' in display_df.columns else None
-    for i in range(n):
-        o, h, l, c = opens[i], highs[i], lows[i], closes[i]
-        color = '#26a69a' if c >= o else '#ef5350'
-        ax.plot([i, i], [l, h], color=color, linewidth=0.8, zorder=2)
-        body_h = max(abs(c - o), (h - l) * 0.005)
-        ax.add_patch(mpatches.FancyBboxPatch(
-            (i - bar_w / 2, min(o, c)), bar_w, body_h,
-            boxstyle="square,pad=0", linewidth=0, facecolor=color, zorder=3,
-        ))
-        # Vorherige SR-Breakout-Punkte als kleine Dreiecke
-        if sr_signals is not None and i < n - 1 and sr_signals[i] != 0:
-            marker = '^' if sr_signals[i] == 1 else 'v'
-            ypos = l * 0.9985 if sr_signals[i] == 1 else h * 1.0015
-            if _in_range(ypos):
-                ax.scatter(i, ypos, marker=marker, color='#888888', s=20, zorder=5, alpha=0.6)
+    # 4. Kerzen + SR-Signal-Marker -- gebuendelt: alle Dochte als EINE
+    # LineCollection, alle Koerper als EINE PolyCollection, Marker je Richtung
+    # ein scatter (vorher je Kerze ax.plot + FancyBboxPatch + scatter -> bei
+    # 500 Kerzen >1000 Artists)
+    x = np.arange(n, dtype=float)
+    colors = np.where(closes >= opens, '#26a69a', '#ef5350')
+    wicks = np.stack([np.column_stack([x, lows]), np.column_stack([x, highs])], axis=1)
+    ax.add_collection(LineCollection(wicks, colors=colors, linewidths=0.8, zorder=2))
+    body_lo = np.minimum(opens, closes)
+    body_hi = body_lo + np.maximum(np.abs(closes - opens), (highs - lows) * 0.005)
+    left, right = x - bar_w / 2, x + bar_w / 2
+    bodies = np.stack([np.column_stack([left, body_lo]), np.column_stack([right, body_lo]),
+                       np.column_stack([right, body_hi]), np.column_stack([left, body_hi])], axis=1)
+    ax.add_collection(PolyCollection(bodies, facecolors=colors, linewidths=0, zorder=3))
+
+    # Vorherige SR-Breakout-Punkte als kleine Dreiecke (letzte Kerze = aktuelles Signal, ohne Marker)
+    if 'sr_signal' in display_df.columns:
+        sr_signals = display_df['sr_signal'].values[:-1]
+        for direction, marker, ypos in ((1, '^', lows[:-1] * 0.9985), (-1, 'v', highs[:-1] * 1.0015)):
+            mask = (sr_signals == direction) & (ypos > y_lo) & (ypos < y_hi)
+            if mask.any():
+                ax.scatter(x[:-1][mask], ypos[mask], marker=marker, color='#888888', s=20, zorder=5, alpha=0.6)
 
     # 5. Breakout-Pfeil am letzten Kerze
     arrow_color = '#00e676' if signal_side == 'buy' else '#ff1744'
@@ -260,7 +291,7 @@ def _generate_stbot_chart_png(processed_df: pd.DataFrame, signal_side: str,
     ax.set_xticks([])
     ax.yaxis.tick_right()
     ax.grid(axis='y', color='#1e2a3a', linewidth=0.4, zorder=0)
-    plt.tight_layout()
+    fig.tight_layout()
 
     tmp_dir = os.path.join(PROJECT_ROOT, 'artifacts', 'tmp')
     os.makedirs(tmp_dir, exist_ok=True)
@@ -268,8 +299,11 @@ def _generate_stbot_chart_png(processed_df: pd.DataFrame, signal_side: str,
     ts       = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
     sym_safe = symbol.replace('/', '-').replace(':', '-')
     path     = os.path.join(tmp_dir, f'stbot_entry_{sym_safe}_{timeframe}_{ts}.png')
-    fig.savefig(path, dpi=130, bbox_inches='tight', facecolor=fig.get_facecolor())
-    plt.close(fig)
+    # Ein Render-Durchgang in der Figure-eigenen DPI: tight_layout() hat die
+    # Raender schon angepasst, bbox_inches='tight' wuerde die Figure nur zum
+    # Vermessen ein zweites Mal zeichnen. Schwache PNG-Kompression -- die
+    # Datei geht direkt an Telegram (das Fotos ohnehin neu komprimiert).
+    fig.savefig(path, dpi=_CHART_DPI, facecolor=fig.get_facecolor(), pil_kwargs={'compress_level': 1})
     return path
 
 
@@ -277,9 +311,11 @@ def _send_stbot_chart(processed_df: pd.DataFrame, signal_side: str,
                        entry_price: float, sl_price: float, tp_price: float,
                        symbol: str, timeframe: str, rr: float,
                        market_bias: str, telegram_config: dict, logger):
-    """Generiert SR-Breakout-Chart und sendet ihn via Telegram."""
+    """Generiert SR-Breakout-Chart und sendet ihn via Telegram. Laeuft im
+    Notifier-Worker (stbot/utils/notifier.py); False = erneut versuchen."""
     if not telegram_config or not telegram_config.get('bot_token') or not telegram_config.get('chat_id'):
         return
+    path = None
     try:
         path = _generate_stbot_chart_png(
             processed_df, signal_side, entry_price, sl_price, tp_price,
@@ -292,14 +328,22 @@ def _send_stbot_chart(processed_df: pd.DataFrame, signal_side: str,
                 f"{side_label} @ {entry_price:.6g}  |  SL: {sl_price:.6g}  |  TP: {tp_price:.6g}\n"
                 f"R:R 1:{rr:.1f}  |  Bias: {market_bias}"
             )
-            send_photo(telegram_config.get('bot_token'), telegram_config.get('chat_id'),
-                       path, caption)
-            os.remove(path)
+            return send_photo(telegram_config.get('bot_token'), telegram_config.get('chat_id'),
+                              path, caption)
     except Exception as e:
         logger.warning(f"stbot-Chart senden fehlgeschlagen: {e}")
+    finally:
+        if path and os.path.exists(path):
+            os.remove(path)
 
 
-def check_and_open_new_position(exchange, model, scaler, params, telegram_config, logger):
+def check_and_open_new_position(exchange, model, scaler, params, telegram_config, logger, prefetched=None):
+    """
+    prefetched: optional vorab (z.B. asynchron fuer alle Strategien gleichzeitig,
+    siehe stbot/strategy/async_cycle.py) geladene Marktdaten {'ohlcv', 'htf_ohlcv'};
+    fehlende Eintraege werden wie bisher hier synchron abgerufen.
+    """
+    prefetched = prefetched or {}
     symbol = params['market']['symbol']
     timeframe = params['market']['timeframe']
     symbol_timeframe = f"{symbol.replace('/', '-')}_{timeframe}"
@@ -311,7 +355,11 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
     try:
         logger.info(f"Prüfe StBot (SRv2) Signal für {symbol} ({timeframe})...")
 
-        recent_data = exchange.fetch_recent_ohlcv(symbol, timeframe, limit=1000)
+        recent_data = prefetched.get('ohlcv')
+        if recent_data is None:
+            recent_data = exchange.fetch_recent_ohlcv(symbol, timeframe, limit=1000)
+        else:
+            recent_data = recent_data.copy()  # ATR-Spalte wird unten angehaengt
         if recent_data.empty or len(recent_data) < 50:
             logger.warning(f"Nicht genügend OHLCV-Daten (gefunden: {len(recent_data)}) – überspringe.")
             return
@@ -326,7 +374,9 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
         market_bias = Bias.NEUTRAL
         if htf:
             try:
-                htf_data = exchange.fetch_recent_ohlcv(symbol, htf, limit=100)
+                htf_data = prefetched.get('htf_ohlcv')
+                if htf_data is None:
+                    htf_data = exchange.fetch_recent_ohlcv(symbol, htf, limit=100)
                 if not htf_data.empty:
                     market_bias = determine_market_bias(htf_data)
                     logger.info(f"HTF ({htf}) Bias: {market_bias}")
@@ -346,8 +396,7 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
 
         # Re-Entry-Schutz: Prüfe Abstand zur letzten Entry
         last_entry_key = f"{symbol_timeframe}_last_entry_price"
-        trade_lock = load_or_create_trade_lock()
-        last_entry_price = trade_lock.get(last_entry_key)
+        last_entry_price = _trade_lock_store.get(last_entry_key)
         
         if last_entry_price:
             try:
@@ -375,80 +424,85 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
         exchange.set_margin_mode(symbol, margin_mode)
         exchange.set_leverage(symbol, leverage)
 
-        balance = exchange.fetch_balance_usdt()
-        if balance <= 0:
-            logger.error("Kein USDT-Guthaben.")
-            return
+        # Guthaben lesen -> Groesse -> Entry-Order konto-weit serialisiert (siehe
+        # exchange._account_locks): parallele Strategien im Daemon-Zyklus sollen
+        # nicht aus demselben freien Guthaben dimensionieren. Das Guthaben wird
+        # deshalb UNTER der Sperre live geholt (es ist nicht im Zyklus-Schnappschuss).
+        with exchange.account_lock:
+            balance = exchange.fetch_balance_usdt()
+            if balance <= 0:
+                logger.error("Kein USDT-Guthaben.")
+                return
 
-        ticker = exchange.fetch_ticker(symbol)
-        entry_price = signal_price or ticker['last']
+            ticker = exchange.fetch_ticker(symbol)
+            entry_price = signal_price or ticker['last']
 
-        # Adaptive RR basierend auf Volatilität
-        base_rr = risk_params.get('risk_reward_ratio', 2.0)
-        risk_pct = risk_params.get('risk_per_trade_pct', 1.0) / 100.0
-        risk_usdt = balance * risk_pct
+            # Adaptive RR basierend auf Volatilität
+            base_rr = risk_params.get('risk_reward_ratio', 2.0)
+            risk_pct = risk_params.get('risk_per_trade_pct', 1.0) / 100.0
+            risk_usdt = balance * risk_pct
 
-        atr_multiplier_sl = risk_params.get('atr_multiplier_sl', 2.0)
-        min_sl_pct = risk_params.get('min_sl_pct', 0.3) / 100.0
+            atr_multiplier_sl = risk_params.get('atr_multiplier_sl', 2.0)
+            min_sl_pct = risk_params.get('min_sl_pct', 0.3) / 100.0
 
-        current_atr = current_candle.get('atr')
+            current_atr = current_candle.get('atr')
         
-        # Adaptive RR: Bei hoher Volatilität höheres RR
-        if not pd.isna(current_atr) and current_atr > 0:
-            atr_avg = processed_data['atr'].tail(50).mean()
-            if current_atr > atr_avg * 1.5:  # High Volatility
-                rr = min(base_rr * 1.3, 5.0)  # Max 5.0 RR
-                logger.info(f"High Vol detektiert – RR erhöht auf {rr:.2f}")
-            elif current_atr < atr_avg * 0.7:  # Low Volatility
-                rr = max(base_rr * 0.8, 1.5)  # Min 1.5 RR
-                logger.info(f"Low Vol detektiert – RR gesenkt auf {rr:.2f}")
+            # Adaptive RR: Bei hoher Volatilität höheres RR
+            if not pd.isna(current_atr) and current_atr > 0:
+                atr_avg = processed_data['atr'].tail(50).mean()
+                if current_atr > atr_avg * 1.5:  # High Volatility
+                    rr = min(base_rr * 1.3, 5.0)  # Max 5.0 RR
+                    logger.info(f"High Vol detektiert – RR erhöht auf {rr:.2f}")
+                elif current_atr < atr_avg * 0.7:  # Low Volatility
+                    rr = max(base_rr * 0.8, 1.5)  # Min 1.5 RR
+                    logger.info(f"Low Vol detektiert – RR gesenkt auf {rr:.2f}")
+                else:
+                    rr = base_rr
             else:
                 rr = base_rr
-        else:
-            rr = base_rr
-        if pd.isna(current_atr) or current_atr <= 0:
-            sl_distance = entry_price * min_sl_pct
-        else:
-            sl_distance_atr = current_atr * atr_multiplier_sl
-            sl_distance_min = entry_price * min_sl_pct
-            sl_distance = max(sl_distance_atr, sl_distance_min)
+            if pd.isna(current_atr) or current_atr <= 0:
+                sl_distance = entry_price * min_sl_pct
+            else:
+                sl_distance_atr = current_atr * atr_multiplier_sl
+                sl_distance_min = entry_price * min_sl_pct
+                sl_distance = max(sl_distance_atr, sl_distance_min)
 
-        if sl_distance <= 0: return
+            if sl_distance <= 0: return
 
-        if signal_side == 'buy':
-            sl_price = entry_price - sl_distance
-            tp_price = entry_price + sl_distance * rr
-            pos_side = 'buy'
-            tsl_side = 'sell'
-        else:
-            sl_price = entry_price + sl_distance
-            tp_price = entry_price - sl_distance * rr
-            pos_side = 'sell'
-            tsl_side = 'buy'
-
-        sl_distance_pct_equivalent = sl_distance / entry_price
-        calculated_notional_value = risk_usdt / sl_distance_pct_equivalent
-        amount = calculated_notional_value / entry_price
-
-        min_amount = exchange.markets[symbol].get('limits', {}).get('amount', {}).get('min', 0.0)
-        if amount < min_amount:
-            logger.error(f"Ordergröße {amount} < Mindestbetrag {min_amount}.")
-            return
-
-        # Orders - HIER IST DIE WICHTIGE ÄNDERUNG (Params übergeben!)
-        logger.info(f"Eröffne {pos_side.upper()}-Position: {amount:.6f} @ ${entry_price:.6f} | Risk: {risk_usdt:.2f} USDT")
+            if signal_side == 'buy':
+                sl_price = entry_price - sl_distance
+                tp_price = entry_price + sl_distance * rr
+                pos_side = 'buy'
+                tsl_side = 'sell'
+            else:
+                sl_price = entry_price + sl_distance
+                tp_price = entry_price - sl_distance * rr
+                pos_side = 'sell'
+                tsl_side = 'buy'
+
+            sl_distance_pct_equivalent = sl_distance / entry_price
+            calculated_notional_value = risk_usdt / sl_distance_pct_equivalent
+            amount = calculated_notional_value / entry_price
+
+            min_amount = exchange.markets[symbol].get('limits', {}).get('amount', {}).get('min', 0.0)
+            if amount < min_amount:
+                logger.error(f"Ordergröße {amount} < Mindestbetrag {min_amount}.")
+                return
+
+            # Orders - HIER IST DIE WICHTIGE ÄNDERUNG (Params übergeben!)
+            logger.info(f"Eröffne {pos_side.upper()}-Position: {amount:.6f} @ ${entry_price:.6f} | Risk: {risk_usdt:.2f} USDT")
         
-        entry_order = exchange.create_market_order(
-            symbol, 
-            pos_side, 
-            amount, 
-            {
-                'leverage': leverage, 
-                'marginMode': margin_mode
-            }
-        )
+            entry_order = exchange.create_market_order(
+                symbol, 
+                pos_side, 
+                amount, 
+                {
+                    'leverage': leverage, 
+                    'marginMode': margin_mode
+                }
+            )
         
-        if not entry_order: return
+            if not entry_order: return
 
         time.sleep(2)
         position = exchange.fetch_open_positions(symbol)
@@ -471,12 +525,8 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
 
         exchange.place_trailing_stop_order(symbol, tsl_side, contracts, act_price, callback_pct, {'reduceOnly': True})
 
-        set_trade_lock(symbol_timeframe)
-        
-        # Speichere Entry-Preis für Re-Entry-Schutz
-        trade_lock = load_or_create_trade_lock()
-        trade_lock[f"{symbol_timeframe}_last_entry_price"] = entry_price
-        save_trade_lock(trade_lock)
+        # Sperre + Entry-Preis für Re-Entry-Schutz in einem Schreibvorgang
+        set_trade_lock(symbol_timeframe, extra={f"{symbol_timeframe}_last_entry_price": entry_price})
 
         if telegram_config and telegram_config.get('bot_token') and telegram_config.get('chat_id'):
             msg = (
@@ -486,10 +536,14 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
                 f"- SL: ${sl_rounded:.6f}\n"
                 f"- TP: ${tp_rounded:.6f}"
             )
-            send_message(telegram_config['bot_token'], telegram_config['chat_id'], msg)
-            _send_stbot_chart(processed_data, signal_side, entry_price,
-                              float(sl_rounded), float(tp_rounded),
-                              symbol, timeframe, rr, market_bias, telegram_config, logger)
+            # Versand + Chart-Rendering im Hintergrund -- der Handelspfad kehrt sofort zurueck
+            dedupe_key = f"entry:{symbol_timeframe}:{entry_price}"
+            notifier.submit(partial(send_message, telegram_config['bot_token'], telegram_config['chat_id'], msg),
+                            description=f"Entry {symbol_timeframe}", dedupe_key=dedupe_key)
+            notifier.submit(partial(_send_stbot_chart, processed_data, signal_side, entry_price,
+                                    float(sl_rounded), float(tp_rounded),
+                                    symbol, timeframe, rr, market_bias, telegram_config, logger),
+                            description=f"Chart {symbol_timeframe}", dedupe_key=dedupe_key + ':chart')
 
         logger.info("Trade-Eröffnung erfolgreich abgeschlossen.")
 
@@ -499,7 +553,9 @@ def check_and_open_new_position(exchange, model, scaler, params, telegram_config
         logger.error(f"Unerwarteter Fehler: {e}", exc_info=True)
         housekeeper_routine(exchange, symbol, logger)
 
-def full_trade_cycle(exchange, model, scaler, params, telegram_config, logger):
+def full_trade_cycle(exchange, model, scaler, params, telegram_config, logger, prefetched=None):
+    """prefetched: siehe check_and_open_new_position(). Positionen kommen aus
+    dem Konto-Schnappschuss (exchange.AccountSnapshot), nicht aus prefetched."""
     symbol = params['market']['symbol']
     try:
         pos = exchange.fetch_open_positions(symbol)
@@ -507,7 +563,7 @@ def full_trade_cycle(exchange, model, scaler, params, telegram_config, logger):
             logger.info(f"Position offen – Management via SL/TP/TSL.")
         else:
             housekeeper_routine(exchange, symbol, logger)
-            check_and_open_new_position(exchange, model, scaler, params, telegram_config, logger)
+            check_and_open_new_position(exchange, model, scaler, params, telegram_config, logger, prefetched)
     except Exception as e:
         logger.error(f"Fehler im Zyklus: {e}", exc_info=True)
         time.sleep(5)
@@ -0,0 +1,95 @@
+# /root/stbot/tests/test_candle_cache.py
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from stbot.utils import candle_cache
+
+SYMBOL = 'BTC/USDT:USDT'
+# "Jetzt" = 12:30 UTC -> letzte geschlossene 1h-Kerze ist die von 11:00,
+# letzte geschlossene 4h-Kerze die von 08:00 (schliesst um 12:00)
+NOW = pd.Timestamp('2026-03-02 12:30', tz='UTC')
+
+
+def _frame(start, periods, freq='1h'):
+    idx = pd.date_range(start, periods=periods, freq=freq, tz='UTC')
+    close = 100.0 + np.arange(periods, dtype='float64')
+    return pd.DataFrame({'open': close - 0.5, 'high': close + 1.0, 'low': close - 1.0,
+                         'close': close, 'volume': np.ones(periods)}, index=idx)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(monkeypatch):
+    monkeypatch.setattr(candle_cache, '_CACHE', {})
+    monkeypatch.setattr(candle_cache, '_now_ms', lambda: int(NOW.value // 1_000_000))
+
+
+def test_plan_fetch_full_then_incremental():
+    assert candle_cache.plan_fetch(SYMBOL, '1h', 1000) == {'limit': 1000}
+
+    frame = _frame(NOW.floor('1h') - pd.Timedelta(hours=999), 999)   # bis 11:00 inkl.
+    candle_cache.store(SYMBOL, '1h', frame, 1000, incremental=False)
+    last_ms = int(frame.index[-1].value // 1_000_000)
+    # ab der letzten Kerze (1 Kerze Ueberlappung): 11:00, 12:00 (laufend) + Reserve
+    assert candle_cache.plan_fetch(SYMBOL, '1h', 1000) == {'since': last_ms, 'limit': 3}
+
+    # Luecke groesser als MAX_CANDLES -> wieder voller Abruf
+    candle_cache._CACHE[(SYMBOL, '1h')] = frame.shift(-2000, freq='1h')
+    assert candle_cache.plan_fetch(SYMBOL, '1h', 1000) == {'limit': 1000}
+
+
+def test_store_merges_overlap_and_trims():
+    candle_cache.store(SYMBOL, '1h', _frame('2026-01-01', 1000), 1000, incremental=False)
+    update = _frame('2026-01-01', 3).shift(999, freq='1h')   # ueberlappt die letzte Kerze
+    update.iloc[0, update.columns.get_loc('close')] = -1.0  # korrigierte Kerze
+
+    out = candle_cache.store(SYMBOL, '1h', update, 10, incremental=True)
+    cached = candle_cache._CACHE[(SYMBOL, '1h')]
+    assert len(out) == 10
+    assert len(cached) == candle_cache.MAX_CANDLES
+    assert cached.index.is_monotonic_increasing and not cached.index.has_duplicates
+    assert cached.index[-1] == update.index[-1]
+    assert cached.loc[update.index[0], 'close'] == -1.0
+    # Rueckgabe ist eine Kopie
+    out['atr'] = 1.0
+    assert 'atr' not in candle_cache._CACHE[(SYMBOL, '1h')].columns
+
+
+def test_resample_from_cache_complete_buckets_only():
+    # Start 01:00 -> die erste 4h-Kerze (00:00) ist nur zu 3/4 abgedeckt
+    source = _frame(NOW.floor('1D') - pd.Timedelta(days=2) + pd.Timedelta(hours=1), 59)  # bis 11:00
+    candle_cache.store(SYMBOL, '1h', source, 1000, incremental=False)
+
+    htf = candle_cache.resample_from_cache(SYMBOL, '4h', 14)
+    assert htf is not None and len(htf) == 14
+    assert htf.index[0] == source.index[0] + pd.Timedelta(hours=3)   # erste vollstaendige Kerze
+    assert htf.index[-1] == pd.Timestamp('2026-03-02 08:00', tz='UTC')
+    bucket = source.loc[htf.index[-1]:htf.index[-1] + pd.Timedelta(hours=3)]
+    assert htf.iloc[-1]['open'] == bucket['open'].iloc[0]
+    assert htf.iloc[-1]['high'] == bucket['high'].max()
+    assert htf.iloc[-1]['low'] == bucket['low'].min()
+    assert htf.iloc[-1]['close'] == bucket['close'].iloc[-1]
+    assert htf.iloc[-1]['volume'] == bucket['volume'].sum()
+
+    # Die angeschnittene erste Kerze zaehlt nicht -> 15 Kerzen gibt es nicht
+    assert candle_cache.resample_from_cache(SYMBOL, '4h', 15) is None
+
+
+def test_resample_from_cache_rejects_gap_and_stale_source():
+    source = _frame(NOW.floor('1D') - pd.Timedelta(days=2), 60)   # 00:00 vorgestern bis 11:00
+    candle_cache.store(SYMBOL, '1h', source.drop(source.index[-3]), 1000, incremental=False)
+    # Luecke in der juengsten 4h-Kerze -> kein Resampling
+    assert candle_cache.resample_from_cache(SYMBOL, '4h', 1) is None
+
+    # Quelle eine Kerze hinter der letzten geschlossenen -> veraltet
+    candle_cache.store(SYMBOL, '1h', source.iloc[:-1], 1000, incremental=False)
+    assert candle_cache.resample_from_cache(SYMBOL, '4h', 1) is None
+
+    candle_cache.store(SYMBOL, '1h', source, 1000, incremental=False)
+    assert len(candle_cache.resample_from_cache(SYMBOL, '4h', 15)) == 15
@@ -0,0 +1,83 @@
+# /root/stbot/tests/test_portfolio_optimizer.py
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+
+def _make_df(freq, n, seed):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range('2024-01-01', periods=n, freq=freq, tz='UTC')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = close * (1 + rng.normal(0, 0.003, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.004, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.004, n)))
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close,
+                         'volume': rng.lognormal(3, 1, n)}, index=idx)
+
+
+def _strategies():
+    strategy = dict(pivot_period=5, max_pivots=20, channel_width_pct=10, max_sr_levels=5, min_strength=1, source='High/Low')
+    risk = dict(risk_reward_ratio=2.0, risk_per_trade_pct=2.0, leverage=10, trailing_stop_activation_rr=1.5,
+                trailing_stop_callback_rate_pct=0.5, atr_multiplier_sl=2.0, min_sl_pct=0.3)
+    # Daten-Seeds so gewaehlt, dass der Greedy mehrere Runden ausbaut (Team aus 4)
+    specs = [('BTC/USDT:USDT', '1h', '1h', 1500, 1), ('ETH/USDT:USDT', '4h', '4h', 500, 2),
+             ('XRP/USDT:USDT', '1h', '1h', 1500, 4), ('ADA/USDT:USDT', '2h', '2h', 800, 5),
+             ('DOGE/USDT:USDT', '4h', '4h', 500, 6)]
+    return {f"config_{sym.split('/')[0]}USDTUSDT_{tf}.json": {
+        'symbol': sym, 'timeframe': tf, 'data': _make_df(freq, n, 30 + seed), 'fine_data': None, 'htf': None,
+        'smc_params': dict(strategy, pivot_period=4 + seed), 'risk_params': dict(risk, risk_per_trade_pct=1.0 + seed * 0.5)}
+        for sym, tf, freq, n, seed in specs}
+
+
+def _reference_greedy(start_capital, strategies_data, target_max_dd):
+    """Der urspruengliche Greedy (vor der Beam-Suche), auf das Wesentliche gekuerzt."""
+    from stbot.analysis.portfolio_simulator import run_portfolio_simulation
+
+    def simulate(files):
+        return run_portfolio_simulation(start_capital, {f"{strategies_data[f]['symbol']}_{strategies_data[f]['timeframe']}": strategies_data[f]
+                                                        for f in files}, None, None, verbose=False)
+
+    singles = []
+    for fname in strategies_data:
+        result = simulate([fname])
+        if result and not result.get('liquidation_date') and result['max_drawdown_pct'] <= target_max_dd:
+            singles.append((fname, result))
+    singles.sort(key=lambda x: x[1]['end_capital'], reverse=True)
+    team, best = [singles[0][0]], singles[0][1]
+    coins = {strategies_data[team[0]]['symbol'].split('/')[0]}
+    pool = [fname for fname, _ in singles]
+    while True:
+        best_add, best_result = None, best
+        for cand in pool:
+            if cand in team or strategies_data[cand]['symbol'].split('/')[0] in coins:
+                continue
+            result = simulate(team + [cand])
+            if (result and not result.get('liquidation_date') and result['max_drawdown_pct'] <= target_max_dd
+                    and result['end_capital'] > best_result['end_capital']):
+                best_add, best_result = cand, result
+        if best_add is None:
+            return team, best
+        team.append(best_add)
+        coins.add(strategies_data[best_add]['symbol'].split('/')[0])
+        best = best_result
+
+
+def test_beam_width_one_without_pruning_matches_greedy(tmp_path, monkeypatch):
+    import stbot.analysis.portfolio_optimizer as po
+
+    # optimization_results.json nicht ins echte artifacts/results schreiben
+    monkeypatch.setattr(po, 'PROJECT_ROOT', str(tmp_path))
+    target_max_dd = 60.0
+    expected_team, expected = _reference_greedy(1000, _strategies(), target_max_dd)
+    result = po.run_portfolio_optimizer(1000, _strategies(), None, None, target_max_dd,
+                                        max_workers=1, beam_width=1, prune_slack=None)
+
+    assert len(expected_team) > 1, "Testdaten sollen mindestens eine Greedy-Runde ausloesen."
+    assert result['optimal_portfolio'] == expected_team
+    assert result['final_result']['end_capital'] == expected['end_capital']
+    assert result['final_result']['max_drawdown_pct'] == expected['max_drawdown_pct']
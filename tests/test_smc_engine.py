@@ -0,0 +1,69 @@
+# /root/stbot/tests/test_smc_engine.py
+import dataclasses
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from stbot.strategy.smc_engine import SMCEngine
+
+# Eingefroren mit der urspruenglichen SMCEngine (Listen-Scan je Kerze, vor den
+# Heaps fuer OB-/FVG-Mitigation): (Events, offene Swing-OBs, offene Internal-OBs,
+# offene FVGs, SHA1 ueber alle Events und offenen Objekte in Ausgabe-Reihenfolge).
+EXPECTED = {
+    (20, 'High/Low'): (1785, 3, 9, 44, '3fc757c110dd5668e8f26a0cc52f352c0587d16e'),
+    (50, 'Close'): (1730, 2, 18, 44, '4200db3b290ccd887c07a7514aaa7749268182bc'),
+}
+
+
+def _frame(n=6000, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.001, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.001, n)))
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close},
+                        index=pd.date_range('2024-01-01', periods=n, freq='5min', tz='UTC'))
+
+
+def _value(v):
+    if hasattr(v, 'name'):
+        return v.name
+    if isinstance(v, (bool, np.bool_)):
+        return bool(v)
+    if isinstance(v, (int, np.integer)):
+        return int(v)
+    return repr(float(v))
+
+
+def _level(v):
+    return tuple(repr(float(x)) for x in v) if isinstance(v, tuple) else repr(float(v))
+
+
+def _digest(result):
+    h = hashlib.sha1()
+    for ev in result['events']:
+        h.update(repr((int(ev['time']), int(ev['index']), ev['type'], _level(ev['level']))).encode())
+    for key in ('unmitigated_swing_obs', 'unmitigated_internal_obs', 'unmitigated_fvgs'):
+        for obj in result[key]:
+            h.update(repr([(f.name, _value(getattr(obj, f.name))) for f in dataclasses.fields(obj)]).encode())
+    return h.hexdigest()
+
+
+@pytest.mark.parametrize('settings', sorted(EXPECTED))
+def test_output_matches_frozen_baseline(settings):
+    swings_length, mitigation = settings
+    result = SMCEngine({'swingsLength': swings_length, 'ob_mitigation': mitigation}).process_dataframe(_frame())
+
+    got = (len(result['events']), len(result['unmitigated_swing_obs']), len(result['unmitigated_internal_obs']),
+           len(result['unmitigated_fvgs']), _digest(result))
+    assert got == EXPECTED[settings]
+    # Die zurueckgegebenen Objekte sind wirklich offen
+    for key in ('unmitigated_swing_obs', 'unmitigated_internal_obs', 'unmitigated_fvgs'):
+        assert not any(obj.mitigated for obj in result[key])
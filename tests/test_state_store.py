@@ -0,0 +1,51 @@
+# /root/stbot/tests/test_state_store.py
+import json
+import multiprocessing
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'src'))
+
+from stbot.utils.state_store import JsonStateStore
+
+
+def test_update_and_delete_single_keys(tmp_path):
+    path = str(tmp_path / 'db' / 'state.json')
+    store = JsonStateStore(path)
+    assert store.get('a') is None and store.snapshot() == {}
+
+    store.update({'a': 1, 'b': 2})
+    store.update({'b': 3}, delete=('a',))
+    assert store.snapshot() == {'b': 3}
+    with open(path) as f:
+        assert json.load(f) == {'b': 3}
+
+    # Zweite Instanz (anderer Prozess) schreibt -- die erste sieht die Aenderung
+    # beim naechsten Lesen und verliert bei ihrem eigenen Update nichts
+    JsonStateStore(path).update({'c': 4})
+    assert store.get('c') == 4
+    store.update(delete=('b',))
+    assert JsonStateStore(path).snapshot() == {'c': 4}
+    assert sorted(os.listdir(tmp_path / 'db')) == ['state.json', 'state.json.lock']
+
+
+def _worker(path, worker, n_keys):
+    store = JsonStateStore(path)
+    for i in range(n_keys):
+        store.update({f"w{worker}_{i}": i})
+
+
+def test_concurrent_processes_do_not_lose_keys(tmp_path):
+    path = str(tmp_path / 'state.json')
+    procs = [multiprocessing.Process(target=_worker, args=(path, w, 25)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+
+    # Ohne die Datei-Sperre ueberschreiben sich parallele lesen-aendern-schreiben-Zyklen
+    data = JsonStateStore(path).snapshot()
+    assert len(data) == 4 * 25
+    assert data['w3_24'] == 24